@@ -7,7 +7,7 @@ CREATE TABLE IF NOT EXISTS ml_predictions (
     predicted_value DOUBLE PRECISION NOT NULL,
     predicted_signal INTEGER,
     true_value DOUBLE PRECISION,
-    error_abs DOUBLE PRECISION,
+    error_abs DOUBLE PRECISION GENERATED ALWAYS AS (ABS(predicted_value - true_value)) STORED,
     created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
     CONSTRAINT uq_ml_predictions UNIQUE (symbol, prediction_date, model_name, run_date)
 );
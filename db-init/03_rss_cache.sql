@@ -0,0 +1,9 @@
+-- Caché de descargas RSS (GET condicional con ETag / Last-Modified).
+-- Si Google News responde 304 se reutiliza el cuerpo guardado.
+CREATE TABLE IF NOT EXISTS rss_cache (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    body          BYTEA,
+    fetched_at    TIMESTAMPTZ DEFAULT NOW()
+);
@@ -0,0 +1,13 @@
+-- Índices para las consultas de reporting (WHERE symbol = ... ORDER BY fecha DESC LIMIT n).
+-- prices, indicators y signals no necesitan índice extra: su PRIMARY KEY (symbol, date)
+-- ya se recorre hacia atrás para ORDER BY date DESC.
+-- CONCURRENTLY permite aplicar este fichero a mano sobre una base en uso
+-- (psql -f 04_reporting_indexes.sql) sin bloquear escrituras.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_news_sym_published
+    ON news (symbol, published_at DESC);
+
+-- Solo predicciones validadas: son las que usa el cálculo de métricas ML
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ml_pred_sym_date_validated
+    ON ml_predictions (symbol, prediction_date DESC)
+    WHERE true_value IS NOT NULL;
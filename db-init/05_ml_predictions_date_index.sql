@@ -0,0 +1,9 @@
+-- Índice por fecha de predicción para la validación diaria
+-- (UPDATE ml_predictions ... FROM prices WHERE prediction_date = X AND symbol = ...).
+-- La restricción única (symbol, prediction_date, model_name, run_date) empieza por
+-- symbol; este índice permite leer de una vez todas las predicciones de una fecha
+-- (o de un rango de fechas) sin recorrer la tabla.
+-- Sin INCLUDE (predicted_value): un UPDATE siempre visita la fila en el heap.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ml_predictions_date_symbol
+    ON ml_predictions (prediction_date, symbol);
@@ -0,0 +1,27 @@
+-- error_abs pasa a ser una columna generada: Postgres la calcula a partir de
+-- predicted_value y true_value, así que la validación solo escribe true_value.
+-- Migración idempotente para bases de datos creadas con la columna normal
+-- (02_ml_predictions.sql ya la crea generada en instalaciones nuevas).
+--
+-- Docker solo ejecuta db-init/ al crear el volumen de datos, así que en
+-- instalaciones existentes hay que aplicarla a mano (reescribe la tabla):
+--   docker exec -i <contenedor_postgres> psql -U <usuario> -d <base_de_datos> \
+--       < db-init/06_error_abs_generated.sql
+-- Mientras no se aplique, validate_predictions sigue rellenando error_abs.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_name = 'ml_predictions'
+          AND column_name = 'error_abs'
+          AND is_generated = 'NEVER'
+    ) THEN
+        ALTER TABLE ml_predictions DROP COLUMN error_abs;
+        ALTER TABLE ml_predictions
+            ADD COLUMN error_abs DOUBLE PRECISION
+            GENERATED ALWAYS AS (ABS(predicted_value - true_value)) STORED;
+    END IF;
+END
+$$;
@@ -0,0 +1,17 @@
+-- Suscripciones del bot de Telegram (scripts/ui/telegram_bot.py).
+-- El bot mantiene una copia en memoria y escribe aquí cada /start, /seguir y /dejar,
+-- de modo que las suscripciones sobreviven a un reinicio o despliegue.
+-- El bot también ejecuta este CREATE TABLE IF NOT EXISTS al arrancar, para las
+-- bases de datos creadas antes de este fichero (docker solo ejecuta db-init/
+-- con el volumen vacío).
+CREATE TABLE IF NOT EXISTS telegram_subscribers (
+    chat_id    BIGINT PRIMARY KEY,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS telegram_user_symbols (
+    chat_id    BIGINT NOT NULL,
+    symbol     TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (chat_id, symbol)
+);
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from datetime import datetime
 from psycopg2 import Error as PsycopgError
+import orjson
 
 from scripts.assets import Market, resolve_symbol
 
@@ -116,7 +117,7 @@ def update_prices(market: Market = Market.ibex35, period: str = "1mo"):
 
 
 @app.get("/update_news")
-def update_news(
+async def update_news(
     markets: str = "IBEX35",
     when: str = "7d",
     days: int = 7,
@@ -142,7 +143,7 @@ def update_news(
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    result = update_news_for_symbols(
+    result = await update_news_for_symbols(
         symbols,
         when=when,
         days_back=days,
@@ -464,7 +465,14 @@ def daily_summary(market: Market = Market.ibex35, include_ml: bool = True):
     summary = build_daily_summary(symbol, include_ml_performance=include_ml)
     # añadimos info del market original
     summary["market"] = market.value
-    return summary
+    # El resumen ya es JSON plano (fechas en ISO 8601): orjson solo codifica la respuesta,
+    # sin pasar por jsonable_encoder
+    return Response(
+        content=orjson.dumps(
+            summary, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        ),
+        media_type="application/json",
+    )
 
 
 @app.get("/model_performance")
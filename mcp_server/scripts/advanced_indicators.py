@@ -14,7 +14,8 @@ Implementa:
 import pandas as pd
 import numpy as np
 from psycopg2 import Error as PsycopgError
-from .config import get_db_conn
+from psycopg2.extras import execute_values
+from .config import db_conn
 from . import logger
 
 
@@ -28,28 +29,22 @@ def _load_full_prices(symbol: str) -> pd.DataFrame:
     Returns:
         DataFrame con columnas: Open, High, Low, Close, Volume
     """
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT date, open, high, low, close, volume
-                FROM prices
-                WHERE symbol = %s
-                ORDER BY date
-                """,
-                (symbol,),
-            )
-            rows = cur.fetchall()
+        with db_conn(readonly=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT date, open, high, low, close, volume
+                    FROM prices
+                    WHERE symbol = %s
+                    ORDER BY date
+                    """,
+                    (symbol,),
+                )
+                rows = cur.fetchall()
     except PsycopgError as e:
         logger.error(f"Error al cargar precios completos de {symbol}: {e}")
-        if conn and not conn.closed:
-            conn.rollback()
         raise
-    finally:
-        if conn and not conn.closed:
-            conn.close()
 
     if not rows:
         logger.warning(f"No hay precios en BD para {symbol}")
@@ -315,40 +310,50 @@ def compute_advanced_indicators_for_symbol(symbol: str) -> int:
         logger.warning(f"No se pudieron calcular indicadores avanzados para {symbol}")
         return 0
 
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            # Crear tabla si no existe
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS advanced_indicators (
-                    symbol VARCHAR(20),
-                    date DATE,
-                    macd DOUBLE PRECISION,
-                    macd_signal DOUBLE PRECISION,
-                    macd_histogram DOUBLE PRECISION,
-                    bb_middle DOUBLE PRECISION,
-                    bb_upper DOUBLE PRECISION,
-                    bb_lower DOUBLE PRECISION,
-                    bb_width DOUBLE PRECISION,
-                    bb_percent DOUBLE PRECISION,
-                    adx DOUBLE PRECISION,
-                    plus_di DOUBLE PRECISION,
-                    minus_di DOUBLE PRECISION,
-                    atr DOUBLE PRECISION,
-                    stoch_k DOUBLE PRECISION,
-                    stoch_d DOUBLE PRECISION,
-                    obv DOUBLE PRECISION,
-                    ema_12 DOUBLE PRECISION,
-                    ema_26 DOUBLE PRECISION,
-                    ema_200 DOUBLE PRECISION,
-                    PRIMARY KEY (symbol, date)
-                );
-            """)
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                # Crear tabla si no existe
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS advanced_indicators (
+                        symbol VARCHAR(20),
+                        date DATE,
+                        macd DOUBLE PRECISION,
+                        macd_signal DOUBLE PRECISION,
+                        macd_histogram DOUBLE PRECISION,
+                        bb_middle DOUBLE PRECISION,
+                        bb_upper DOUBLE PRECISION,
+                        bb_lower DOUBLE PRECISION,
+                        bb_width DOUBLE PRECISION,
+                        bb_percent DOUBLE PRECISION,
+                        adx DOUBLE PRECISION,
+                        plus_di DOUBLE PRECISION,
+                        minus_di DOUBLE PRECISION,
+                        atr DOUBLE PRECISION,
+                        stoch_k DOUBLE PRECISION,
+                        stoch_d DOUBLE PRECISION,
+                        obv DOUBLE PRECISION,
+                        ema_12 DOUBLE PRECISION,
+                        ema_26 DOUBLE PRECISION,
+                        ema_200 DOUBLE PRECISION,
+                        PRIMARY KEY (symbol, date)
+                    );
+                """)
             
-            # Insertar/actualizar indicadores
-            for date, row in indicators_df.iterrows():
-                cur.execute(
+                # Insertar/actualizar indicadores
+                cols = [
+                    'macd', 'macd_signal', 'macd_histogram',
+                    'bb_middle', 'bb_upper', 'bb_lower', 'bb_width', 'bb_percent',
+                    'adx', 'plus_di', 'minus_di', 'atr',
+                    'stoch_k', 'stoch_d', 'obv',
+                    'ema_12', 'ema_26', 'ema_200',
+                ]
+                rows = [
+                    (symbol, date.date(), *[float(v) if v == v else None for v in values])
+                    for date, *values in indicators_df[cols].itertuples(index=True, name=None)
+                ]
+                execute_values(
+                    cur,
                     """
                     INSERT INTO advanced_indicators (
                         symbol, date,
@@ -358,7 +363,7 @@ def compute_advanced_indicators_for_symbol(symbol: str) -> int:
                         stoch_k, stoch_d, obv,
                         ema_12, ema_26, ema_200
                     )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    VALUES %s
                     ON CONFLICT (symbol, date) DO UPDATE SET
                         macd = EXCLUDED.macd,
                         macd_signal = EXCLUDED.macd_signal,
@@ -379,41 +384,17 @@ def compute_advanced_indicators_for_symbol(symbol: str) -> int:
                         ema_26 = EXCLUDED.ema_26,
                         ema_200 = EXCLUDED.ema_200;
                     """,
-                    (
-                        symbol, date.date(),
-                        float(row['macd']) if pd.notna(row['macd']) else None,
-                        float(row['macd_signal']) if pd.notna(row['macd_signal']) else None,
-                        float(row['macd_histogram']) if pd.notna(row['macd_histogram']) else None,
-                        float(row['bb_middle']) if pd.notna(row['bb_middle']) else None,
-                        float(row['bb_upper']) if pd.notna(row['bb_upper']) else None,
-                        float(row['bb_lower']) if pd.notna(row['bb_lower']) else None,
-                        float(row['bb_width']) if pd.notna(row['bb_width']) else None,
-                        float(row['bb_percent']) if pd.notna(row['bb_percent']) else None,
-                        float(row['adx']) if pd.notna(row['adx']) else None,
-                        float(row['plus_di']) if pd.notna(row['plus_di']) else None,
-                        float(row['minus_di']) if pd.notna(row['minus_di']) else None,
-                        float(row['atr']) if pd.notna(row['atr']) else None,
-                        float(row['stoch_k']) if pd.notna(row['stoch_k']) else None,
-                        float(row['stoch_d']) if pd.notna(row['stoch_d']) else None,
-                        float(row['obv']) if pd.notna(row['obv']) else None,
-                        float(row['ema_12']) if pd.notna(row['ema_12']) else None,
-                        float(row['ema_26']) if pd.notna(row['ema_26']) else None,
-                        float(row['ema_200']) if pd.notna(row['ema_200']) else None,
-                    ),
+                    rows,
+                    page_size=1000,
                 )
         
-        conn.commit()
+            conn.commit()
         logger.info(f"Indicadores avanzados calculados para {symbol}: {len(indicators_df)} filas")
         return len(indicators_df)
 
     except PsycopgError as e:
         logger.error(f"Error al guardar indicadores avanzados de {symbol}: {e}")
-        if conn and not conn.closed:
-            conn.rollback()
         raise
-    finally:
-        if conn and not conn.closed:
-            conn.close()
 
 
 # Ejemplo de uso
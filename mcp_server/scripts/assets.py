@@ -6,6 +6,7 @@ en símbolos válidos de Yahoo Finance, facilitando el uso de la API.
 """
 
 from enum import Enum
+from functools import lru_cache
 
 # Mapa de alias "humanos" -> símbolo real de yfinance
 # Permite usar nombres como "IBEX35" en lugar de "^IBEX"
@@ -89,6 +90,7 @@ class Market(str, Enum):
     nikkei = "NIKKEI"   # Japón - Nikkei 225
 
 
+@lru_cache(maxsize=128)
 def resolve_symbol(market_or_symbol: str) -> str:
     """Convierte nombres de mercado legibles en símbolos de Yahoo Finance.
     
@@ -28,28 +28,27 @@ USO VÁLIDO:
 """
 
 from datetime import date, timedelta
-from .config import get_db_conn           # o from .config import get_db_conn si usas paquete
-from .save_predictions import save_daily_predictions
+from .config import db_conn
+from .save_predictions import prediction_rows, save_predictions_bulk
 from .models import predict_ensemble      # o from .models import predict_ensemble
 import psycopg2
 
+# Cada cuántas fechas se vuelcan las predicciones acumuladas a la BD
+FLUSH_EVERY_N_DATES = 25
+
 
 def get_available_dates(symbol: str):
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT date
-                FROM prices
-                WHERE symbol = %s
-                ORDER BY date
-                """,
-                (symbol,),
-            )
-            rows = cur.fetchall()
-    finally:
-        conn.close()
+    with db_conn(readonly=True) as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT date
+            FROM prices
+            WHERE symbol = %s
+            ORDER BY date
+            """,
+            (symbol,),
+        )
+        rows = cur.fetchall()
 
     # Si rows son dicts: [{'date': ...}, ...]
     return [r["date"] for r in rows]
@@ -83,6 +82,10 @@ def backfill_predictions_for_symbol(symbol: str, start_date: date = None, end_da
 
     print(f"Backfill para {symbol} desde {start_date} hasta {end_date} ({len(dates)} días)")
 
+    # Las filas se acumulan y se guardan por lotes con COPY
+    pending_rows = []
+    pending_dates = 0
+
     for d in dates:
         # Aquí hay una decisión:
         # - d = fecha para la que quieres tener EL PRECIO REAL en prices.
@@ -125,18 +128,23 @@ def backfill_predictions_for_symbol(symbol: str, start_date: date = None, end_da
             }
 
         if predictions_dict:
-            save_daily_predictions(
-                symbol=symbol,
-                prediction_date=prediction_date,
-                run_date=run_date,
-                predictions=predictions_dict,
+            pending_rows.extend(
+                prediction_rows(symbol, prediction_date, run_date, predictions_dict)
             )
+            pending_dates += 1
+            if pending_dates >= FLUSH_EVERY_N_DATES:
+                save_predictions_bulk(pending_rows)
+                pending_rows = []
+                pending_dates = 0
             num_models = len([k for k in predictions_dict.keys() if k != "ensemble"])
             ensemble_signal = predictions_dict.get("ensemble", {}).get("signal", 0)
             print(f"✅ [{prediction_date}] {symbol}: {num_models} modelos, ensemble={ensemble_signal}")
         else:
             print(f"⚠️  [{prediction_date}] SIN predicciones para {symbol}")
 
+    if pending_rows:
+        save_predictions_bulk(pending_rows)
+
 
 if __name__ == "__main__":
     """
@@ -25,7 +25,7 @@ from sklearn.metrics import (
 from psycopg2 import Error as PsycopgError
 import json
 
-from .config import get_db_conn
+from .config import db_conn
 from . import logger
 
 
@@ -46,37 +46,36 @@ def load_historical_predictions(
         DataFrame con columnas: prediction_date, target_date, model_name, 
                                 predicted_direction, confidence, actual_price
     """
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            query = """
-                SELECT 
-                    p.prediction_date,
-                    p.target_date,
-                    p.model_name,
-                    p.predicted_direction,
-                    p.confidence,
-                    pr.close as actual_price
-                FROM ml_predictions p
-                LEFT JOIN prices pr 
-                    ON p.symbol = pr.symbol 
-                    AND p.target_date = pr.date
-                WHERE p.symbol = %s
-            """
-            params = [symbol]
+        with db_conn(readonly=True) as conn:
+            with conn.cursor() as cur:
+                query = """
+                    SELECT 
+                        p.prediction_date,
+                        p.target_date,
+                        p.model_name,
+                        p.predicted_direction,
+                        p.confidence,
+                        pr.close as actual_price
+                    FROM ml_predictions p
+                    LEFT JOIN prices pr 
+                        ON p.symbol = pr.symbol 
+                        AND p.target_date = pr.date
+                    WHERE p.symbol = %s
+                """
+                params = [symbol]
             
-            if start_date:
-                query += " AND p.target_date >= %s"
-                params.append(start_date)
-            if end_date:
-                query += " AND p.target_date <= %s"
-                params.append(end_date)
+                if start_date:
+                    query += " AND p.target_date >= %s"
+                    params.append(start_date)
+                if end_date:
+                    query += " AND p.target_date <= %s"
+                    params.append(end_date)
                 
-            query += " ORDER BY p.target_date, p.prediction_date, p.model_name"
+                query += " ORDER BY p.target_date, p.prediction_date, p.model_name"
             
-            cur.execute(query, tuple(params))
-            rows = cur.fetchall()
+                cur.execute(query, tuple(params))
+                rows = cur.fetchall()
             
         if not rows:
             logger.warning(f"No hay predicciones históricas para {symbol}")
@@ -91,9 +90,6 @@ def load_historical_predictions(
     except PsycopgError as e:
         logger.error(f"Error al cargar predicciones históricas: {e}")
         raise
-    finally:
-        if conn and not conn.closed:
-            conn.close()
 
 
 def calculate_actual_direction(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
@@ -107,15 +103,12 @@ def calculate_actual_direction(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
     Returns:
         DataFrame con columna 'actual_direction' añadida
     """
-    conn = None
     try:
-        conn = get_db_conn()
-        
         # Obtener precios de cierre para calcular dirección real
         dates = df['target_date'].unique()
         date_list = [d.date() if isinstance(d, pd.Timestamp) else d for d in dates]
         
-        with conn.cursor() as cur:
+        with db_conn(readonly=True) as conn, conn.cursor() as cur:
             cur.execute("""
                 SELECT date, close
                 FROM prices
@@ -156,9 +149,6 @@ def calculate_actual_direction(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
     except PsycopgError as e:
         logger.error(f"Error al calcular dirección real: {e}")
         raise
-    finally:
-        if conn and not conn.closed:
-            conn.close()
 
 
 def calculate_metrics(df: pd.DataFrame) -> Dict:
@@ -1,5 +1,5 @@
 import pandas as pd
-from .config import get_db_conn  # si va en paquete, sería from .config import get_db_conn
+from .config import db_conn
 
 
 def load_prices(conn):
@@ -50,12 +50,9 @@ def build_validation_dataset():
     - direction_pred (= predicted_signal)
     - acierto (True si direction_pred == direction_real)
     """
-    conn = get_db_conn()
-    try:
+    with db_conn(readonly=True) as conn:
         prices = load_prices(conn)
         preds = load_predictions(conn)
-    finally:
-        conn.close()
 
     # 1) Ordenar precios y calcular cierre del día anterior por símbolo
     prices = prices.sort_values(["symbol", "date"])
@@ -1,13 +1,23 @@
 """Módulo de configuración de base de datos.
 
-Gestiona la conexión a PostgreSQL utilizando variables de entorno
-y proporciona una conexión cacheada para mejorar el rendimiento.
+Gestiona la conexión a PostgreSQL utilizando variables de entorno.
+Además de conexiones sueltas (get_db_conn) ofrece un pool de conexiones
+por proceso (db_conn) para no pagar connect/auth en cada consulta.
 """
 
 import os
-from functools import lru_cache
+import threading
+from contextlib import contextmanager
 import psycopg2
+from psycopg2.extensions import (
+    DECIMAL,
+    TRANSACTION_STATUS_IDLE,
+    connection as _PgConnection,
+    new_type,
+    register_type,
+)
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 
 # Variables de entorno para conexión a PostgreSQL
 # Valores por defecto apuntan al contenedor Docker
@@ -17,19 +27,82 @@ DB_NAME = os.getenv("DB_NAME", "indices")
 DB_USER = os.getenv("DB_USER", "finanzas")
 DB_PASS = os.getenv("DB_PASS", "finanzas_pass")
 
+# Tamaño del pool de conexiones (por proceso)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 2))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 16))
+
+# NUMERIC -> float en todo el proceso (p.ej. AVG/SUM sobre enteros), así el
+# código que lee filas no necesita envolver cada columna en float()
+DEC2FLOAT = new_type(
+    DECIMAL.values,
+    "DEC2FLOAT",
+    lambda value, cur: float(value) if value is not None else None,
+)
+register_type(DEC2FLOAT)
+
+_pool = None
+_pool_pid = None
+_pool_slots = None  # Semáforo: espera en vez de PoolError si el pool está lleno
+_pool_lock = threading.Lock()
+
+
+class PreparingConnection(_PgConnection):
+    """Conexión que recuerda qué sentencias preparadas existen en su sesión.
+    
+    Las sentencias creadas con PREPARE viven mientras dure la sesión, así que
+    con conexiones del pool el plan se reutiliza entre llamadas (ver execute_prepared).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def prepare_statement(cur, name: str, sql: str, types: str = ""):
+    """Crea la sentencia preparada `name` en la sesión si aún no existe.
+    
+    Args:
+        cur: Cursor de una conexión creada con PreparingConnection
+        name: Nombre de la sentencia preparada (identificador SQL)
+        sql: Consulta con parámetros posicionales $1, $2, ...
+        types: Tipos opcionales de los parámetros, p.ej. "text, int"
+    """
+    conn = cur.connection
+    if name not in conn.prepared:
+        signature = f" ({types})" if types else ""
+        cur.execute(f"PREPARE {name}{signature} AS {sql}")
+        conn.prepared.add(name)
+
+
+def execute_prepared(cur, name: str, sql: str, params=(), types: str = ""):
+    """Ejecuta una sentencia preparada en el servidor (PREPARE una vez por conexión).
+    
+    Args:
+        cur: Cursor de una conexión creada con PreparingConnection
+        name: Nombre de la sentencia preparada (identificador SQL)
+        sql: Consulta con parámetros posicionales $1, $2, ...
+        params: Valores de los parámetros, en orden
+        types: Tipos opcionales de los parámetros, p.ej. "text, int"
+    """
+    prepare_statement(cur, name, sql, types)
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders})", params)
+    else:
+        cur.execute(f"EXECUTE {name}")
+
+
 def get_db_conn():
-    """Obtiene una conexión a la base de datos PostgreSQL.
+    """Obtiene una conexión nueva a la base de datos PostgreSQL.
     
-    Utiliza @lru_cache para reutilizar la misma conexión y evitar
-    crear múltiples conexiones innecesarias. Los resultados se devuelven
-    como diccionarios gracias a RealDictCursor.
+    Los resultados se devuelven como diccionarios gracias a RealDictCursor.
     
     Returns:
         psycopg2.connection: Conexión activa a PostgreSQL con cursor tipo dict
         
     Note:
-        La conexión se cachea, por lo que llamadas sucesivas retornan
-        la misma instancia de conexión.
+        Cada llamada abre una conexión nueva que el llamador debe cerrar.
+        Para consultas frecuentes es preferible db_conn() (pool).
     """
     conn = psycopg2.connect(
         host=DB_HOST,
@@ -37,6 +110,80 @@ def get_db_conn():
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASS,
+        connection_factory=PreparingConnection,
         cursor_factory=RealDictCursor,  # Devuelve resultados como dict
     )
-    return conn
\ No newline at end of file
+    return conn
+
+
+def get_db_pool() -> ThreadedConnectionPool:
+    """Devuelve el pool de conexiones del proceso (se crea en el primer uso).
+    
+    Si el proceso es un fork (p.ej. un worker de multiprocessing), crea un
+    pool propio en lugar de reutilizar los sockets heredados del padre.
+    """
+    global _pool, _pool_pid, _pool_slots
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ThreadedConnectionPool(
+                    DB_POOL_MIN,
+                    DB_POOL_MAX,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASS,
+                    connection_factory=PreparingConnection,
+                    cursor_factory=RealDictCursor,
+                )
+                _pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+                _pool_pid = pid
+    return _pool
+
+
+@contextmanager
+def db_conn(readonly: bool = False):
+    """Presta una conexión del pool y la devuelve al salir del bloque.
+    
+    Uso:
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                ...
+            conn.commit()
+    
+    Args:
+        readonly: Si True, la conexión se presta en modo autocommit: cada SELECT
+            se ejecuta sin BEGIN/COMMIT (un round-trip menos). Solo para lecturas.
+    
+    Note:
+        - El commit es responsabilidad del llamador
+        - Si el bloque lanza una excepción (o no hace commit) la transacción
+          se descarta con rollback al devolver la conexión
+        - Si las DB_POOL_MAX conexiones están prestadas, espera a que se libere una
+    """
+    pool = get_db_pool()
+    slots = _pool_slots
+    slots.acquire()
+    try:
+        conn = pool.getconn()
+    except Exception:
+        slots.release()
+        raise
+
+    try:
+        if readonly:
+            conn.autocommit = True
+        yield conn
+    finally:
+        try:
+            if not conn.closed:
+                if conn.autocommit:
+                    conn.autocommit = False
+                elif conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    # No devolver al pool una conexión con una transacción a medias
+                    conn.rollback()
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+            slots.release()
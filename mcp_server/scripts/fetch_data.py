@@ -8,8 +8,9 @@ y su almacenamiento en la base de datos PostgreSQL.
 import yfinance as yf
 import pandas as pd
 from psycopg2 import Error as PsycopgError
+from psycopg2.extras import execute_values
 
-from .config import get_db_conn
+from .config import db_conn
 from . import logger
 
 
@@ -110,25 +111,40 @@ def update_prices_for_symbol(symbol: str, period: str = "1mo") -> int:
             f"Columnas disponibles: {list(df.columns)}"
         )
 
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            for date, row in df.iterrows():
-                # close / adj_close
-                adj_close = float(row[close_col])
-
-                # volume: si es NaN, lo ponemos a 0
-                vol_val = row[vol_col]
-                if pd.isna(vol_val):
-                    volume = 0
-                else:
-                    volume = int(vol_val)
-
-                cur.execute(
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                # Posiciones de columna en las tuplas de itertuples (0 = índice)
+                col_idx = {c: i + 1 for i, c in enumerate(df.columns)}
+                i_open, i_high, i_low = col_idx[open_col], col_idx[high_col], col_idx[low_col]
+                i_close, i_vol = col_idx[close_col], col_idx[vol_col]
+
+                rows = []
+                for row in df.itertuples(index=True, name=None):
+                    # volume: si es NaN, lo ponemos a 0
+                    vol_val = row[i_vol]
+                    volume = 0 if vol_val != vol_val else int(vol_val)
+
+                    close = float(row[i_close])
+                    rows.append(
+                        (
+                            symbol,
+                            row[0].date(),
+                            float(row[i_open]),
+                            float(row[i_high]),
+                            float(row[i_low]),
+                            close,
+                            close,  # adj_close
+                            volume,
+                        )
+                    )
+
+                # Un único INSERT multi-fila por página en vez de uno por fila
+                execute_values(
+                    cur,
                     """
                     INSERT INTO prices (symbol, date, open, high, low, close, adj_close, volume)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+                    VALUES %s
                     ON CONFLICT (symbol, date) DO UPDATE
                     SET open      = EXCLUDED.open,
                         high      = EXCLUDED.high,
@@ -137,28 +153,14 @@ def update_prices_for_symbol(symbol: str, period: str = "1mo") -> int:
                         adj_close = EXCLUDED.adj_close,
                         volume    = EXCLUDED.volume;
                     """,
-                    (
-                        symbol,
-                        date.date(),
-                        float(row[open_col]),
-                        float(row[high_col]),
-                        float(row[low_col]),
-                        float(row[close_col]),
-                        adj_close,
-                        volume,
-                    ),
+                    rows,
+                    page_size=1000,
                 )
 
-        conn.commit()
+            conn.commit()
         logger.info(f"Insertadas/actualizadas {len(df)} filas de {symbol}")
         return len(df)
 
     except PsycopgError as e:
         logger.error(f"Error de Postgres al actualizar precios: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
-
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
@@ -11,7 +11,8 @@ Todos los indicadores se guardan en la tabla 'indicators' de la BD.
 
 import pandas as pd
 from psycopg2 import Error as PsycopgError
-from .config import get_db_conn
+from psycopg2.extras import execute_values
+from .config import db_conn
 from . import logger
 
 
@@ -29,30 +30,23 @@ def _load_prices(symbol: str) -> pd.DataFrame:
         pd.DataFrame: DataFrame indexado por fecha con columna 'Close'
                      vacío si no hay datos
     """
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT date, close
-                FROM prices
-                WHERE symbol = %s
-                ORDER BY date
-                """,
-                (symbol,),
-            )
-            rows = cur.fetchall()
+        with db_conn(readonly=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT date, close
+                    FROM prices
+                    WHERE symbol = %s
+                    ORDER BY date
+                    """,
+                    (symbol,),
+                )
+                rows = cur.fetchall()
         # solo lectura → no hace falta commit
     except PsycopgError as e:
         logger.error(f"Error de Postgres al cargar precios de {symbol}: {e}")
-        # en lectura normalmente no hace falta rollback, pero por si acaso:
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
 
     if not rows:
         logger.warning(f"No hay precios en BD para {symbol}")
@@ -137,40 +131,39 @@ def compute_indicators_for_symbol(symbol: str) -> int:
         logger.warning(f"No se han podido calcular indicadores para {symbol} (muy pocos datos)")
         return 0
 
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            for date, row in ind_df.iterrows():
-                cur.execute(
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                cols = ["sma_20", "sma_50", "vol_20", "rsi_14"]
+                rows = [
+                    (
+                        symbol,
+                        date.date(),
+                        float(sma_20) if sma_20 == sma_20 else None,
+                        float(sma_50) if sma_50 == sma_50 else None,
+                        float(vol_20) if vol_20 == vol_20 else None,
+                        float(rsi_14) if rsi_14 == rsi_14 else None,
+                    )
+                    for date, sma_20, sma_50, vol_20, rsi_14 in ind_df[cols].itertuples(index=True, name=None)
+                ]
+                execute_values(
+                    cur,
                     """
                     INSERT INTO indicators (symbol, date, sma_20, sma_50, vol_20, rsi_14)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    VALUES %s
                     ON CONFLICT (symbol, date) DO UPDATE
                     SET sma_20 = EXCLUDED.sma_20,
                         sma_50 = EXCLUDED.sma_50,
                         vol_20 = EXCLUDED.vol_20,
                         rsi_14 = EXCLUDED.rsi_14;
                     """,
-                    (
-                        symbol,
-                        date.date(),
-                        float(row["sma_20"]) if pd.notna(row["sma_20"]) else None,
-                        float(row["sma_50"]) if pd.notna(row["sma_50"]) else None,
-                        float(row["vol_20"]) if pd.notna(row["vol_20"]) else None,
-                        float(row["rsi_14"]) if pd.notna(row["rsi_14"]) else None,
-                    ),
+                    rows,
+                    page_size=1000,
                 )
-        conn.commit()
+            conn.commit()
         logger.info(f"Indicadores calculados/actualizados para {symbol}: {len(ind_df)} filas")
         return len(ind_df)
 
     except PsycopgError as e:
         logger.error(f"Error de Postgres al guardar indicadores de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
-
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
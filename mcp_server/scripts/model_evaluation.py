@@ -7,7 +7,7 @@ de reentrenamiento y selección de modelos.
 from datetime import date, timedelta
 from typing import Dict, List, Any
 from psycopg2 import Error as PsycopgError
-from .config import get_db_conn
+from .config import db_conn
 from . import logger
 
 
@@ -40,57 +40,56 @@ def get_model_performance_report(
     if end_date is None:
         end_date = date.today()
     
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            # Obtener métricas agregadas por modelo
-            cur.execute(
-                """
-                SELECT 
-                    model_name,
-                    COUNT(*) as n_predictions,
-                    AVG(error_abs) as avg_mae,
-                    SQRT(AVG(POWER(error_abs, 2))) as rmse,
-                    MIN(error_abs) as best_prediction,
-                    MAX(error_abs) as worst_prediction,
-                    AVG(predicted_value) as avg_predicted,
-                    AVG(true_value) as avg_actual,
-                    STDDEV(error_abs) as std_error
-                FROM ml_predictions
-                WHERE symbol = %s
-                  AND true_value IS NOT NULL
-                  AND prediction_date BETWEEN %s AND %s
-                GROUP BY model_name
-                HAVING COUNT(*) >= %s
-                ORDER BY avg_mae ASC;
-                """,
-                (symbol, start_date, end_date, min_predictions),
-            )
-            performance_rows = cur.fetchall()
+        with db_conn(readonly=True) as conn:
+            with conn.cursor() as cur:
+                # Obtener métricas agregadas por modelo
+                cur.execute(
+                    """
+                    SELECT 
+                        model_name,
+                        COUNT(*) as n_predictions,
+                        AVG(error_abs) as avg_mae,
+                        SQRT(AVG(POWER(error_abs, 2))) as rmse,
+                        MIN(error_abs) as best_prediction,
+                        MAX(error_abs) as worst_prediction,
+                        AVG(predicted_value) as avg_predicted,
+                        AVG(true_value) as avg_actual,
+                        STDDEV(error_abs) as std_error
+                    FROM ml_predictions
+                    WHERE symbol = %s
+                      AND true_value IS NOT NULL
+                      AND prediction_date BETWEEN %s AND %s
+                    GROUP BY model_name
+                    HAVING COUNT(*) >= %s
+                    ORDER BY avg_mae ASC;
+                    """,
+                    (symbol, start_date, end_date, min_predictions),
+                )
+                performance_rows = cur.fetchall()
             
-            # Obtener accuracy de señales (si predicted_signal existe)
-            cur.execute(
-                """
-                SELECT 
-                    model_name,
-                    COUNT(CASE WHEN predicted_signal = 1 
-                           AND predicted_value < true_value THEN 1 END) as correct_buys,
-                    COUNT(CASE WHEN predicted_signal = 1 THEN 1 END) as total_buys,
-                    COUNT(CASE WHEN predicted_signal = -1 
-                           AND predicted_value > true_value THEN 1 END) as correct_sells,
-                    COUNT(CASE WHEN predicted_signal = -1 THEN 1 END) as total_sells,
-                    COUNT(*) as total_predictions
-                FROM ml_predictions
-                WHERE symbol = %s
-                  AND true_value IS NOT NULL
-                  AND predicted_signal IS NOT NULL
-                  AND prediction_date BETWEEN %s AND %s
-                GROUP BY model_name;
-                """,
-                (symbol, start_date, end_date),
-            )
-            signal_rows = cur.fetchall()
+                # Obtener accuracy de señales (si predicted_signal existe)
+                cur.execute(
+                    """
+                    SELECT 
+                        model_name,
+                        COUNT(CASE WHEN predicted_signal = 1 
+                               AND predicted_value < true_value THEN 1 END) as correct_buys,
+                        COUNT(CASE WHEN predicted_signal = 1 THEN 1 END) as total_buys,
+                        COUNT(CASE WHEN predicted_signal = -1 
+                               AND predicted_value > true_value THEN 1 END) as correct_sells,
+                        COUNT(CASE WHEN predicted_signal = -1 THEN 1 END) as total_sells,
+                        COUNT(*) as total_predictions
+                    FROM ml_predictions
+                    WHERE symbol = %s
+                      AND true_value IS NOT NULL
+                      AND predicted_signal IS NOT NULL
+                      AND prediction_date BETWEEN %s AND %s
+                    GROUP BY model_name;
+                    """,
+                    (symbol, start_date, end_date),
+                )
+                signal_rows = cur.fetchall()
         
         # Procesar resultados
         models_analysis = []
@@ -175,17 +174,12 @@ def get_model_performance_report(
     
     except PsycopgError as e:
         logger.error(f"Error al generar reporte de rendimiento para {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         return {
             "symbol": symbol,
             "error": "database_error",
             "message": str(e),
             "models": [],
         }
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
 
 
 def should_retrain_models(symbol: str, mae_threshold: float = 200.0) -> Dict[str, Any]:
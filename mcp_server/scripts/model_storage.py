@@ -1,7 +1,8 @@
 # mcp_server/scripts/model_storage.py
 
 import os
-import pickle
+import shutil
+import threading
 import joblib
 from datetime import datetime
 from pathlib import Path
@@ -13,6 +14,17 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 MODELS_DIR = PROJECT_ROOT / "data" / "models"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Modelos cuyo estado son arrays NumPy: se guardan sin comprimir para poder
+# cargarlos con mmap_mode="r" (joblib no puede mapear ficheros comprimidos).
+# Prophet y los boosters guardan su estado en objetos propios, así que para
+# ellos compensa más comprimir.
+MMAP_MODELS = {"LinearRegression", "RandomForest", "SVR"}
+
+# Modelos ya cargados en memoria: (symbol, model_name, date) -> (mtime, model_data).
+# Se reutilizan mientras el fichero en disco no cambie (mismo mtime).
+_loaded_models: dict = {}
+_loaded_models_lock = threading.Lock()
+
 
 def get_model_path(symbol: str, model_name: str, date: str = None) -> Path:
     """
@@ -61,14 +73,15 @@ def save_model(model, symbol: str, model_name: str, date: str = None, metadata:
         "metadata": metadata or {}
     }
     
+    compress = 0 if model_name in MMAP_MODELS else 3
+
     try:
-        with open(model_path, "wb") as f:
-            pickle.dump(model_data, f)
+        joblib.dump(model_data, model_path, compress=compress, protocol=5)
         
         # También guardar como "latest" para acceso rápido
         latest_path = get_model_path(symbol, model_name, "latest")
-        with open(latest_path, "wb") as f:
-            pickle.dump(model_data, f)
+        if latest_path != model_path:
+            shutil.copyfile(model_path, latest_path)
         
         logger.info(f"✅ Modelo guardado: {model_path}")
         return True
@@ -87,20 +100,33 @@ def load_model(symbol: str, model_name: str, date: str = None):
         date: Fecha específica (YYYY-MM-DD) o None para cargar el último
     
     Returns:
-        Diccionario con modelo y metadata, o None si no existe
+        Diccionario con modelo y metadata, o None si no existe.
+        El diccionario se comparte entre llamadas (caché en memoria):
+        no modificarlo.
     """
     if date is None:
         date = "latest"
     
     model_path = get_model_path(symbol, model_name, date)
     
-    if not model_path.exists():
+    try:
+        mtime = os.path.getmtime(model_path)
+    except OSError:
         logger.warning(f"⚠️ Modelo no encontrado: {model_path}")
         return None
     
+    key = (symbol, model_name, date)
+    with _loaded_models_lock:
+        cached = _loaded_models.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
     try:
-        with open(model_path, "rb") as f:
-            model_data = pickle.load(f)
+        mmap_mode = "r" if model_name in MMAP_MODELS else None
+        model_data = joblib.load(model_path, mmap_mode=mmap_mode)
+        
+        with _loaded_models_lock:
+            _loaded_models[key] = (mtime, model_data)
         
         logger.info(f"✅ Modelo cargado: {model_path}")
         return model_data
@@ -117,6 +143,18 @@ def model_exists(symbol: str, model_name: str, date: str = None) -> bool:
     return model_path.exists()
 
 
+def get_models_signature(symbol: str) -> tuple:
+    """
+    Firma barata de los modelos 'latest' de un símbolo: (fichero, mtime) de
+    cada uno. Cambia cada vez que se reentrena o se borra un modelo.
+    """
+    safe_symbol = symbol.replace("^", "").replace("/", "_")
+    return tuple(sorted(
+        (file.name, file.stat().st_mtime_ns)
+        for file in MODELS_DIR.glob(f"{safe_symbol}_*_latest.pkl")
+    ))
+
+
 def delete_old_models(symbol: str, keep_latest: int = 5):
     """
     Elimina modelos antiguos, conservando solo los últimos N días.
@@ -171,8 +209,7 @@ def get_model_info(symbol: str) -> dict:
     models_info = []
     for file in model_files:
         try:
-            with open(file, "rb") as f:
-                model_data = pickle.load(f)
+            model_data = joblib.load(file)
             
             models_info.append({
                 "file": file.name,
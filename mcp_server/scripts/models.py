@@ -1,5 +1,14 @@
 # mcp_server/scripts/models.py
 
+import copy
+import os
+import csv
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -11,19 +20,79 @@ from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
 from catboost import CatBoostRegressor
 from prophet import Prophet
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from math import sqrt
 import optuna
+from optuna_integration import LightGBMPruningCallback, XGBoostPruningCallback
 from skopt import BayesSearchCV
 from skopt.space import Real, Integer, Categorical
+from numba import njit, prange
 import warnings
 warnings.filterwarnings('ignore', category=optuna.exceptions.ExperimentalWarning)
+optuna.logging.set_verbosity(optuna.logging.WARNING)
 
-from .config import get_db_conn
+from .config import db_conn
 from . import logger
-from .model_storage import save_model, load_model, model_exists
+from .model_storage import save_model, load_model, model_exists, get_models_signature
 from psycopg2 import Error as PsycopgError
 
+# GPU opcional para los boosters (XGBoost, LightGBM, CatBoost).
+# ML_USE_GPU: "0" fuerza CPU; "auto" (por defecto) o "1" usan GPU en cada
+# librería que la supere en una prueba mínima ("1" avisa si alguna no puede).
+ML_USE_GPU = os.getenv("ML_USE_GPU", "auto").strip().lower()
+
+
+def _probe_xgboost_gpu() -> bool:
+    import xgboost
+    if not xgboost.build_info().get("USE_CUDA"):
+        return False
+    probe = xgboost.DMatrix(np.zeros((2, 1)), label=np.zeros(2))
+    booster = xgboost.train({"device": "cuda", "tree_method": "hist"}, probe, num_boost_round=1)
+    # Sin GPU visible XGBoost cae a CPU con un warning: mirar el device efectivo
+    config = json.loads(booster.save_config())
+    return config["learner"]["generic_param"]["device"].startswith("cuda")
+
+
+def _probe_lightgbm_gpu() -> bool:
+    # device_type="gpu" es el backend OpenCL: el wheel estándar de pip no lo trae y fit() falla
+    LGBMRegressor(n_estimators=1, device_type="gpu", verbose=-1).fit(
+        np.arange(4.0).reshape(-1, 1), np.arange(4.0))
+    return True
+
+
+def _probe_catboost_gpu() -> bool:
+    CatBoostRegressor(iterations=1, task_type="GPU", silent=True, allow_writing_files=False).fit(
+        np.arange(4.0).reshape(-1, 1), np.arange(4.0))
+    return True
+
+
+_GPU_PROBES = {
+    "XGBoost": _probe_xgboost_gpu,
+    "LightGBM": _probe_lightgbm_gpu,
+    "CatBoost": _probe_catboost_gpu,
+}
+
+
+@lru_cache(maxsize=None)
+def _gpu_available(library: str) -> bool:
+    """Indica si `library` puede entrenar en GPU (se comprueba una vez por proceso).
+
+    Cada librería tiene su propio backend (XGBoost CUDA, LightGBM OpenCL,
+    CatBoost CUDA), así que se prueba entrenando un modelo mínimo con cada una.
+    """
+    if ML_USE_GPU in ("0", "false", "no"):
+        return False
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            available = _GPU_PROBES[library]()
+    except Exception as e:
+        logger.debug(f"GPU no disponible para {library}: {e}")
+        available = False
+    if available:
+        logger.info(f"🚀 {library} entrenará en GPU")
+    elif ML_USE_GPU in ("1", "true", "yes"):
+        logger.warning(f"⚠️ ML_USE_GPU={ML_USE_GPU} pero {library} no puede usar la GPU; se entrena en CPU")
+    return available
+
 
 def _load_features(symbol: str, as_of_date=None) -> pd.DataFrame:
     """
@@ -35,61 +104,54 @@ def _load_features(symbol: str, as_of_date=None) -> pd.DataFrame:
         as_of_date: Si se especifica (date), solo carga datos hasta esa fecha.
                    Útil para backfill sin look-ahead bias.
     """
-    conn = None
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            if as_of_date:
-                # Filtrar datos hasta as_of_date (sin información del futuro)
-                cur.execute(
-                    """
-                    SELECT
-                        p.date,
-                        p.close,
-                        i.sma_20,
-                        i.sma_50,
-                        i.vol_20,
-                        i.rsi_14
-                    FROM prices p
-                    LEFT JOIN indicators i
-                        ON p.symbol = i.symbol
-                       AND p.date = i.date
-                    WHERE p.symbol = %s AND p.date <= %s
-                    ORDER BY p.date
-                    """,
-                    (symbol, as_of_date),
-                )
-            else:
-                # Comportamiento original: todos los datos
-                cur.execute(
-                    """
-                    SELECT
-                        p.date,
-                        p.close,
-                        i.sma_20,
-                        i.sma_50,
-                        i.vol_20,
-                        i.rsi_14
-                    FROM prices p
-                    LEFT JOIN indicators i
-                        ON p.symbol = i.symbol
-                       AND p.date = i.date
-                    WHERE p.symbol = %s
-                    ORDER BY p.date
-                    """,
-                    (symbol,),
-                )
-            rows = cur.fetchall()
-        # solo lectura, no hace falta commit
+        with db_conn(readonly=True) as conn:
+            with conn.cursor() as cur:
+                if as_of_date:
+                    # Filtrar datos hasta as_of_date (sin información del futuro)
+                    cur.execute(
+                        """
+                        SELECT
+                            p.date,
+                            p.close,
+                            i.sma_20,
+                            i.sma_50,
+                            i.vol_20,
+                            i.rsi_14
+                        FROM prices p
+                        LEFT JOIN indicators i
+                            ON p.symbol = i.symbol
+                           AND p.date = i.date
+                        WHERE p.symbol = %s AND p.date <= %s
+                        ORDER BY p.date
+                        """,
+                        (symbol, as_of_date),
+                    )
+                else:
+                    # Comportamiento original: todos los datos
+                    cur.execute(
+                        """
+                        SELECT
+                            p.date,
+                            p.close,
+                            i.sma_20,
+                            i.sma_50,
+                            i.vol_20,
+                            i.rsi_14
+                        FROM prices p
+                        LEFT JOIN indicators i
+                            ON p.symbol = i.symbol
+                           AND p.date = i.date
+                        WHERE p.symbol = %s
+                        ORDER BY p.date
+                        """,
+                        (symbol,),
+                    )
+                rows = cur.fetchall()
 
     except PsycopgError as e:
         logger.error(f"Error de Postgres al cargar features para {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
 
     if not rows:
         logger.warning(f"No hay datos de precios/indicadores para {symbol}")
@@ -108,9 +170,11 @@ def _load_features(symbol: str, as_of_date=None) -> pd.DataFrame:
 
 
 def evaluate_model(y_true, y_pred):
-    """Calcula MAE y RMSE para evaluar modelos."""
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = sqrt(mean_squared_error(y_true, y_pred))
+    """Calcula MAE y RMSE para evaluar modelos (una sola pasada sobre los residuos)."""
+    # np.asarray: comparar por posición, no por índice (Prophet pasa Series con índices distintos)
+    d = np.asarray(y_true, dtype=np.float64) - np.asarray(y_pred, dtype=np.float64)
+    mae = float(np.abs(d).mean())
+    rmse = float(np.sqrt(np.dot(d, d) / d.size))
     return mae, rmse
 
 
@@ -157,9 +221,71 @@ PARAM_SPACES = {
 }
 
 
+# Modelos con evaluación por iteración: se pueden podar trials con Optuna
+PRUNABLE_MODELS = {"XGBoost", "LightGBM"}
+
+
+def _suggest_params(trial, param_space: dict) -> dict:
+    """Traduce un espacio de búsqueda de skopt (PARAM_SPACES) a sugerencias de Optuna."""
+    params = {}
+    for name, dim in param_space.items():
+        if isinstance(dim, Integer):
+            params[name] = trial.suggest_int(name, int(dim.low), int(dim.high))
+        elif isinstance(dim, Real):
+            params[name] = trial.suggest_float(name, dim.low, dim.high, log=(dim.prior == "log-uniform"))
+        else:
+            params[name] = trial.suggest_categorical(name, list(dim.categories))
+    return params
+
+
+def _optimize_with_pruning(model_class, param_space, X_train, y_train, n_iter: int):
+    """
+    Búsqueda con Optuna (TPE + MedianPruner) para XGBoost/LightGBM.
+    
+    Valida sobre el último 20% del histórico (orden temporal) e informa la
+    métrica de validación en cada iteración, así los trials claramente peores
+    que la mediana se abortan a los pocos árboles.
+    
+    Returns:
+        (mejores parámetros, mejor MAE en validación)
+    """
+    split = int(len(X_train) * 0.8)
+    X_tr, X_val = X_train[:split], X_train[split:]
+    y_tr, y_val = y_train[:split], y_train[split:]
+
+    def objective(trial):
+        params = _suggest_params(trial, param_space)
+        if model_class is XGBRegressor:
+            model = XGBRegressor(
+                **params,
+                eval_metric="rmse",
+                callbacks=[XGBoostPruningCallback(trial, "validation_0-rmse")],
+            )
+            model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
+        else:
+            model = LGBMRegressor(**params, verbose=-1)
+            model.fit(
+                X_tr, y_tr,
+                eval_set=[(X_val, y_val)],
+                eval_metric="l2",
+                callbacks=[LightGBMPruningCallback(trial, "l2")],
+            )
+        mae, _ = evaluate_model(y_val, model.predict(X_val))
+        return mae
+
+    study = optuna.create_study(
+        direction="minimize",
+        sampler=optuna.samplers.TPESampler(seed=42),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=20),
+    )
+    study.optimize(objective, n_trials=n_iter)
+    return study.best_params, study.best_value
+
+
 def optimize_hyperparameters(model_class, param_space, X_train, y_train, model_name: str, n_iter: int = 20):
     """
-    Optimiza hiperparámetros usando Bayesian Optimization con BayesSearchCV.
+    Optimiza hiperparámetros usando Bayesian Optimization con BayesSearchCV
+    (XGBoost y LightGBM usan Optuna con poda de trials).
     
     Args:
         model_class: Clase del modelo (ej: RandomForestRegressor)
@@ -175,6 +301,15 @@ def optimize_hyperparameters(model_class, param_space, X_train, y_train, model_n
     logger.info(f"🔍 Optimizando hiperparámetros para {model_name}...")
     
     try:
+        # Boosters: Optuna con poda de trials malos (early-stopping por iteración)
+        if model_name in PRUNABLE_MODELS:
+            best_params, best_score = _optimize_with_pruning(
+                model_class, param_space, X_train, y_train, n_iter
+            )
+            logger.info(f"✅ {model_name} - Mejor MAE en validación: {best_score:.2f}")
+            logger.info(f"📊 Mejores parámetros: {best_params}")
+            return best_params
+        
         # Configurar BayesSearchCV
         opt = BayesSearchCV(
             estimator=model_class(),
@@ -221,18 +356,15 @@ def load_best_params(symbol: str, model_name: str):
 # REGLAS BASADAS EN INDICADORES
 # ========================================================================
 
-def _rule_based_signal(row: pd.Series) -> int:
+def _rule_based_signal(close: float, sma20: float, rsi: float) -> int:
     """
     Modelo simple basado en reglas:
     +1 → cierre por encima de SMA20 y RSI entre 40 y 70
     -1 → cierre por debajo de SMA20 y RSI entre 30 y 60
      0 → resto (neutral o sobrecompra/sobreventa)
     """
-    close = row["close"]
-    sma20 = row["sma_20"]
-    rsi = row["rsi_14"]
-
-    if pd.isna(close) or pd.isna(sma20) or pd.isna(rsi):
+    # x != x solo es cierto para NaN (más barato que pd.isna sobre escalares)
+    if close != close or sma20 != sma20 or rsi != rsi:
         return 0
 
     if (close > sma20) and (40 <= rsi <= 70):
@@ -242,22 +374,17 @@ def _rule_based_signal(row: pd.Series) -> int:
     return 0
 
 
-def _rule_based_signal_alt(row: pd.Series) -> int:
+def _rule_based_signal_alt(close: float, sma20: float, rsi: float, vol20: float) -> int:
     """
     Segunda variante: tiene en cuenta volatilidad y RSI.
     +1 → close > sma20 y vol_20 baja y RSI < 65
     -1 → close < sma20 y vol_20 alta o RSI > 75
      0 → resto
     """
-    close = row["close"]
-    sma20 = row["sma_20"]
-    vol20 = row["vol_20"]
-    rsi = row["rsi_14"]
-
-    if pd.isna(close) or pd.isna(sma20) or pd.isna(rsi):
+    if close != close or sma20 != sma20 or rsi != rsi:
         return 0
 
-    if pd.isna(vol20):
+    if vol20 != vol20:
         vol20 = 0.01
 
     if (close > sma20) and (vol20 < 0.01) and (rsi < 65):
@@ -267,32 +394,137 @@ def _rule_based_signal_alt(row: pd.Series) -> int:
     return 0
 
 
-def _rule_based_signal_contrarian(row: pd.Series) -> int:
+def _rule_based_signal_contrarian(rsi: float) -> int:
     """
     Tercera variante 'contrarian':
     +1 → RSI < 30 (sobreventa)
     -1 → RSI > 70 (sobrecompra)
      0 → resto
     """
-    rsi = row["rsi_14"]
-    if pd.isna(rsi):
-        return 0
-    if rsi < 30:
-        return 1
-    if rsi > 70:
-        return -1
-    return 0
+    # Sin ramas: las comparaciones con NaN son False, así que NaN → 0
+    return int(rsi < 30) - int(rsi > 70)
+
+
+@njit(parallel=True, cache=True)
+def _signals_kernel(close, sma, rsi, vol):
+    """
+    Versión compilada (numba) de las 3 reglas para series completas.
+    Recorre close/sma_20/rsi_14/vol_20 una sola vez y devuelve s1, s2, s3
+    y la votación (signo de la suma, equivalente a media > 0.2 / < -0.2).
+
+    Nota: sin fastmath, que asume que no hay NaN y rompería los np.isnan.
+    """
+    n = close.size
+    s1 = np.empty(n, np.int8)
+    s2 = np.empty(n, np.int8)
+    s3 = np.empty(n, np.int8)
+    voted = np.empty(n, np.int8)
+
+    for i in prange(n):
+        c = close[i]
+        s = sma[i]
+        r = rsi[i]
+        v = vol[i]
+
+        # Regla 1 y 2 necesitan close, sma_20 y rsi_14
+        a = 0
+        b = 0
+        if not (np.isnan(c) or np.isnan(s) or np.isnan(r)):
+            if c > s and 40 <= r <= 70:
+                a = 1
+            elif c < s and 30 <= r <= 60:
+                a = -1
+
+            if np.isnan(v):
+                v = 0.01
+            if c > s and v < 0.01 and r < 65:
+                b = 1
+            elif c < s and (v > 0.015 or r > 75):
+                b = -1
+
+        # Regla contrarian: solo depende del RSI (sin ramas, NaN → 0)
+        d = int(r < 30) - int(r > 70)
+
+        s1[i] = a
+        s2[i] = b
+        s3[i] = d
+        voted[i] = np.sign(a + b + d)
+
+    return s1, s2, s3, voted
 
 
 # ========================================================================
 # MODELOS DE MACHINE LEARNING CON PERSISTENCIA
 # ========================================================================
 
+# Caché LRU de resultados ML del ensemble en modo LIVE.
+# Clave: (symbol, última fecha, hash de la última fila de features, firma de
+# los modelos en disco). Mientras no entre una barra nueva ni se reentrene,
+# las peticiones repetidas (dashboard, bot, MCP) no vuelven a predecir.
+_ENSEMBLE_CACHE_SIZE = 256
+_ensemble_cache: "OrderedDict[tuple, list]" = OrderedDict()
+_ensemble_cache_lock = threading.Lock()
+
+
+def _ensemble_cache_key(symbol: str, df: pd.DataFrame) -> tuple:
+    """Construye la clave de caché del ensemble para el último dato de df."""
+    last_values = df.iloc[-1].to_numpy(dtype=np.float64)
+    feat_hash = hashlib.blake2b(last_values.tobytes(), digest_size=16).hexdigest()
+    return (symbol, df.index[-1].isoformat(), len(df), feat_hash, get_models_signature(symbol))
+
+
+def _fit_prophet(df_clean: pd.DataFrame, symbol: str, today: str):
+    """
+    Entrena Prophet sobre el histórico de cierres, lo guarda y devuelve
+    (predicción siguiente día, MAE, RMSE).
+    """
+    model_name = "Prophet"
+    logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
+    prophet_df = pd.DataFrame({"ds": df_clean.index, "y": df_clean["close"]})
+    prophet = Prophet(daily_seasonality=True)
+    prophet.fit(prophet_df)
+    
+    future = prophet.make_future_dataframe(periods=1)
+    forecast = prophet.predict(future)
+    prophet_pred = forecast["yhat"].iloc[-1]
+    prophet_mae, prophet_rmse = evaluate_model(prophet_df["y"], forecast["yhat"][:-1])
+    
+    metadata = {"MAE": float(prophet_mae), "RMSE": float(prophet_rmse), "n_samples": len(prophet_df)}
+    save_model(prophet, symbol, model_name, today, metadata)
+    return prophet_pred, prophet_mae, prophet_rmse
+
+
+def refit_prophet_model(symbol: str) -> bool:
+    """
+    Reentrena y guarda el modelo Prophet de un símbolo.
+    
+    Pensado para ejecutarse fuera de la ruta online (job diario del
+    scheduler): predict_ensemble solo carga el modelo guardado.
+    
+    Returns:
+        True si se ha entrenado y guardado el modelo
+    """
+    df = _load_features(symbol)
+    df_clean = df.dropna()
+    if len(df_clean) < 50:
+        logger.warning(f"No hay suficientes datos para entrenar Prophet para {symbol}")
+        return False
+    
+    today = datetime.now().strftime("%Y-%m-%d")
+    _fit_prophet(df_clean, symbol, today)
+    return True
+
+
+# Orden fijo de los modelos ML (posición en los arrays de resultados)
+ML_MODEL_NAMES = ["LinearRegression", "RandomForest", "Prophet", "XGBoost", "SVR", "LightGBM", "CatBoost"]
+
+
 def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: bool = False, tune_hyperparams: bool = False) -> list:
     """
     Entrena y predice con 7 modelos de ML.
     - Si force_retrain=False, intenta cargar modelos guardados
     - Si no existen, entrena nuevos y los guarda automáticamente
+      (salvo Prophet, que se omite y lo reentrena el scheduler)
     - Si tune_hyperparams=True, optimiza hiperparámetros antes de entrenar
     
     Args:
@@ -306,6 +538,26 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
     """
     results = []
     today = datetime.now().strftime("%Y-%m-%d")
+
+    # Resultados en arrays preasignados (un hueco por modelo, en este orden);
+    # los dicts de salida se construyen una sola vez al final.
+    n_models = len(ML_MODEL_NAMES)
+    filled = np.zeros(n_models, dtype=bool)
+    preds = np.zeros(n_models, dtype=np.float64)
+    maes = np.zeros(n_models, dtype=np.float64)
+    rmses = np.zeros(n_models, dtype=np.float64)
+    from_cache = np.zeros(n_models, dtype=bool)
+    training_dates = [None] * n_models
+    tuned = [None] * n_models
+
+    def _store(i, pred, mae, rmse, cached, training_date, is_tuned=None):
+        filled[i] = True
+        preds[i] = pred
+        maes[i] = mae
+        rmses[i] = rmse
+        from_cache[i] = cached
+        training_dates[i] = training_date
+        tuned[i] = is_tuned
     
     # Preparar features (eliminar NaN)
     df_clean = df.dropna()
@@ -325,6 +577,12 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
     # Split: usar todos menos el último para entrenar, último para predecir
     X_train, X_test = X[:-1], X[-1:]
     y_train, y_test = y[:-1], y[-1:]
+
+    # Copia float32 para los modelos de árboles (RF, XGBoost, LightGBM, CatBoost),
+    # que trabajan internamente en float32: la mitad de memoria y sin upcasts.
+    # LinearRegression y SVR siguen en float64 (precisión / libsvm convierte a float64).
+    X32 = X.astype(np.float32)
+    X_train32, X_test32 = X32[:-1], X32[-1:]
     
     current_price = y_test.iloc[0]
 
@@ -338,15 +596,9 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 model = model_data["model"]
                 pred = model.predict(X_test)[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date")
-                })
+                metadata = model_data.get("metadata", {})
+                _store(0, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"))
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             lr = LinearRegression().fit(X_train, y_train)
@@ -356,15 +608,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             metadata = {"MAE": float(mae), "RMSE": float(rmse), "n_samples": len(X_train)}
             save_model(lr, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(0, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -376,18 +620,11 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             model_data = load_model(symbol, model_name)
             if model_data:
                 model = model_data["model"]
-                pred = model.predict(X_test)[0]
+                pred = model.predict(X_test32)[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date"),
-                    "tuned": "best_params" in model_data.get("metadata", {})
-                })
+                metadata = model_data.get("metadata", {})
+                _store(1, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"), "best_params" in metadata)
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             
@@ -396,7 +633,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 best_params = optimize_hyperparameters(
                     RandomForestRegressor, 
                     PARAM_SPACES[model_name],
-                    X_train, y_train, 
+                    X_train32, y_train, 
                     model_name
                 )
             else:
@@ -406,27 +643,19 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                     best_params = {"n_estimators": 100, "random_state": 42}
             
             # Entrenar con mejores parámetros
-            rf = RandomForestRegressor(**best_params, random_state=42).fit(X_train, y_train)
-            pred = rf.predict(X_test)[0]
-            mae, rmse = evaluate_model(y_train, rf.predict(X_train))
+            rf = RandomForestRegressor(**best_params, random_state=42).fit(X_train32, y_train)
+            pred = rf.predict(X_test32)[0]
+            mae, rmse = evaluate_model(y_train, rf.predict(X_train32))
             
             metadata = {
                 "MAE": float(mae), 
                 "RMSE": float(rmse), 
-                "n_samples": len(X_train),
+                "n_samples": len(X_train32),
                 "best_params": best_params
             }
             save_model(rf, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(1, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -442,38 +671,17 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 forecast = model.predict(future)
                 prophet_pred = forecast["yhat"].iloc[-1]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(prophet_pred),
-                    "signal_next_day": 1 if prophet_pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date")
-                })
+                metadata = model_data.get("metadata", {})
+                _store(2, prophet_pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"))
+        elif force_retrain:
+            # Solo en rutas offline (reentrenamiento explícito / backfill)
+            prophet_pred, prophet_mae, prophet_rmse = _fit_prophet(df_clean, symbol, today)
+            _store(2, prophet_pred, prophet_mae, prophet_rmse, False, today)
         else:
-            logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
-            prophet_df = pd.DataFrame({"ds": df_clean.index, "y": df_clean["close"]})
-            prophet = Prophet(daily_seasonality=True)
-            prophet.fit(prophet_df)
-            
-            future = prophet.make_future_dataframe(periods=1)
-            forecast = prophet.predict(future)
-            prophet_pred = forecast["yhat"].iloc[-1]
-            prophet_mae, prophet_rmse = evaluate_model(prophet_df["y"], forecast["yhat"][:-1])
-            
-            metadata = {"MAE": float(prophet_mae), "RMSE": float(prophet_rmse), "n_samples": len(prophet_df)}
-            save_model(prophet, symbol, model_name, today, metadata)
-            
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(prophet_pred),
-                "signal_next_day": 1 if prophet_pred > current_price else -1,
-                "MAE": float(prophet_mae),
-                "RMSE": float(prophet_rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            # El fit de Prophet tarda segundos: en la ruta online no se entrena,
+            # lo hace el job diario del scheduler (refit_prophet_model)
+            logger.warning(f"⚠️ {model_name} no disponible para {symbol}; se omite hasta el próximo refit programado")
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -485,18 +693,12 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             model_data = load_model(symbol, model_name)
             if model_data:
                 model = model_data["model"]
-                pred = model.predict(X_test)[0]
+                # inplace_predict evita construir un DMatrix para una sola fila
+                pred = model.get_booster().inplace_predict(X_test32)[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date"),
-                    "tuned": "best_params" in model_data.get("metadata", {})
-                })
+                metadata = model_data.get("metadata", {})
+                _store(3, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"), "best_params" in metadata)
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             
@@ -504,7 +706,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 best_params = optimize_hyperparameters(
                     XGBRegressor, 
                     PARAM_SPACES[model_name],
-                    X_train, y_train, 
+                    X_train32, y_train, 
                     model_name
                 )
             else:
@@ -512,28 +714,25 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 if not best_params:
                     best_params = {"n_estimators": 200, "learning_rate": 0.05, "max_depth": 4}
             
-            xgb = XGBRegressor(**best_params, random_state=42)
-            xgb.fit(X_train, y_train)
-            pred = xgb.predict(X_test)[0]
-            mae, rmse = evaluate_model(y_train, xgb.predict(X_train))
+            xgb = XGBRegressor(
+                **best_params,
+                random_state=42,
+                tree_method="hist",
+                device="cuda" if _gpu_available("XGBoost") else "cpu",
+            )
+            xgb.fit(X_train32, y_train)
+            pred = xgb.predict(X_test32)[0]
+            mae, rmse = evaluate_model(y_train, xgb.predict(X_train32))
             
             metadata = {
                 "MAE": float(mae), 
                 "RMSE": float(rmse), 
-                "n_samples": len(X_train),
+                "n_samples": len(X_train32),
                 "best_params": best_params
             }
             save_model(xgb, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(3, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -547,16 +746,9 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 model = model_data["model"]
                 pred = model.predict(X_test)[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date"),
-                    "tuned": "best_params" in model_data.get("metadata", {})
-                })
+                metadata = model_data.get("metadata", {})
+                _store(4, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"), "best_params" in metadata)
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             
@@ -585,15 +777,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             }
             save_model(svr, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(4, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -605,18 +789,12 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             model_data = load_model(symbol, model_name)
             if model_data:
                 model = model_data["model"]
-                pred = model.predict(X_test)[0]
+                # Booster directo: sin el marshalling de argumentos del wrapper sklearn
+                pred = model.booster_.predict(X_test32.to_numpy())[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date"),
-                    "tuned": "best_params" in model_data.get("metadata", {})
-                })
+                metadata = model_data.get("metadata", {})
+                _store(5, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"), "best_params" in metadata)
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             
@@ -624,7 +802,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 best_params = optimize_hyperparameters(
                     LGBMRegressor, 
                     PARAM_SPACES[model_name],
-                    X_train, y_train, 
+                    X_train32, y_train, 
                     model_name
                 )
             else:
@@ -637,28 +815,25 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                         "num_leaves": 31
                     }
             
-            lgbm = LGBMRegressor(**best_params, random_state=42, verbose=-1)
-            lgbm.fit(X_train, y_train)
-            pred = lgbm.predict(X_test)[0]
-            mae, rmse = evaluate_model(y_train, lgbm.predict(X_train))
+            lgbm = LGBMRegressor(
+                **best_params,
+                random_state=42,
+                verbose=-1,
+                device_type="gpu" if _gpu_available("LightGBM") else "cpu",
+            )
+            lgbm.fit(X_train32, y_train)
+            pred = lgbm.predict(X_test32)[0]
+            mae, rmse = evaluate_model(y_train, lgbm.predict(X_train32))
             
             metadata = {
                 "MAE": float(mae), 
                 "RMSE": float(rmse), 
-                "n_samples": len(X_train),
+                "n_samples": len(X_train32),
                 "best_params": best_params
             }
             save_model(lgbm, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(5, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
@@ -670,18 +845,11 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
             model_data = load_model(symbol, model_name)
             if model_data:
                 model = model_data["model"]
-                pred = model.predict(X_test)[0]
+                pred = model.predict(X_test32)[0]
                 
-                results.append({
-                    "model_name": model_name,
-                    "prediction_next_day": float(pred),
-                    "signal_next_day": 1 if pred > current_price else -1,
-                    "MAE": model_data["metadata"].get("MAE", 0),
-                    "RMSE": model_data["metadata"].get("RMSE", 0),
-                    "from_cache": True,
-                    "training_date": model_data.get("training_date"),
-                    "tuned": "best_params" in model_data.get("metadata", {})
-                })
+                metadata = model_data.get("metadata", {})
+                _store(6, pred, metadata.get("MAE", 0), metadata.get("RMSE", 0),
+                       True, model_data.get("training_date"), "best_params" in metadata)
         else:
             logger.info(f"🔄 Entrenando nuevo modelo: {model_name}")
             
@@ -689,7 +857,7 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                 best_params = optimize_hyperparameters(
                     CatBoostRegressor, 
                     PARAM_SPACES[model_name],
-                    X_train, y_train, 
+                    X_train32, y_train, 
                     model_name
                 )
             else:
@@ -701,31 +869,43 @@ def _predict_ml_models(df: pd.DataFrame, symbol: str = "^IBEX", force_retrain: b
                         "depth": 6
                     }
             
-            cat = CatBoostRegressor(**best_params, silent=True, random_state=42)
-            cat.fit(X_train, y_train)
-            pred = cat.predict(X_test)[0]
-            mae, rmse = evaluate_model(y_train, cat.predict(X_train))
+            cat = CatBoostRegressor(
+                **best_params,
+                silent=True,
+                random_state=42,
+                task_type="GPU" if _gpu_available("CatBoost") else "CPU",
+            )
+            cat.fit(X_train32, y_train)
+            pred = cat.predict(X_test32)[0]
+            mae, rmse = evaluate_model(y_train, cat.predict(X_train32))
             
             metadata = {
                 "MAE": float(mae), 
                 "RMSE": float(rmse), 
-                "n_samples": len(X_train),
+                "n_samples": len(X_train32),
                 "best_params": best_params
             }
             save_model(cat, symbol, model_name, today, metadata)
             
-            results.append({
-                "model_name": model_name,
-                "prediction_next_day": float(pred),
-                "signal_next_day": 1 if pred > current_price else -1,
-                "MAE": float(mae),
-                "RMSE": float(rmse),
-                "from_cache": False,
-                "training_date": today
-            })
+            _store(6, pred, mae, rmse, False, today)
     except Exception as e:
         logger.error(f"Error en {model_name}: {e}")
 
+    signals = np.where(preds > current_price, 1, -1)
+    for i in np.flatnonzero(filled):
+        result = {
+            "model_name": ML_MODEL_NAMES[i],
+            "prediction_next_day": float(preds[i]),
+            "signal_next_day": int(signals[i]),
+            "MAE": float(maes[i]),
+            "RMSE": float(rmses[i]),
+            "from_cache": bool(from_cache[i]),
+            "training_date": training_dates[i],
+        }
+        if tuned[i] is not None:
+            result["tuned"] = tuned[i]
+        results.append(result)
+
     return results
 
 
@@ -742,8 +922,8 @@ def predict_simple(symbol: str) -> int:
     if df.empty:
         return 0
 
-    last_row = df.iloc[-1]
-    sig = _rule_based_signal(last_row)
+    close, sma20, rsi = df[["close", "sma_20", "rsi_14"]].iloc[-1].astype(float)
+    sig = _rule_based_signal(close, sma20, rsi)
     logger.info(f"Señal simple para {symbol} en {df.index[-1].date()}: {sig}")
     return int(sig)
 
@@ -776,18 +956,43 @@ def predict_ensemble(symbol: str, force_retrain: bool = False, as_of_date=None,
             "signal_ensemble": 0
         }
 
-    last_row = df.iloc[-1]
+    close, sma20, rsi, vol20 = df[["close", "sma_20", "rsi_14", "vol_20"]].iloc[-1].astype(float)
 
     # Señales basadas en reglas (solo informativas, NO votan)
-    s1 = _rule_based_signal(last_row)
-    s2 = _rule_based_signal_alt(last_row)
-    s3 = _rule_based_signal_contrarian(last_row)
+    s1 = _rule_based_signal(close, sma20, rsi)
+    s2 = _rule_based_signal_alt(close, sma20, rsi, vol20)
+    s3 = _rule_based_signal_contrarian(rsi)
     rule_signals = [s1, s2, s3]
 
     # Señales de modelos ML (estos SÍ votan)
     # Si as_of_date está presente, SIEMPRE forzar reentrenamiento (no usar modelos guardados)
     force_retrain_internal = force_retrain or (as_of_date is not None)
-    ml_results = _predict_ml_models(df, symbol=symbol, force_retrain=force_retrain_internal, tune_hyperparams=tune_hyperparams)
+    use_cache = not force_retrain_internal and not tune_hyperparams
+
+    ml_results = None
+    if use_cache:
+        cache_key = _ensemble_cache_key(symbol, df)
+        with _ensemble_cache_lock:
+            cached = _ensemble_cache.get(cache_key)
+            if cached is not None:
+                _ensemble_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info(f"♻️ Ensemble de {symbol} servido desde caché ({df.index[-1].date()})")
+            ml_results = copy.deepcopy(cached)
+            # Nada se ha recalculado: todos los modelos vienen de caché
+            for r in ml_results:
+                r["from_cache"] = True
+
+    if ml_results is None:
+        ml_results = _predict_ml_models(df, symbol=symbol, force_retrain=force_retrain_internal, tune_hyperparams=tune_hyperparams)
+        if use_cache:
+            # Recalcular la clave: si se han entrenado modelos nuevos, cambia la firma
+            cache_key = _ensemble_cache_key(symbol, df)
+            with _ensemble_cache_lock:
+                _ensemble_cache[cache_key] = copy.deepcopy(ml_results)
+                if len(_ensemble_cache) > _ENSEMBLE_CACHE_SIZE:
+                    _ensemble_cache.popitem(last=False)
+
     ml_signals = [r["signal_next_day"] for r in ml_results]
 
     # Votación por mayoría SOLO con modelos ML
@@ -838,65 +1043,63 @@ def compute_signals_for_symbol(symbol: str) -> dict:
             "signal_ensemble": 0,
         }
 
-    conn = None
-    last_simple = 0
-    last_ensemble = 0
     logger.info(f"Calculando señales para {len(df)} fechas de {symbol}...")
 
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            for idx, (date, row) in enumerate(df.iterrows()):
-                s1 = _rule_based_signal(row)
-                s2 = _rule_based_signal_alt(row)
-                s3 = _rule_based_signal_contrarian(row)
-
-                signals = np.array([s1, s2, s3], dtype=int)
-                mean = signals.mean()
-                if mean > 0.2:
-                    voted = 1
-                elif mean < -0.2:
-                    voted = -1
-                else:
-                    voted = 0
+    # Las 3 reglas + votación en una sola pasada compilada
+    s1_arr, _, _, voted_arr = _signals_kernel(
+        df["close"].to_numpy(dtype=np.float64),
+        df["sma_20"].to_numpy(dtype=np.float64),
+        df["rsi_14"].to_numpy(dtype=np.float64),
+        df["vol_20"].to_numpy(dtype=np.float64),
+    )
+
+    last_simple = int(s1_arr[-1])
+    last_ensemble = int(voted_arr[-1])
 
+    # Volcar todas las fechas a CSV en memoria para un único COPY
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for date, s1, voted in zip(df.index.date, s1_arr.tolist(), voted_arr.tolist()):
+        writer.writerow((symbol, date.isoformat(), s1, voted, "rules_ensemble"))
+    buf.seek(0)
+
+    try:
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                # COPY a una tabla temporal + un solo upsert (mucho más rápido que
+                # un INSERT por fecha)
+                cur.execute(
+                    """
+                    CREATE TEMP TABLE _sig_stage (
+                        symbol TEXT,
+                        date DATE,
+                        signal_simple INTEGER,
+                        signal_ensemble INTEGER,
+                        model_best TEXT
+                    ) ON COMMIT DROP;
+                    """
+                )
+                cur.copy_expert("COPY _sig_stage FROM STDIN WITH (FORMAT csv)", buf)
                 cur.execute(
                     """
                     INSERT INTO signals (symbol, date, signal_simple, signal_ensemble, model_best)
-                    VALUES (%s, %s, %s, %s, %s)
+                    SELECT symbol, date, signal_simple, signal_ensemble, model_best
+                    FROM _sig_stage
                     ON CONFLICT (symbol, date) DO UPDATE
                     SET signal_simple = EXCLUDED.signal_simple,
                         signal_ensemble = EXCLUDED.signal_ensemble,
                         model_best = EXCLUDED.model_best;
-                    """,
-                    (
-                        symbol,
-                        date.date(),
-                        int(s1),
-                        int(voted),
-                        "rules_ensemble",
-                    ),
+                    """
                 )
 
-                last_simple = int(s1)
-                last_ensemble = int(voted)
-
-                if (idx + 1) % 100 == 0:
-                    logger.info(f"Procesadas {idx + 1}/{len(df)} fechas...")
-
-        conn.commit()
+            conn.commit()
         logger.info(
             f"✅ Señales calculadas para {symbol}: última fecha {df.index[-1].date()}, "
             f"simple={last_simple}, ensemble={last_ensemble}"
         )
     except PsycopgError as e:
         logger.error(f"Error de Postgres al guardar señales de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
 
     return {
         "symbol": symbol,
@@ -8,34 +8,223 @@ Integra dos fuentes de noticias:
 Todas las noticias se guardan en la tabla 'news' con deduplicación por URL.
 """
 
+import asyncio
+import csv
+import io
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
-from psycopg2 import Error as PsycopgError
-
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+from psycopg2 import Binary, Error as PsycopgError
+from psycopg2.errors import UniqueViolation
+from psycopg2.extras import execute_values
+
+import ciso8601
+from cachetools import TTLCache
+import requests
 import yfinance as yf
-import feedparser
+from lxml import etree
 
-from .config import get_db_conn
+from .config import db_conn
 from . import logger
 
 
+# Inserción por lotes: una sola sentencia para todas las filas (execute_values)
+_NEWS_INSERT_SQL = """
+    INSERT INTO news (symbol, published_at, title, source, url, summary, sentiment)
+    VALUES %s;
+"""
+
+_NEWS_UPSERT_SQL = """
+    INSERT INTO news (symbol, published_at, title, source, url, summary, sentiment)
+    VALUES %s
+    ON CONFLICT (url) DO UPDATE
+    SET symbol = EXCLUDED.symbol,
+        published_at = EXCLUDED.published_at,
+        title = EXCLUDED.title,
+        source = EXCLUDED.source,
+        summary = EXCLUDED.summary;
+"""
+
+
+def _insert_news_rows(cur, rows: list) -> None:
+    """Inserta un lote de noticias en la tabla 'news'.
+    
+    Lo habitual es que las URLs sean nuevas, así que primero se intenta un
+    INSERT simple (sin el arbitraje de ON CONFLICT). Si alguna URL ya existía,
+    se vuelve al savepoint y se repite el lote con el upsert.
+    """
+    cur.execute("SAVEPOINT news_batch")
+    try:
+        execute_values(cur, _NEWS_INSERT_SQL, rows, page_size=200)
+    except UniqueViolation:
+        cur.execute("ROLLBACK TO SAVEPOINT news_batch")
+        execute_values(cur, _NEWS_UPSERT_SQL, rows, page_size=200)
+    cur.execute("RELEASE SAVEPOINT news_batch")
+
+
+def _store_news_rows(rows: list, conn=None) -> int:
+    """Guarda filas en 'news' y devuelve cuántas se han enviado.
+    
+    Si se pasa `conn`, se usa la transacción del llamador y NO se hace commit
+    (así varias fuentes de un mismo símbolo comparten un único COMMIT).
+    """
+    if not rows:
+        return 0
+    if conn is None:
+        with db_conn() as conn:
+            inserted = _store_news_rows(rows, conn)
+            conn.commit()
+        return inserted
+
+    with conn.cursor() as cur:
+        _insert_news_rows(cur, rows)
+    return len(rows)
+
+
 # ------------------------
 #  A) Google News (RSS)
 # ------------------------
 
-def fetch_news_rss(q: str = "IBEX 35 OR Bolsa de Madrid", when: str = "7d") -> List[Dict[str, Any]]:
+def _load_rss_cache(url: str) -> Optional[Dict[str, Any]]:
+    """Devuelve la última descarga guardada de una URL RSS (etag, last_modified, body)."""
+    try:
+        with db_conn(readonly=True) as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT etag, last_modified, body FROM rss_cache WHERE url = %s;",
+                (url,),
+            )
+            return cur.fetchone()
+    except PsycopgError as e:
+        # La caché es una optimización: si falla, se descarga sin condiciones
+        logger.warning(f"No se pudo leer rss_cache: {e}")
+        return None
+
+
+def _store_rss_cache(url: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+    """Guarda (o reemplaza) la descarga de una URL RSS con sus validadores HTTP."""
+    try:
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO rss_cache (url, etag, last_modified, body, fetched_at)
+                    VALUES (%s, %s, %s, %s, NOW())
+                    ON CONFLICT (url) DO UPDATE
+                    SET etag = EXCLUDED.etag,
+                        last_modified = EXCLUDED.last_modified,
+                        body = EXCLUDED.body,
+                        fetched_at = EXCLUDED.fetched_at;
+                    """,
+                    (url, etag, last_modified, Binary(body)),
+                )
+            conn.commit()
+    except PsycopgError as e:
+        logger.warning(f"No se pudo actualizar rss_cache: {e}")
+
+
+class NewsItem(NamedTuple):
+    """Noticia descargada de un RSS (inmutable, sin dict por entrada)."""
+    title: Optional[str]
+    link: Optional[str]
+    published: Optional[datetime]
+    raw_published: str
+    source: Optional[str]
+
+
+# Memo en proceso de las descargas RSS: misma (q, when, max_items) dentro de la misma
+# ventana de RSS_MEMO_TTL segundos → se reutiliza el resultado ya parseado
+RSS_MEMO_TTL = 300
+
+
+@lru_cache(maxsize=128)
+def _fetch_rss_cached(q: str, when: str, max_items: int, ttl_bucket: int) -> Tuple[NewsItem, ...]:
+    """Descarga y parsea un RSS de Google News (memoizado).
+    
+    El XML se recorre en streaming con lxml.iterparse y se deja de parsear
+    al llegar a `max_items` <item>: coste proporcional a lo que se usa, no
+    al tamaño del feed.
+    
+    Devuelve una tupla de NewsItem (inmutables) para que ningún llamador
+    pueda modificar el valor cacheado. Los errores se propagan (lru_cache no
+    cachea excepciones), así un fallo puntual no queda memorizado.
+    """
+    q_enc = q.replace(" ", "+")
+    url = f"https://news.google.com/rss/search?q={q_enc}+when:{when}&hl=es&gl=ES&ceid=ES:es"
+    logger.info(f"Descargando RSS de Google News: {url}")
+
+    # GET condicional: si el feed no ha cambiado (304) se reutiliza el cuerpo guardado
+    cached = _load_rss_cache(url)
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    # Descarga completa (el cuerpo se guarda para el GET condicional) y
+    # parseo incremental sobre los bytes
+    resp = requests.get(url, headers=headers, timeout=10)
+    if resp.status_code == 304 and cached:
+        logger.info("RSS sin cambios (304), usando copia en caché")
+        body = bytes(cached["body"])
+    else:
+        resp.raise_for_status()
+        body = resp.content
+        _store_rss_cache(url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), body)
+
+    if max_items <= 0:
+        return ()
+
+    items = []
+    for _, elem in etree.iterparse(io.BytesIO(body), events=("end",), tag="item"):
+        # pubDate en formato RFC 822 (ej: "Wed, 10 Dec 2025 14:50:00 GMT")
+        raw_published = elem.findtext("pubDate") or ""
+        published_dt: Optional[datetime] = None
+        if raw_published:
+            try:
+                published_dt = parsedate_to_datetime(raw_published)
+            except (TypeError, ValueError):
+                published_dt = None
+
+        items.append(
+            NewsItem(
+                elem.findtext("title"),
+                elem.findtext("link"),
+                published_dt,
+                raw_published,
+                elem.findtext("source"),
+            )
+        )
+        # Liberar el subárbol ya procesado
+        elem.clear()
+        if len(items) >= max_items:
+            break
+
+    return tuple(items)
+
+
+def fetch_news_rss(
+    q: str = "IBEX 35 OR Bolsa de Madrid",
+    when: str = "7d",
+    max_items: int = 100,
+) -> List[NewsItem]:
     """Descarga noticias desde Google News RSS.
     
     Utiliza el servicio RSS de Google News con búsqueda personalizada.
     Útil para noticias generales del mercado o keywords específicas.
+    Las respuestas se memoizan durante RSS_MEMO_TTL segundos por (q, when, max_items).
     
     Args:
         q: Query de búsqueda. Soporta operadores OR, AND, comillas
            Ejemplo: "IBEX 35 OR Bolsa de Madrid"
         when: Ventana temporal. Opciones: "1d", "7d", "30d"
+        max_items: Máximo de noticias a parsear (el resto del feed se ignora)
         
     Returns:
-        List[Dict]: Lista de noticias con campos:
+        List[NewsItem]: Lista de noticias (solo lectura) con campos:
                    - title: Título
                    - link: URL
                    - published: datetime
@@ -44,42 +233,51 @@ def fetch_news_rss(q: str = "IBEX 35 OR Bolsa de Madrid", when: str = "7d") -> L
     Note:
         Google News RSS no incluye resumen (summary) útil
     """
-    q_enc = q.replace(" ", "+")
-    url = f"https://news.google.com/rss/search?q={q_enc}+when:{when}&hl=es&gl=ES&ceid=ES:es"
-    logger.info(f"Descargando RSS de Google News: {url}")
-    feed = feedparser.parse(url)
+    try:
+        return list(
+            _fetch_rss_cached(q, when, max_items, int(time.monotonic() // RSS_MEMO_TTL))
+        )
+    except (requests.RequestException, ValueError, etree.XMLSyntaxError) as e:
+        logger.error(f"Error descargando/parseando RSS de Google News: {e}")
+        return []
 
-    items: List[Dict[str, Any]] = []
-    for e in feed.entries:
-        # Intentamos sacar una fecha razonable
-        published_dt: Optional[datetime] = None
-        if getattr(e, "published_parsed", None) is not None:
-            published_dt = datetime(*e.published_parsed[:6], tzinfo=timezone.utc)
-        elif getattr(e, "updated_parsed", None) is not None:
-            published_dt = datetime(*e.updated_parsed[:6], tzinfo=timezone.utc)
 
-        items.append(
-            {
-                "title": e.get("title"),
-                "link": e.get("link"),
-                "published": published_dt,
-                "raw_published": e.get("published", ""),
-                "source": getattr(e, "source", {}).get("title")
-                if isinstance(getattr(e, "source", {}), dict)
-                else None,
-            }
-        )
+def _rss_news_rows(symbol: str, q: Optional[str], when: str, max_items: int) -> list:
+    """Descarga noticias RSS y las convierte en filas para la tabla 'news'."""
+    if q is None:
+        q = f"{symbol} OR IBEX 35 OR Bolsa de Madrid"
 
-    return items
+    items = fetch_news_rss(q=q, when=when, max_items=max_items)
+    if not items:
+        logger.warning(f"RSS: no se han obtenido noticias para query={q}")
+        return []
+
+    # Filas indexadas por URL: un mismo lote no puede tocar dos veces la misma
+    # fila en ON CONFLICT DO UPDATE, así que se deduplica aquí
+    rows_by_url = {}
+    for item in items:
+        url = item.link
+        if not url:
+            continue
+
+        rows_by_url[url] = (
+            symbol,
+            item.published or datetime.now(timezone.utc),
+            item.title or "(sin título)",
+            item.source,
+            url,
+            None,  # Google News RSS no trae resumen corto útil
+            None,  # sentiment placeholder
+        )
+    return list(rows_by_url.values())
 
 
-from psycopg2 import Error as PsycopgError
-...
 def fetch_and_store_news_rss(
     symbol: str,
     q: Optional[str] = None,
     when: str = "7d",
     max_items: int = 10,
+    conn=None,
 ) -> int:
 
     """Descarga noticias desde Google News RSS y las guarda en BD.
@@ -94,85 +292,155 @@ def fetch_and_store_news_rss(
         q: Query personalizada. Si None, genera automáticamente
         when: Ventana temporal ("1d", "7d", "30d")
         max_items: Máximo de noticias a guardar
+        conn: Conexión opcional; si se pasa, no se hace commit (lo hace el llamador)
         
     Returns:
         int: Número de noticias insertadas/actualizadas
         
     Note:
-        - Usa ON CONFLICT(url) para evitar duplicados
+        - INSERT simple y, si la URL ya existe, upsert con ON CONFLICT(url)
         - Sentiment se deja como None (placeholder para futuro)
     """
-
-    if q is None:
-        q = f"{symbol} OR IBEX 35 OR Bolsa de Madrid"
-
-    items = fetch_news_rss(q=q, when=when)
-    if not items:
-        logger.warning(f"RSS: no se han obtenido noticias para query={q}")
-        return 0
-
-    conn = None
-    inserted = 0
+    rows = _rss_news_rows(symbol, q, when, max_items)
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            for item in items[:max_items]:
-                title = item["title"] or "(sin título)"
-                url = item["link"]
-                source = item["source"]
-                published_at = item["published"] or datetime.now(timezone.utc)
-                summary = None  # Google News RSS no trae resumen corto útil
-
-                if not url:
-                    continue
-
-                cur.execute(
-                    """
-                    INSERT INTO news (symbol, published_at, title, source, url, summary, sentiment)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (url) DO UPDATE
-                    SET symbol = EXCLUDED.symbol,
-                        published_at = EXCLUDED.published_at,
-                        title = EXCLUDED.title,
-                        source = EXCLUDED.source,
-                        summary = EXCLUDED.summary;
-                    """,
-                    (
-                        symbol,
-                        published_at,
-                        title,
-                        source,
-                        url,
-                        summary,
-                        None,  # sentiment placeholder
-                    ),
-                )
-                inserted += 1
-
-        conn.commit()
-        logger.info(f"RSS: noticias guardadas/actualizadas para {symbol}: {inserted}")
-        return inserted
-
+        inserted = _store_news_rows(rows, conn)
     except PsycopgError as e:
         logger.error(f"Error guardando noticias RSS para {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
         raise
 
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
+    logger.info(f"RSS: noticias guardadas/actualizadas para {symbol}: {inserted}")
+    return inserted
 
 
 # ------------------------
 #  B) yfinance (opcional)
 # ------------------------
 
+# Caché en proceso de yf.Ticker(symbol).news: llamadas repetidas o
+# solapadas para el mismo símbolo no vuelven a pedir a Yahoo
+YF_NEWS_TTL = 600
+_yf_news_cache = TTLCache(maxsize=256, ttl=YF_NEWS_TTL)
+_yf_news_lock = threading.Lock()
+
+
+def _get_yf_news(symbol: str) -> Tuple[Dict[str, Any], ...]:
+    """Devuelve las noticias crudas de yfinance para un símbolo (cacheadas YF_NEWS_TTL s).
+    
+    El lock solo protege el acceso a la caché; la llamada HTTP se hace fuera
+    para no serializar símbolos distintos. Los errores no se cachean.
+    """
+    with _yf_news_lock:
+        cached = _yf_news_cache.get(symbol)
+    if cached is not None:
+        return cached
+
+    news = tuple(yf.Ticker(symbol).news or [])
+    with _yf_news_lock:
+        _yf_news_cache[symbol] = news
+    return news
+
+
+# Noticia extraída de yfinance: (published_at, title, source, url, summary)
+YfNews = Tuple[datetime, str, Optional[str], str, Optional[str]]
+
+
+def _extract_yf_content(content: dict, cutoff: datetime) -> Optional[YfNews]:
+    """Estructura B de yfinance: {id, content: {title, provider, pubDate, ...}}."""
+    # Timestamp en formato ISO (ej: "2025-12-10T14:50:00Z")
+    pubdate_str = content.get("pubDate")
+    published_at = None
+    if pubdate_str:
+        try:
+            # Parsear ISO 8601 timestamp (ciso8601 entiende el sufijo 'Z')
+            published_at = ciso8601.parse_datetime(pubdate_str)
+        except (ValueError, AttributeError):
+            published_at = None
+    if published_at is None:
+        published_at = datetime.now(timezone.utc)
+
+    # Aplicar filtro de días
+    if published_at < cutoff:
+        return None
+
+    title = content.get("title") or "(sin título)"
+    click = content.get("clickThroughUrl")
+    url = click.get("url") if click else None
+    if not url:
+        logger.debug(f"yfinance: Noticia sin URL, saltando: {title}")
+        return None
+
+    provider = content.get("provider")
+    source = provider.get("displayName") if provider else None
+    return published_at, title, source, url, content.get("summary") or None
+
+
+def _extract_yf_legacy(item: dict, cutoff: datetime) -> Optional[YfNews]:
+    """Estructura A de yfinance: {title, link, providerPublishTime, publisher, summary}."""
+    ts = item.get("providerPublishTime")
+    if ts is None:
+        return None
+
+    published_at = datetime.fromtimestamp(ts, tz=timezone.utc)
+    if published_at < cutoff:
+        return None
+
+    title = item.get("title") or "(sin título)"
+    url = item.get("link")
+    if not url:
+        logger.debug(f"yfinance: Noticia sin URL, saltando: {title}")
+        return None
+
+    return published_at, title, item.get("publisher"), url, item.get("summary") or None
+
+
+def _extract_yf_item(item: dict, cutoff: datetime) -> Optional[YfNews]:
+    """Extrae una noticia de yfinance (cualquiera de las dos estructuras).
+    
+    Returns:
+        Tupla (published_at, title, source, url, summary), o None si la
+        noticia es anterior a `cutoff` o no tiene URL
+    """
+    content = item.get("content")
+    if content and isinstance(content, dict):
+        return _extract_yf_content(content, cutoff)
+    return _extract_yf_legacy(item, cutoff)
+
+
+def _yf_news_rows(symbol: str, days_back: int, max_items: int) -> list:
+    """Descarga noticias de yfinance y las convierte en filas para la tabla 'news'."""
+    logger.info(f"Descargando noticias (yfinance) para {symbol} (últimos {days_back} días)...")
+
+    try:
+        raw_news = _get_yf_news(symbol)
+    except Exception as e:
+        logger.error(f"Error obteniendo noticias de yfinance para {symbol}: {e}")
+        return []
+
+    if not raw_news:
+        logger.warning(f"yfinance: no se han obtenido noticias para {symbol}")
+        return []
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
+
+    rows_by_url = {}
+    for item in raw_news:
+        if len(rows_by_url) >= max_items:
+            break
+
+        news = _extract_yf_item(item, cutoff)
+        if news is None:
+            continue
+
+        published_at, title, source, url, summary = news
+        rows_by_url[url] = (symbol, published_at, title, source, url, summary, None)
+    return list(rows_by_url.values())
+
+
 def fetch_and_store_news_yf(
     symbol: str,
     days_back: int = 7,
     max_items: int = 10,
+    conn=None,
 ) -> int:
     """Descarga noticias desde Yahoo Finance API y las guarda en BD.
     
@@ -183,6 +451,7 @@ def fetch_and_store_news_yf(
         symbol: Símbolo de Yahoo Finance (ej: "^IBEX")
         days_back: Número de días hacia atrás para filtrar
         max_items: Límite de noticias a guardar
+        conn: Conexión opcional; si se pasa, no se hace commit (lo hace el llamador)
         
     Returns:
         int: Número de noticias insertadas/actualizadas
@@ -191,126 +460,107 @@ def fetch_and_store_news_yf(
         - Yahoo Finance incluye summary (resumen)
         - Usa timestamp Unix (providerPublishTime)
         - Deduplica por URL automáticamente
+        - La respuesta de Yahoo se cachea YF_NEWS_TTL segundos por símbolo
     """
-    logger.info(f"Descargando noticias (yfinance) para {symbol} (últimos {days_back} días)...")
-    ticker = yf.Ticker(symbol)
-
+    rows = _yf_news_rows(symbol, days_back, max_items)
     try:
-        raw_news: List[Dict[str, Any]] = ticker.news or []
-    except Exception as e:
-        logger.error(f"Error obteniendo noticias de yfinance para {symbol}: {e}")
-        return 0
+        inserted = _store_news_rows(rows, conn)
+    except PsycopgError as e:
+        logger.error(f"Error guardando noticias yfinance para {symbol}: {e}")
+        raise
 
-    if not raw_news:
-        logger.warning(f"yfinance: no se han obtenido noticias para {symbol}")
-        return 0
+    logger.info(f"yfinance: noticias guardadas/actualizadas para {symbol}: {inserted}")
+    return inserted
 
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
 
-    conn = None
-    inserted = 0
-    used = 0
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            for item in raw_news:
-                if used >= max_items:
-                    break
-
-                # Manejar dos estructuras diferentes de yfinance:
-                # Estructura A: {title, link, providerPublishTime, publisher, summary}
-                # Estructura B: {id, content: {title, provider, ...}}
-                
-                # Intentar extraer de estructura B (nested content)
-                content = item.get("content", {})
-                if content and isinstance(content, dict):
-                    title = content.get("title") or "(sin título)"
-                    url = content.get("clickThroughUrl", {}).get("url") if content.get("clickThroughUrl") else None
-                    source = content.get("provider", {}).get("displayName") if content.get("provider") else None
-                    summary = content.get("summary") or None
-                    
-                    # Timestamp en formato ISO (ej: "2025-12-10T14:50:00Z")
-                    pubdate_str = content.get("pubDate")
-                    if pubdate_str:
-                        try:
-                            # Parsear ISO 8601 timestamp
-                            published_at = datetime.fromisoformat(pubdate_str.replace('Z', '+00:00'))
-                        except (ValueError, AttributeError):
-                            published_at = datetime.now(timezone.utc)
-                    else:
-                        published_at = datetime.now(timezone.utc)
-                    
-                    # Aplicar filtro de días
-                    if published_at < cutoff:
-                        continue
-                else:
-                    # Estructura A (original)
-                    ts = item.get("providerPublishTime")
-                    if ts is None:
-                        continue
-
-                    published_at = datetime.fromtimestamp(ts, tz=timezone.utc)
-                    if published_at < cutoff:
-                        continue
-
-                    title = item.get("title") or "(sin título)"
-                    url = item.get("link")
-                    source = item.get("publisher")
-                    summary = item.get("summary") or None
-
-                if not url:
-                    logger.debug(f"yfinance: Noticia sin URL, saltando: {title}")
-                    continue
+#------------------------
+#  C) Función combinada
+#------------------------
+
+def _collect_news_for_symbol(
+    sym: str,
+    when: str,
+    days_back: int,
+    max_items_rss: int,
+    max_items_yf: int,
+) -> Tuple[list, list]:
+    """Descarga las noticias (RSS + yfinance) de un solo símbolo, sin tocar la BD.
+    
+    Returns:
+        Tupla (filas_rss, filas_yfinance) listas para la tabla 'news'
+    """
+    # Query por defecto para RSS si no se pasa q explícita
+    q_default = f"{sym} OR IBEX 35 OR Bolsa de Madrid"
+
+    rss_rows = _rss_news_rows(sym, q_default, when, max_items_rss)
+    yf_rows = _yf_news_rows(sym, days_back, max_items_yf)
+    return rss_rows, yf_rows
+
+
+def _store_news_staged(rows: list) -> None:
+    """Guarda de golpe noticias de muchos símbolos vía COPY + tabla temporal.
+    
+    Las filas (que pueden repetir URL entre símbolos y fuentes) se vuelcan con
+    COPY a una tabla temporal, que no genera WAL, y se aplican con un único
+    INSERT ... SELECT DISTINCT ON (url) ... ON CONFLICT, en una sola transacción.
+    """
+    if not rows:
+        return
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for symbol, published_at, title, source, url, summary, sentiment in rows:
+        # None -> campo vacío -> NULL en COPY csv
+        writer.writerow((symbol, published_at.isoformat(), title, source, url, summary, sentiment))
+    buf.seek(0)
 
+    try:
+        with db_conn() as conn:
+            with conn.cursor() as cur:
+                # published_at como TIMESTAMPTZ: al pasar a news se convierte
+                # con la zona de la sesión, igual que un INSERT parametrizado
+                cur.execute(
+                    """
+                    CREATE TEMP TABLE _news_stage (
+                        symbol TEXT,
+                        published_at TIMESTAMPTZ,
+                        title TEXT,
+                        source TEXT,
+                        url TEXT,
+                        summary TEXT,
+                        sentiment DOUBLE PRECISION
+                    ) ON COMMIT DROP;
+                    """
+                )
+                cur.copy_expert("COPY _news_stage FROM STDIN WITH (FORMAT csv)", buf)
                 cur.execute(
                     """
                     INSERT INTO news (symbol, published_at, title, source, url, summary, sentiment)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    SELECT DISTINCT ON (url)
+                        symbol, published_at, title, source, url, summary, sentiment
+                    FROM _news_stage
+                    ORDER BY url, published_at DESC
                     ON CONFLICT (url) DO UPDATE
                     SET symbol = EXCLUDED.symbol,
                         published_at = EXCLUDED.published_at,
                         title = EXCLUDED.title,
                         source = EXCLUDED.source,
                         summary = EXCLUDED.summary;
-                    """,
-                    (
-                        symbol,
-                        published_at,
-                        title,
-                        source,
-                        url,
-                        summary,
-                        None,
-                    ),
+                    """
                 )
-                inserted += 1
-                used += 1
-
-        conn.commit()
-        logger.info(f"yfinance: noticias guardadas/actualizadas para {symbol}: {inserted}")
-        return inserted
-
+            conn.commit()
     except PsycopgError as e:
-        logger.error(f"Error guardando noticias yfinance para {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
+        logger.error(f"Error guardando lote de noticias ({len(rows)} filas): {e}")
         raise
 
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
-
-#------------------------
-#  C) Función combinada
-#------------------------
 
-def update_news_for_symbols(
+async def update_news_for_symbols(
     symbols: list[str],
     when: str = "7d",
     days_back: int = 7,
     max_items_rss: int = 10,
     max_items_yf: int = 10,
+    max_concurrency: int = 16,
 ):
     """Descarga noticias de múltiples fuentes para varios símbolos.
     
@@ -318,12 +568,18 @@ def update_news_for_symbols(
     - RSS de Google News: Cobertura amplia, contexto general
     - yfinance API: Noticias específicas, mayor relevancia
     
+    Las descargas de los símbolos se hacen en paralelo (es I/O de red): cada
+    símbolo corre en un hilo vía asyncio.to_thread, limitado por un semáforo
+    para no saturar a Google/Yahoo. Después todas las filas se guardan en una
+    sola transacción con COPY (ver _store_news_staged).
+    
     Args:
         symbols: Lista de símbolos (ej: ["^IBEX", "^GSPC"])
         when: Ventana para RSS ("1d", "7d", "30d")
         days_back: Días hacia atrás para yfinance
         max_items_rss: Límite por símbolo vía RSS
         max_items_yf: Límite por símbolo vía yfinance
+        max_concurrency: Símbolos procesados a la vez
         
     Returns:
         dict: {
@@ -337,34 +593,33 @@ def update_news_for_symbols(
     Note:
         Ambas fuentes se complementan para máxima cobertura
     """
-    per_symbol: dict[str, dict] = {}
-    total = 0
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    for sym in symbols:
-        # Query por defecto para RSS si no se pasa q explícita
-        q_default = f"{sym} OR IBEX 35 OR Bolsa de Madrid"
+    async def process_symbol(sym: str):
+        async with semaphore:
+            rows = await asyncio.to_thread(
+                _collect_news_for_symbol, sym, when, days_back, max_items_rss, max_items_yf
+            )
+        return sym, rows
 
-        rss_count = fetch_and_store_news_rss(
-            symbol=sym,
-            q=q_default,
-            when=when,
-            max_items=max_items_rss,
-        )
-
-        yf_count = fetch_and_store_news_yf(
-            symbol=sym,
-            days_back=days_back,
-            max_items=max_items_yf,
-        )
+    results = await asyncio.gather(*(process_symbol(sym) for sym in symbols))
 
+    all_rows = []
+    per_symbol: dict[str, dict] = {}
+    for sym, (rss_rows, yf_rows) in results:
+        all_rows.extend(rss_rows)
+        all_rows.extend(yf_rows)
         per_symbol[sym] = {
-            "rss": rss_count,
-            "yfinance": yf_count,
-            "total": rss_count + yf_count,
+            "rss": len(rss_rows),
+            "yfinance": len(yf_rows),
+            "total": len(rss_rows) + len(yf_rows),
         }
-        total += rss_count + yf_count
+
+    await asyncio.to_thread(_store_news_staged, all_rows)
+    total = sum(counts["total"] for counts in per_symbol.values())
+    logger.info(f"Noticias guardadas para {len(per_symbol)} símbolos: {total} filas")
 
     return {
         "total": total,
         "per_symbol": per_symbol,
-    }
\ No newline at end of file
+    }
@@ -1,280 +1,73 @@
 # mcp_server/scripts/reporting.py
 
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any
 from psycopg2 import Error as PsycopgError
 
-from .config import get_db_conn
+from .config import db_conn, execute_prepared
 from . import logger
 
 
-def _get_latest_price(symbol: str):
+# Último precio, últimos indicadores y noticias recientes en un único
+# round-trip: una fila (k, v) por bloque, con v en JSON
+_MARKET_SNAPSHOT_SQL = """
+SELECT 'price' AS k, row_to_json(p) AS v
+FROM (
+    SELECT date, close, open, high, low, volume
+    FROM prices
+    WHERE symbol = %(symbol)s
+    ORDER BY date DESC
+    LIMIT 1
+) p
+UNION ALL
+SELECT 'indicators', row_to_json(i)
+FROM (
+    SELECT date, sma_20, sma_50, vol_20, rsi_14
+    FROM indicators
+    WHERE symbol = %(symbol)s
+    ORDER BY date DESC
+    LIMIT 1
+) i
+UNION ALL
+SELECT 'news', COALESCE(json_agg(n), '[]'::json)
+FROM (
+    SELECT published_at, title, source, url, sentiment
+    FROM news
+    WHERE symbol = %(symbol)s
+    ORDER BY published_at DESC
+    LIMIT %(news_limit)s
+) n;
+"""
+
+
+def get_market_snapshot(symbol: str, news_limit: int = 5, conn=None) -> Dict[str, Any]:
     """
-    Obtiene el último precio de cierre y el anterior para un símbolo dado,
-    junto con la variación absoluta y porcentual.
-    """
-    conn = None
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            # Último precio
-            cur.execute(
-                """
-                SELECT date, close
-                FROM prices
-                WHERE symbol = %s
-                ORDER BY date DESC
-                LIMIT 1;
-                """,
-                (symbol,),
-            )
-            row_last = cur.fetchone()
-            if not row_last:
-                return None, None, None, None, None
-
-            last_date = row_last["date"]
-            last_close = float(row_last["close"])
-
-            # Precio anterior (para calcular variación)
-            cur.execute(
-                """
-                SELECT date, close
-                FROM prices
-                WHERE symbol = %s
-                  AND date < %s
-                ORDER BY date DESC
-                LIMIT 1;
-                """,
-                (symbol, last_date),
-            )
-            row_prev = cur.fetchone()
-
-        if not row_prev:
-            prev_close = None
-            abs_change = None
-            pct_change = None
-        else:
-            prev_close = float(row_prev["close"])
-            abs_change = last_close - prev_close
-            pct_change = (abs_change / prev_close) * 100 if prev_close != 0 else None
-
-        return last_date, last_close, prev_close, abs_change, pct_change
-
-    except PsycopgError as e:
-        logger.error(f"Error al obtener último precio de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
-
-def _get_indicators_for_date(symbol: str, date):
-    """
-    Obtiene SMA20, SMA50, vol_20 y RSI14 para un símbolo y fecha concretos.
-    """
-    if date is None:
-        return {"sma_20": None, "sma_50": None, "vol_20": None, "rsi_14": None}
-
-    conn = None
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT sma_20, sma_50, vol_20, rsi_14
-                FROM indicators
-                WHERE symbol = %s
-                  AND date = %s
-                LIMIT 1;
-                """,
-                (symbol, date),
-            )
-            row = cur.fetchone()
-
-        if not row:
-            return {"sma_20": None, "sma_50": None, "vol_20": None, "rsi_14": None}
-
-        return {
-            "sma_20": float(row["sma_20"]) if row["sma_20"] is not None else None,
-            "sma_50": float(row["sma_50"]) if row["sma_50"] is not None else None,
-            "vol_20": float(row["vol_20"]) if row["vol_20"] is not None else None,
-            "rsi_14": float(row["rsi_14"]) if row["rsi_14"] is not None else None,
-        }
-
-    except PsycopgError as e:
-        logger.error(f"Error al obtener indicadores de {symbol} en {date}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
-
-def _get_latest_signals(symbol: str):
-    """
-    Obtiene la última señal simple y ensemble para un símbolo.
-    """
-    conn = None
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT date, signal_simple, signal_ensemble
-                FROM signals
-                WHERE symbol = %s
-                ORDER BY date DESC
-                LIMIT 1;
-                """,
-                (symbol,),
-            )
-            row = cur.fetchone()
-
-        if not row:
-            return None, {"simple": None, "ensemble": None}
-
-        return row["date"], {
-            "simple": int(row["signal_simple"]) if row["signal_simple"] is not None else None,
-            "ensemble": int(row["signal_ensemble"]) if row["signal_ensemble"] is not None else None,
-        }
-
-    except PsycopgError as e:
-        logger.error(f"Error al obtener señales de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
-
-def _get_recent_news(symbol: str, limit: int = 5) -> list:
-    """
-    Últimas noticias almacenadas en la tabla 'news' para el símbolo.
-    """
-    conn = None
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT published_at, title, source, url
-                FROM news
-                WHERE symbol = %s
-                ORDER BY published_at DESC
-                LIMIT %s;
-                """,
-                (symbol, limit),
-            )
-            rows = cur.fetchall()
-
-        news_list: List[Dict[str, Any]] = []
-        for r in rows:
-            news_list.append(
-                {
-                    "published_at": (
-                        r["published_at"].isoformat()
-                        if isinstance(r["published_at"], datetime)
-                        else str(r["published_at"])
-                    ),
-                    "title": r["title"],
-                    "source": r.get("source"),
-                    "url": r.get("url"),
-                }
-            )
-        return news_list
-
-    except PsycopgError as e:
-        logger.error(f"Error al obtener noticias de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        raise
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
-
-
-def _get_ml_predictions_performance(symbol: str, last_n_days: int = 7) -> Dict[str, Any]:
-    """
-    Obtiene métricas de rendimiento de los modelos ML validados.
-    
-    Calcula MAE y RMSE por modelo para las últimas N predicciones validadas,
-    y devuelve el mejor modelo según MAE.
+    Foto rápida de un mercado con una sola consulta: último precio,
+    últimos indicadores y noticias recientes.
     
     Args:
         symbol: Símbolo del activo
-        last_n_days: Número de días a considerar para las métricas
+        news_limit: Número máximo de noticias
         
     Returns:
-        Dict con métricas por modelo y mejor modelo
+        Dict con claves symbol, price, indicators (None si no hay datos)
+        y news (lista, puede estar vacía). Las fechas vienen en ISO 8601.
     """
-    conn = None
+    if conn is None:
+        with db_conn(readonly=True) as conn:
+            return get_market_snapshot(symbol, news_limit, conn=conn)
+
     try:
-        conn = get_db_conn()
         with conn.cursor() as cur:
-            # Obtener predicciones validadas (donde true_value no es NULL)
-            cur.execute(
-                """
-                SELECT 
-                    model_name,
-                    AVG(error_abs) as avg_mae,
-                    SQRT(AVG(POWER(error_abs, 2))) as rmse,
-                    COUNT(*) as n_predictions,
-                    AVG(predicted_value) as avg_predicted,
-                    AVG(true_value) as avg_actual
-                FROM ml_predictions
-                WHERE symbol = %s
-                  AND true_value IS NOT NULL
-                  AND prediction_date >= CURRENT_DATE - INTERVAL '%s days'
-                GROUP BY model_name
-                ORDER BY avg_mae ASC;
-                """,
-                (symbol, last_n_days),
-            )
+            cur.execute(_MARKET_SNAPSHOT_SQL, {"symbol": symbol, "news_limit": news_limit})
             rows = cur.fetchall()
-
-        if not rows:
-            return {
-                "models": [],
-                "best_model": None,
-                "message": f"No hay predicciones validadas en los últimos {last_n_days} días"
-            }
-
-        models_performance = []
-        for r in rows:
-            models_performance.append({
-                "model_name": r["model_name"],
-                "mae": float(r["avg_mae"]) if r["avg_mae"] else None,
-                "rmse": float(r["rmse"]) if r["rmse"] else None,
-                "n_predictions": int(r["n_predictions"]),
-                "avg_predicted": float(r["avg_predicted"]) if r["avg_predicted"] else None,
-                "avg_actual": float(r["avg_actual"]) if r["avg_actual"] else None,
-            })
-
-        # El mejor modelo es el primero (menor MAE)
-        best_model = models_performance[0]["model_name"] if models_performance else None
-
-        return {
-            "models": models_performance,
-            "best_model": best_model,
-            "evaluation_period_days": last_n_days,
-        }
-
     except PsycopgError as e:
-        logger.error(f"Error al obtener métricas de predicciones de {symbol}: {e}")
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        return {
-            "models": [],
-            "best_model": None,
-            "error": str(e)
-        }
-    finally:
-        if conn is not None and not conn.closed:
-            conn.close()
+        logger.error(f"Error al obtener snapshot de {symbol}: {e}")
+        raise
+
+    snapshot: Dict[str, Any] = {"symbol": symbol, "price": None, "indicators": None, "news": []}
+    for r in rows:
+        snapshot[r["k"]] = r["v"]
+    return snapshot
 
 
 def _format_email_text(
@@ -365,6 +158,86 @@ def _format_email_text(
     return texto
 
 
+# Todas las piezas del resumen diario en un único round-trip.
+# Cada CTE devuelve como mucho una fila; se unen con LEFT JOIN sobre una fila
+# fija para que la ausencia de una parte (p.ej. sin indicadores) no vacíe el resultado.
+# Parámetros: $1 símbolo, $2 nº de noticias, $3 incluir métricas ML, $4 días de métricas ML.
+_DAILY_SUMMARY_SQL = """
+WITH last_p AS (
+    SELECT date, close
+    FROM prices
+    WHERE symbol = $1
+    ORDER BY date DESC
+    LIMIT 1
+),
+prev_p AS (
+    SELECT close
+    FROM prices
+    WHERE symbol = $1
+      AND date < (SELECT date FROM last_p)
+    ORDER BY date DESC
+    LIMIT 1
+),
+ind AS (
+    SELECT sma_20, sma_50, vol_20, rsi_14
+    FROM indicators
+    WHERE symbol = $1
+      AND date = (SELECT date FROM last_p)
+    LIMIT 1
+),
+sig AS (
+    SELECT signal_simple, signal_ensemble
+    FROM signals
+    WHERE symbol = $1
+    ORDER BY date DESC
+    LIMIT 1
+),
+recent_news AS (
+    SELECT json_agg(n ORDER BY n.published_at DESC) AS news
+    FROM (
+        SELECT published_at, title, source, url
+        FROM news
+        WHERE symbol = $1
+        ORDER BY published_at DESC
+        LIMIT $2
+    ) n
+),
+ml AS (
+    SELECT json_agg(m ORDER BY m.mae) AS ml_models
+    FROM (
+        SELECT
+            model_name,
+            AVG(error_abs) AS mae,
+            SQRT(AVG(POWER(error_abs, 2))) AS rmse,
+            COUNT(*) AS n_predictions,
+            AVG(predicted_value) AS avg_predicted,
+            AVG(true_value) AS avg_actual
+        FROM ml_predictions
+        WHERE $3
+          AND symbol = $1
+          AND true_value IS NOT NULL
+          AND prediction_date >= CURRENT_DATE - (INTERVAL '1 day' * $4)
+        GROUP BY model_name
+    ) m
+)
+SELECT
+    last_p.date AS last_date,
+    last_p.close AS last_close,
+    prev_p.close AS prev_close,
+    ind.sma_20, ind.sma_50, ind.vol_20, ind.rsi_14,
+    sig.signal_simple, sig.signal_ensemble,
+    recent_news.news,
+    ml.ml_models
+FROM (SELECT 1) AS base
+LEFT JOIN last_p ON TRUE
+LEFT JOIN prev_p ON TRUE
+LEFT JOIN ind ON TRUE
+LEFT JOIN sig ON TRUE
+CROSS JOIN recent_news
+CROSS JOIN ml
+"""
+
+
 def build_daily_summary(symbol: str = "^IBEX", include_ml_performance: bool = True) -> Dict[str, Any]:
     """
     Construye un resumen diario listo para que lo consuma n8n:
@@ -375,19 +248,69 @@ def build_daily_summary(symbol: str = "^IBEX", include_ml_performance: bool = Tr
     - rendimiento de modelos ML (últimos 7 días)
     - texto plano para email
     
+    Todos los datos se obtienen con una única consulta preparada (_DAILY_SUMMARY_SQL).
+    
     Args:
         symbol: Símbolo del activo
         include_ml_performance: Si True, incluye métricas de predicciones ML
     """
-    last_date, last_close, prev_close, abs_change, pct_change = _get_latest_price(symbol)
-    indicators = _get_indicators_for_date(symbol, last_date)
-    _, signals = _get_latest_signals(symbol)
-    news = _get_recent_news(symbol, limit=5)
-    
-    # Obtener rendimiento de modelos ML
+    ml_days = 7
+    try:
+        with db_conn(readonly=True) as conn, conn.cursor() as cur:
+            # Sentencia preparada: el plan se reutiliza en la conexión del pool
+            execute_prepared(
+                cur,
+                "daily_summary",
+                _DAILY_SUMMARY_SQL,
+                (symbol, 5, include_ml_performance, ml_days),
+                types="text, int, boolean, int",
+            )
+            row = cur.fetchone()
+    except PsycopgError as e:
+        logger.error(f"Error al construir el resumen diario de {symbol}: {e}")
+        raise
+
+    # Precio
+    last_date = row["last_date"]
+    last_close = row["last_close"]
+    prev_close = row["prev_close"]
+    if last_close is None or prev_close is None:
+        abs_change = None
+        pct_change = None
+    else:
+        abs_change = last_close - prev_close
+        pct_change = (abs_change / prev_close) * 100 if prev_close != 0 else None
+
+    indicators = {
+        "sma_20": row["sma_20"],
+        "sma_50": row["sma_50"],
+        "vol_20": row["vol_20"],
+        "rsi_14": row["rsi_14"],
+    }
+    signals = {
+        "simple": row["signal_simple"],
+        "ensemble": row["signal_ensemble"],
+    }
+    # json_agg ya devuelve published_at como texto ISO 8601
+    news = row["news"] or []
+
+    # Rendimiento de modelos ML
     ml_performance = None
     if include_ml_performance:
-        ml_performance = _get_ml_predictions_performance(symbol, last_n_days=7)
+        models_performance = row["ml_models"] or []
+        if not models_performance:
+            ml_performance = {
+                "models": [],
+                "best_model": None,
+                "message": f"No hay predicciones validadas en los últimos {ml_days} días"
+            }
+        else:
+            # El mejor modelo es el primero (menor MAE)
+            ml_performance = {
+                "models": models_performance,
+                "best_model": models_performance[0]["model_name"],
+                "evaluation_period_days": ml_days,
+            }
 
     email_text = _format_email_text(
         symbol,
@@ -4,9 +4,91 @@ Guarda las predicciones diarias de múltiples modelos en la tabla ml_predictions
 para permitir evaluación retrospectiva y comparación de modelos.
 """
 
+import csv
+import io
 from datetime import date
-from psycopg2 import Error as PsycopgError
-from .config import get_db_conn
+from typing import Iterable, Tuple
+from psycopg2.extensions import cursor as TupleCursor
+from psycopg2.extras import execute_batch
+from .config import db_conn, prepare_statement
+from . import logger
+
+
+# ¿Hay que escribir error_abs a mano? Se detecta una vez por proceso: las bases
+# de datos creadas antes de db-init/06_error_abs_generated.sql tienen error_abs
+# como columna normal (docker solo ejecuta db-init/ con el volumen vacío).
+_error_abs_writable = None
+
+
+def error_abs_writable(conn) -> bool:
+    """True si ml_predictions.error_abs es una columna normal (no generada)."""
+    global _error_abs_writable
+    if _error_abs_writable is None:
+        with conn.cursor(cursor_factory=TupleCursor) as cur:
+            cur.execute(
+                """
+                SELECT is_generated
+                FROM information_schema.columns
+                WHERE table_name = 'ml_predictions' AND column_name = 'error_abs'
+                """
+            )
+            row = cur.fetchone()
+        _error_abs_writable = row is not None and row[0] == 'NEVER'
+        if _error_abs_writable:
+            logger.warning(
+                "⚠️ ml_predictions.error_abs no es una columna generada: se escribe "
+                "a mano. Aplica db-init/06_error_abs_generated.sql para migrarla."
+            )
+    return _error_abs_writable
+
+
+def _reset_error_abs(conn) -> str:
+    """Fragmento SET que borra error_abs al re-guardar una predicción (si no es generada)."""
+    return ", error_abs = NULL" if error_abs_writable(conn) else ""
+
+
+# Upsert de una predicción; se prepara una vez por conexión del pool
+_INSERT_PREDICTION_SQL = """
+    INSERT INTO ml_predictions (
+        symbol,
+        prediction_date,
+        run_date,
+        model_name,
+        predicted_value,
+        predicted_signal,
+        true_value
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, NULL)
+    ON CONFLICT (symbol, prediction_date, model_name, run_date)
+    DO UPDATE SET
+        predicted_value = EXCLUDED.predicted_value,
+        predicted_signal = EXCLUDED.predicted_signal,
+        true_value = NULL{reset_error_abs}
+"""
+
+
+def prediction_rows(
+    symbol: str,
+    prediction_date: date,
+    run_date: date,
+    predictions: dict,
+) -> list:
+    """Convierte el dict de predicciones por modelo en filas para ml_predictions.
+    
+    Returns:
+        Lista de tuplas (symbol, prediction_date, run_date, model_name, price, signal)
+    """
+    return [
+        (
+            symbol,
+            prediction_date,
+            run_date,
+            model_name,
+            float(values["price"]) if values.get("price") is not None else None,    # puede ser float o None
+            int(values["signal"]) if values.get("signal") is not None else None,   # normalmente -1, 0, 1
+        )
+        for model_name, values in predictions.items()
+    ]
 
 
 def save_daily_predictions(
@@ -46,55 +128,103 @@ def save_daily_predictions(
         
     Note:
         - Usa ON CONFLICT para actualizar si ya existe predicción
-        - true_value y error_abs se rellenan después con validate_predictions
+        - La conexión sale del pool y el INSERT es una sentencia preparada
+        - Si falla, db_conn() hace rollback y se propaga PsycopgError
+        - true_value se rellena después con validate_predictions (error_abs es
+          una columna generada; en bases sin migrar se pone a NULL aquí)
         - Permite comparar rendimiento entre modelos
     """
-    conn = None
-    try:
-        conn = get_db_conn()
+    rows = prediction_rows(symbol, prediction_date, run_date, predictions)
+
+    with db_conn() as conn:
+        with conn.cursor() as cur:
+            # Parse/plan una sola vez por backend; los EXECUTE se envían
+            # agrupados en lotes (un round-trip por página)
+            prepare_statement(
+                cur,
+                "ins_pred",
+                _INSERT_PREDICTION_SQL.format(reset_error_abs=_reset_error_abs(conn)),
+                types="text, date, date, text, float8, int",
+            )
+            execute_batch(
+                cur,
+                "EXECUTE ins_pred (%s, %s, %s, %s, %s, %s)",
+                rows,
+                page_size=200,
+            )
+
+        conn.commit()
+
+
+def save_predictions_bulk(rows: Iterable[Tuple]) -> int:
+    """Guarda muchas predicciones de golpe (varias fechas/símbolos) con COPY.
+    
+    Pensado para backfills: las filas se vuelcan con COPY a una tabla temporal
+    y se aplican con un único INSERT ... SELECT ... ON CONFLICT, todo en la
+    misma transacción.
+    
+    Args:
+        rows: Tuplas (symbol, prediction_date, run_date, model_name, price, signal),
+            p.ej. concatenando varias llamadas a prediction_rows()
+        
+    Returns:
+        int: Número de filas enviadas
+        
+    Raises:
+        PsycopgError: Si hay error en la inserción a PostgreSQL
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    n = 0
+    for symbol, prediction_date, run_date, model_name, price, signal in rows:
+        # None -> campo vacío -> NULL en COPY csv
+        writer.writerow(
+            (symbol, prediction_date.isoformat(), run_date.isoformat(), model_name, price, signal)
+        )
+        n += 1
+    if n == 0:
+        return 0
+    buf.seek(0)
 
+    with db_conn() as conn:
         with conn.cursor() as cur:
-            for model_name, values in predictions.items():
-                predicted_price = values.get("price")      # puede ser float o None
-                predicted_signal = values.get("signal")    # normalmente -1, 0, 1
-
-                # INSERT con ON CONFLICT sobre la clave única
-                cur.execute(
-                    """
-                    INSERT INTO ml_predictions (
-                        symbol,
-                        prediction_date,
-                        run_date,
-                        model_name,
-                        predicted_value,
-                        predicted_signal,
-                        true_value,
-                        error_abs
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, NULL, NULL)
-                    ON CONFLICT (symbol, prediction_date, model_name, run_date)
-                    DO UPDATE SET
-                        predicted_value = EXCLUDED.predicted_value,
-                        predicted_signal = EXCLUDED.predicted_signal,
-                        true_value = NULL,
-                        error_abs = NULL;
-                    """,
-                    (
-                        symbol,
-                        prediction_date,
-                        run_date,
-                        model_name,
-                        float(predicted_price) if predicted_price is not None else None,
-                        int(predicted_signal) if predicted_signal is not None else None,
-                    ),
+            cur.execute(
+                """
+                CREATE TEMP TABLE _pred_stage (
+                    symbol TEXT,
+                    prediction_date DATE,
+                    run_date DATE,
+                    model_name TEXT,
+                    predicted_value DOUBLE PRECISION,
+                    predicted_signal INTEGER
+                ) ON COMMIT DROP;
+                """
+            )
+            cur.copy_expert("COPY _pred_stage FROM STDIN WITH (FORMAT csv)", buf)
+            # DISTINCT ON: un mismo INSERT no puede actualizar dos veces la misma fila
+            cur.execute(
+                """
+                INSERT INTO ml_predictions (
+                    symbol,
+                    prediction_date,
+                    run_date,
+                    model_name,
+                    predicted_value,
+                    predicted_signal,
+                    true_value
                 )
+                SELECT DISTINCT ON (symbol, prediction_date, model_name, run_date)
+                    symbol, prediction_date, run_date, model_name,
+                    predicted_value, predicted_signal, NULL
+                FROM _pred_stage
+                ON CONFLICT (symbol, prediction_date, model_name, run_date)
+                DO UPDATE SET
+                    predicted_value = EXCLUDED.predicted_value,
+                    predicted_signal = EXCLUDED.predicted_signal,
+                    true_value = NULL{reset_error_abs};
+                """.format(reset_error_abs=_reset_error_abs(conn))
+            )
 
         conn.commit()
 
-    except PsycopgError:
-        if conn:
-            conn.rollback()
-        raise
-    finally:
-        if conn:
-            conn.close()
+    return n
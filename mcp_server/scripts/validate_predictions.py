@@ -6,16 +6,25 @@ y calcula métricas de error para evaluar el rendimiento de los modelos.
 
 from datetime import date, timedelta
 from psycopg2 import Error as PsycopgError
-from .config import get_db_conn
+from psycopg2.extensions import cursor as TupleCursor
+from .config import db_conn
+from .save_predictions import error_abs_writable
+from . import logger
+
+
+def _error_abs_assignment(cur) -> str:
+    """Devuelve el fragmento SET para error_abs si la columna no es generada."""
+    return ", error_abs = ABS(m.predicted_value - p.close)" if error_abs_writable(cur.connection) else ""
 
 
 def validate_predictions_for_date(target_date: date):
     """Valida predicciones contra valores reales para una fecha específica.
     
-    Workflow:
-    1. Obtiene precios reales de cierre para la fecha objetivo
-    2. Actualiza ml_predictions con true_value
-    3. Calcula error_abs = |predicted_value - true_value|
+    Workflow (una sola sentencia en la BD):
+    1. Toma los precios reales de cierre para la fecha objetivo
+    2. Actualiza ml_predictions con true_value (UPDATE ... FROM prices)
+    3. Postgres calcula error_abs = |predicted_value - true_value|
+       (columna generada; en bases sin migrar se escribe en el mismo UPDATE)
     
     Args:
         target_date: Fecha para validar (debe existir en tabla prices)
@@ -34,28 +43,48 @@ def validate_predictions_for_date(target_date: date):
         - Solo actualiza predicciones donde existe precio real
         - Útil para ejecutar diariamente y evaluar accuracy
         - Permite calcular MAE, RMSE por modelo posteriormente
+        - Usa synchronous_commit = off: un fallo del servidor puede perder
+          como mucho este UPDATE, que se recalcula igual al reejecutar
     """
-    conn = get_db_conn()
-    real_prices = {}
-    updated = 0
-
     try:
-        with conn.cursor() as cur:
-            # 1) Obtener precios reales de ese día
-            cur.execute(
-                """
-                SELECT symbol, close
-                FROM prices
-                WHERE date = %s
-                """,
-                (target_date,),
-            )
-            rows = cur.fetchall()
-
-            real_prices = {row['symbol']: row['close'] for row in rows}
+        with db_conn() as conn:
+            # Cursor de tuplas: solo se lee una fila de dos columnas
+            with conn.cursor(cursor_factory=TupleCursor) as cur:
+                # La validación es determinista e idempotente: si el servidor
+                # cae antes de volcar el WAL, basta con volver a ejecutarla.
+                # LOCAL limita el ajuste a esta transacción.
+                cur.execute("SET LOCAL synchronous_commit = off")
+
+                # Precios del día + UPDATE ... FROM en una única sentencia; el
+                # UPDATE devuelve (RETURNING) las filas que ha validado
+                cur.execute(
+                    """
+                    WITH p AS (
+                        SELECT symbol, close
+                        FROM prices
+                        WHERE date = %(d)s
+                    ),
+                    upd AS (
+                        UPDATE ml_predictions m
+                        SET true_value = p.close{set_error_abs}
+                        FROM p
+                        WHERE m.prediction_date = %(d)s
+                          AND m.symbol = p.symbol
+                        RETURNING m.symbol
+                    )
+                    SELECT
+                        (SELECT array_agg(symbol ORDER BY symbol) FROM p) AS symbols_with_price,
+                        (SELECT COUNT(*) FROM upd) AS rows_updated;
+                    """.format(set_error_abs=_error_abs_assignment(cur)),
+                    {"d": target_date},
+                )
+                symbols_with_price, rows_updated = cur.fetchone()
+
+            symbols_with_price = symbols_with_price or []
 
             # Si no hay precios para esa fecha, devolvemos algo informativo
-            if not real_prices:
+            if not symbols_with_price:
+                conn.rollback()
                 return {
                     "target_date": target_date.isoformat(),
                     "symbols_with_price": [],
@@ -63,47 +92,132 @@ def validate_predictions_for_date(target_date: date):
                     "message": "No hay precios en 'prices' para esa fecha",
                 }
 
-            # 2) Actualizar ml_predictions para cada símbolo con precio real
-            for symbol, real_price in real_prices.items():
-                cur.execute(
-                    """
-                    UPDATE ml_predictions
-                    SET
-                        true_value = %s,
-                        error_abs = ABS(predicted_value - %s)
-                    WHERE prediction_date = %s
-                      AND symbol = %s;
-                    """,
-                    (real_price, real_price, target_date, symbol),
-                )
-                updated += cur.rowcount
+            # Si todo ha ido bien, confirmamos
+            conn.commit()
 
-        # Si todo ha ido bien, confirmamos
-        conn.commit()
+            return {
+                "target_date": target_date.isoformat(),
+                "symbols_with_price": symbols_with_price,
+                "rows_updated": rows_updated,
+            }
 
+    except PsycopgError as e:
+        logger.exception(f"❌ Error de BD validando predicciones de {target_date}: {e}")
+        # ⚠️ En vez de `raise`, devolvemos un error controlado (ok=False)
         return {
+            "ok": False,
             "target_date": target_date.isoformat(),
-            "symbols_with_price": list(real_prices.keys()),
-            "rows_updated": updated,
+            "symbols_with_price": [],
+            "rows_updated": 0,
+            "error": "database_error",
+            "message": "Error de base de datos al validar predicciones",
         }
 
+
+# Un lote de predicciones pendientes (paginado por id) validado en una sola
+# sentencia; devuelve el último id del lote y cuántas filas se tocaron
+_VALIDATE_BATCH_SQL = """
+WITH batch AS (
+    SELECT id, symbol, prediction_date
+    FROM ml_predictions
+    WHERE prediction_date BETWEEN %(start)s AND %(end)s
+      AND true_value IS NULL
+      AND id > %(last_id)s
+    ORDER BY id
+    LIMIT %(batch_size)s
+),
+upd AS (
+    UPDATE ml_predictions m
+    SET true_value = p.close{set_error_abs}
+    FROM batch b
+    JOIN prices p
+      ON p.symbol = b.symbol
+     AND p.date = b.prediction_date
+    WHERE m.id = b.id
+    RETURNING m.id
+)
+SELECT
+    (SELECT MAX(id) FROM batch) AS last_id,
+    (SELECT COUNT(*) FROM batch) AS batch_rows,
+    (SELECT COUNT(*) FROM upd) AS rows_updated;
+"""
+
+
+def validate_predictions_between(start: date, end: date, batch_size: int = 5000):
+    """Valida todas las predicciones pendientes de un rango de fechas por lotes.
+    
+    Pensado para recuperar validaciones atrasadas (p.ej. si el scheduler no
+    se ha ejecutado en días): en lugar de un único UPDATE enorme con una
+    transacción larga, recorre las predicciones sin true_value por id
+    (keyset) y confirma cada lote por separado.
+    
+    Args:
+        start: Primera fecha de predicción a validar (incluida)
+        end: Última fecha de predicción a validar (incluida)
+        batch_size: Predicciones revisadas por lote/transacción
+        
+    Returns:
+        dict: {
+            "start_date": "2025-11-01",
+            "end_date": "2025-11-26",
+            "batches": 3,
+            "rows_updated": 12000
+        }
+        
+    Note:
+        Las predicciones sin precio real para su fecha se saltan y quedan
+        pendientes para una ejecución posterior.
+    """
+    last_id = 0
+    batches = 0
+    rows_updated = 0
+
+    try:
+        with db_conn() as conn:
+            while True:
+                with conn.cursor(cursor_factory=TupleCursor) as cur:
+                    # Igual que en validate_predictions_for_date: idempotente
+                    cur.execute("SET LOCAL synchronous_commit = off")
+                    cur.execute(
+                        _VALIDATE_BATCH_SQL.format(set_error_abs=_error_abs_assignment(cur)),
+                        {
+                            "start": start,
+                            "end": end,
+                            "last_id": last_id,
+                            "batch_size": batch_size,
+                        },
+                    )
+                    batch_last_id, batch_rows, batch_updated = cur.fetchone()
+                conn.commit()
+
+                if not batch_rows:
+                    break
+
+                batches += 1
+                rows_updated += batch_updated
+                last_id = batch_last_id
+
+                if batch_rows < batch_size:
+                    break
+
     except PsycopgError as e:
-        if conn is not None and not conn.closed:
-            conn.rollback()
-        print(f"[validate_predictions_for_date] Error de BD: {e}")
-        # ⚠️ En vez de `raise`, devolvemos un error controlado
+        logger.exception(f"❌ Error de BD validando predicciones de {start} a {end}: {e}")
         return {
-            "target_date": target_date.isoformat(),
-            "symbols_with_price": [],
-            "rows_updated": 0,
+            "ok": False,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "batches": batches,
+            "rows_updated": rows_updated,
             "error": "database_error",
             "message": "Error de base de datos al validar predicciones",
         }
 
-    finally:
-        # Cerramos la conexión solo si sigue abierta
-        if conn is not None and not conn.closed:
-            conn.close()
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "batches": batches,
+        "rows_updated": rows_updated,
+    }
 
 
 def validate_predictions_yesterday():
@@ -19,6 +19,6 @@ docker run --rm -i \
   python:3.11-slim \
   bash -c "
     cd /app && \
-    pip install -q mcp yfinance feedparser pandas psycopg2-binary python-dotenv scikit-learn xgboost lightgbm catboost prophet && \
+    pip install -q mcp yfinance lxml ciso8601 cachetools pandas psycopg2-binary python-dotenv scikit-learn xgboost lightgbm catboost prophet && \
     python /app/mcp_server_claude/server.py
   "
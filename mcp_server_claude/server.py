@@ -12,13 +12,18 @@ Herramientas disponibles para Claude:
 - get_news: Obtener últimas noticias
 - update_data: Actualizar datos del mercado
 - get_daily_summary: Resumen completo del día
+- get_market_snapshot: Precio, indicadores y noticias en una sola llamada
 """
 
 import asyncio
 import os
 import sys
-from datetime import date, datetime
-from typing import Any, Optional
+import threading
+from datetime import date
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+from cachetools.keys import hashkey
 
 # Añadir el directorio padre al path para importar scripts
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -30,13 +35,13 @@ from mcp import types
 
 # Importar funciones del sistema de predicción
 try:
-    from mcp_server.scripts.config import get_db_conn
+    from mcp_server.scripts.config import db_conn, execute_prepared
     from mcp_server.scripts.assets import resolve_symbol
     from mcp_server.scripts.fetch_data import update_prices_for_symbol
     from mcp_server.scripts.indicators import compute_indicators_for_symbol
     from mcp_server.scripts.news import update_news_for_symbols
     from mcp_server.scripts.models import predict_ensemble, predict_simple
-    from mcp_server.scripts.reporting import build_daily_summary
+    from mcp_server.scripts.reporting import build_daily_summary, get_market_snapshot
     from mcp_server.scripts.validate_predictions import validate_predictions_yesterday
 except ImportError as e:
     print(f"Error importando módulos: {e}", file=sys.stderr)
@@ -55,88 +60,127 @@ SUPPORTED_MARKETS = [
 ]
 
 
+# Caché en memoria de las lecturas por símbolo: dentro de una sesión Claude
+# repite las mismas consultas y los datos solo cambian con las actualizaciones
+# diarias. La clave incluye la fecha para no arrastrar datos de ayer.
+READ_CACHE_TTL = int(os.getenv("MCP_READ_CACHE_TTL", "120"))
+_price_cache: TTLCache = TTLCache(maxsize=256, ttl=READ_CACHE_TTL)
+_indicators_cache: TTLCache = TTLCache(maxsize=256, ttl=READ_CACHE_TTL)
+_news_cache: TTLCache = TTLCache(maxsize=256, ttl=READ_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+
+def _cached(cache: TTLCache, key: tuple, loader: Callable[[], Any]) -> Any:
+    """Devuelve el valor cacheado o lo carga; las respuestas de error no se guardan."""
+    with _cache_lock:
+        value = cache.get(key)
+    if value is not None:
+        return value
+    
+    value = loader()
+    if not (isinstance(value, dict) and "error" in value):
+        with _cache_lock:
+            cache[key] = value
+    return value
+
+
+def invalidate_symbol_cache(symbol: str) -> None:
+    """Elimina de la caché las lecturas de un símbolo tras actualizar sus datos."""
+    today = date.today()
+    with _cache_lock:
+        _price_cache.pop(hashkey(symbol, today), None)
+        _indicators_cache.pop(hashkey(symbol, today), None)
+        for key in [k for k in _news_cache if k[0] == symbol]:
+            _news_cache.pop(key, None)
+
+
 def get_latest_price(symbol: str) -> dict[str, Any]:
     """Obtiene el último precio disponible para un símbolo."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT date, close, open, high, low, volume
-                FROM prices
-                WHERE symbol = %s
-                ORDER BY date DESC
-                LIMIT 1
-            """, (symbol,))
-            row = cur.fetchone()
-            
-            if not row:
-                return {"error": f"No hay datos de precios para {symbol}"}
-            
-            return {
-                "symbol": symbol,
-                "date": row["date"].isoformat(),
-                "close": float(row["close"]),
-                "open": float(row["open"]) if row["open"] else None,
-                "high": float(row["high"]) if row["high"] else None,
-                "low": float(row["low"]) if row["low"] else None,
-                "volume": int(row["volume"]) if row["volume"] else 0,
-            }
-    finally:
-        conn.close()
+    return _cached(_price_cache, hashkey(symbol, date.today()),
+                   lambda: _query_latest_price(symbol))
+
+
+def _query_latest_price(symbol: str) -> dict[str, Any]:
+    with db_conn(readonly=True) as conn, conn.cursor() as cur:
+        execute_prepared(cur, "latest_price", """
+            SELECT date, close, open, high, low, volume
+            FROM prices
+            WHERE symbol = $1
+            ORDER BY date DESC
+            LIMIT 1
+        """, (symbol,), types="text")
+        row = cur.fetchone()
+        
+        if not row:
+            return {"error": f"No hay datos de precios para {symbol}"}
+        
+        return {
+            "symbol": symbol,
+            "date": row["date"].isoformat(),
+            "close": float(row["close"]),
+            "open": float(row["open"]) if row["open"] else None,
+            "high": float(row["high"]) if row["high"] else None,
+            "low": float(row["low"]) if row["low"] else None,
+            "volume": int(row["volume"]) if row["volume"] else 0,
+        }
 
 
 def get_latest_indicators(symbol: str) -> dict[str, Any]:
     """Obtiene los últimos indicadores técnicos."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT date, sma_20, sma_50, vol_20, rsi_14
-                FROM indicators
-                WHERE symbol = %s
-                ORDER BY date DESC
-                LIMIT 1
-            """, (symbol,))
-            row = cur.fetchone()
-            
-            if not row:
-                return {"error": f"No hay indicadores calculados para {symbol}"}
-            
-            return {
-                "symbol": symbol,
-                "date": row["date"].isoformat(),
-                "sma_20": float(row["sma_20"]) if row["sma_20"] else None,
-                "sma_50": float(row["sma_50"]) if row["sma_50"] else None,
-                "volatility_20": float(row["vol_20"]) if row["vol_20"] else None,
-                "rsi_14": float(row["rsi_14"]) if row["rsi_14"] else None,
-            }
-    finally:
-        conn.close()
+    return _cached(_indicators_cache, hashkey(symbol, date.today()),
+                   lambda: _query_latest_indicators(symbol))
+
+
+def _query_latest_indicators(symbol: str) -> dict[str, Any]:
+    with db_conn(readonly=True) as conn, conn.cursor() as cur:
+        execute_prepared(cur, "latest_indicators", """
+            SELECT date, sma_20, sma_50, vol_20, rsi_14
+            FROM indicators
+            WHERE symbol = $1
+            ORDER BY date DESC
+            LIMIT 1
+        """, (symbol,), types="text")
+        row = cur.fetchone()
+        
+        if not row:
+            return {"error": f"No hay indicadores calculados para {symbol}"}
+        
+        return {
+            "symbol": symbol,
+            "date": row["date"].isoformat(),
+            "sma_20": float(row["sma_20"]) if row["sma_20"] else None,
+            "sma_50": float(row["sma_50"]) if row["sma_50"] else None,
+            "volatility_20": float(row["vol_20"]) if row["vol_20"] else None,
+            "rsi_14": float(row["rsi_14"]) if row["rsi_14"] else None,
+        }
 
 
 def get_recent_news(symbol: str, limit: int = 5) -> list[dict[str, Any]]:
     """Obtiene las últimas noticias."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT published_at, title, source, url, sentiment
-                FROM news
-                WHERE symbol = %s
-                ORDER BY published_at DESC
-                LIMIT %s
-            """, (symbol, limit))
-            rows = cur.fetchall()
-            
-            return [{
-                "published_at": row["published_at"].isoformat() if isinstance(row["published_at"], datetime) else str(row["published_at"]),
-                "title": row["title"],
-                "source": row["source"],
-                "url": row["url"],
-                "sentiment": float(row["sentiment"]) if row["sentiment"] else None,
-            } for row in rows]
-    finally:
-        conn.close()
+    return _cached(_news_cache, hashkey(symbol, date.today(), limit),
+                   lambda: _query_recent_news(symbol, limit))
+
+
+def _query_recent_news(symbol: str, limit: int) -> list[dict[str, Any]]:
+    # sentiment ya es float8/NULL; la fecha se serializa con isoformat() en
+    # Python para conservar la zona horaria (y los microsegundos) si la hay
+    with db_conn(readonly=True) as conn, conn.cursor() as cur:
+        execute_prepared(cur, "recent_news", """
+            SELECT published_at, title, source, url, sentiment
+            FROM news
+            WHERE symbol = $1
+            ORDER BY published_at DESC
+            LIMIT $2
+        """, (symbol, limit), types="text, int")
+        rows = [dict(row) for row in cur.fetchall()]
+    for row in rows:
+        row["published_at"] = row["published_at"].isoformat()
+    return rows
+
+
+# Etiquetas de señal (+1 compra, -1 venta, 0 neutral)
+_SIGNAL = {1: "🟢 COMPRA", -1: "🔴 VENTA", 0: "⚪ NEUTRAL"}
+_SIGNAL_ENSEMBLE = {1: "🟢 COMPRA (+1)", -1: "🔴 VENTA (-1)", 0: "⚪ NEUTRAL (0)"}
 
 
 @server.list_tools()
@@ -298,6 +342,32 @@ async def handle_list_tools() -> list[types.Tool]:
                 "required": ["market"]
             }
         ),
+        types.Tool(
+            name="get_market_snapshot",
+            description="""Obtiene de una vez el último precio, los últimos indicadores
+            técnicos y las noticias recientes de un mercado.
+            
+            Equivale a get_market_price + get_indicators + get_news, pero con
+            una sola consulta a la base de datos.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "market": {
+                        "type": "string",
+                        "description": "Nombre del mercado (30+ índices disponibles)",
+                        "enum": SUPPORTED_MARKETS
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Número máximo de noticias (por defecto: 5)",
+                        "default": 5,
+                        "minimum": 1,
+                        "maximum": 20
+                    }
+                },
+                "required": ["market"]
+            }
+        ),
         types.Tool(
             name="validate_predictions",
             description="""Valida las predicciones del día anterior contra valores reales.
@@ -316,7 +386,13 @@ async def handle_list_tools() -> list[types.Tool]:
 async def handle_call_tool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    """Maneja las llamadas a herramientas desde Claude."""
+    """Maneja las llamadas a herramientas desde Claude.
+    
+    Las consultas a la BD y los modelos son síncronos (psycopg2, sklearn):
+    se ejecutan con asyncio.to_thread para no bloquear el event loop y
+    poder atender varias llamadas a la vez. El pool de conexiones de
+    config es thread-safe.
+    """
     
     if not arguments:
         arguments = {}
@@ -325,17 +401,20 @@ async def handle_call_tool(
         if name == "get_market_price":
             market = arguments["market"]
             symbol = resolve_symbol(market)
-            result = get_latest_price(symbol)
+            result = await asyncio.to_thread(get_latest_price, symbol)
             
             return [types.TextContent(
                 type="text",
-                text=f"📊 Último precio de {market}:\n\n" + 
-                     f"• Fecha: {result.get('date', 'N/A')}\n" +
-                     f"• Cierre: {result.get('close', 'N/A'):,.2f}\n" +
-                     f"• Apertura: {result.get('open', 'N/A'):,.2f}\n" +
-                     f"• Máximo: {result.get('high', 'N/A'):,.2f}\n" +
-                     f"• Mínimo: {result.get('low', 'N/A'):,.2f}\n" +
-                     f"• Volumen: {result.get('volume', 0):,}"
+                text="\n".join([
+                    f"📊 Último precio de {market}:",
+                    "",
+                    f"• Fecha: {result.get('date', 'N/A')}",
+                    f"• Cierre: {result.get('close', 'N/A'):,.2f}",
+                    f"• Apertura: {result.get('open', 'N/A'):,.2f}",
+                    f"• Máximo: {result.get('high', 'N/A'):,.2f}",
+                    f"• Mínimo: {result.get('low', 'N/A'):,.2f}",
+                    f"• Volumen: {result.get('volume', 0):,}",
+                ])
             )]
         
         elif name == "get_prediction":
@@ -343,30 +422,35 @@ async def handle_call_tool(
             force_retrain = arguments.get("force_retrain", False)
             symbol = resolve_symbol(market)
             
-            result = predict_ensemble(symbol, force_retrain=force_retrain)
+            result = await asyncio.to_thread(predict_ensemble, symbol, force_retrain=force_retrain)
             
             # Formatear resultados de modelos
             ml_summary = "\n".join([
                 f"  • {m['model_name']}: {m['prediction_next_day']:,.2f} → "
-                f"{'🟢 COMPRA' if m['signal_next_day'] == 1 else '🔴 VENTA' if m['signal_next_day'] == -1 else '⚪ NEUTRAL'}"
+                f"{_SIGNAL.get(m['signal_next_day'], _SIGNAL[0])}"
                 for m in result.get("ml_models", [])
             ])
             
-            signal_ensemble = result.get("signal_ensemble", 0)
-            signal_text = "🟢 COMPRA (+1)" if signal_ensemble == 1 else "🔴 VENTA (-1)" if signal_ensemble == -1 else "⚪ NEUTRAL (0)"
+            signal_text = _SIGNAL_ENSEMBLE.get(result.get("signal_ensemble", 0), _SIGNAL_ENSEMBLE[0])
             
             return [types.TextContent(
                 type="text",
-                text=f"🤖 Predicción ML para {market}:\n\n" +
-                     f"📊 Señal del Ensemble: {signal_text}\n\n" +
-                     f"Predicciones individuales:\n{ml_summary}\n\n" +
-                     f"{'⚡ Modelos reentrenados' if force_retrain else '📦 Usando modelos guardados'}"
+                text="\n".join([
+                    f"🤖 Predicción ML para {market}:",
+                    "",
+                    f"📊 Señal del Ensemble: {signal_text}",
+                    "",
+                    "Predicciones individuales:",
+                    ml_summary,
+                    "",
+                    "⚡ Modelos reentrenados" if force_retrain else "📦 Usando modelos guardados",
+                ])
             )]
         
         elif name == "get_indicators":
             market = arguments["market"]
             symbol = resolve_symbol(market)
-            result = get_latest_indicators(symbol)
+            result = await asyncio.to_thread(get_latest_indicators, symbol)
             
             if "error" in result:
                 return [types.TextContent(type="text", text=f"❌ {result['error']}")]
@@ -376,19 +460,22 @@ async def handle_call_tool(
             
             return [types.TextContent(
                 type="text",
-                text=f"📈 Indicadores técnicos de {market}:\n\n" +
-                     f"• Fecha: {result.get('date', 'N/A')}\n" +
-                     f"• SMA 20: {result.get('sma_20', 'N/A'):,.2f}\n" +
-                     f"• SMA 50: {result.get('sma_50', 'N/A'):,.2f}\n" +
-                     f"• RSI 14: {result.get('rsi_14', 'N/A'):.1f} {rsi_signal}\n" +
-                     f"• Volatilidad 20d: {result.get('volatility_20', 'N/A'):.4f}"
+                text="\n".join([
+                    f"📈 Indicadores técnicos de {market}:",
+                    "",
+                    f"• Fecha: {result.get('date', 'N/A')}",
+                    f"• SMA 20: {result.get('sma_20', 'N/A'):,.2f}",
+                    f"• SMA 50: {result.get('sma_50', 'N/A'):,.2f}",
+                    f"• RSI 14: {result.get('rsi_14', 'N/A'):.1f} {rsi_signal}",
+                    f"• Volatilidad 20d: {result.get('volatility_20', 'N/A'):.4f}",
+                ])
             )]
         
         elif name == "get_news":
             market = arguments["market"]
             limit = arguments.get("limit", 5)
             symbol = resolve_symbol(market)
-            news_list = get_recent_news(symbol, limit)
+            news_list = await asyncio.to_thread(get_recent_news, symbol, limit)
             
             if not news_list:
                 return [types.TextContent(
@@ -412,38 +499,81 @@ async def handle_call_tool(
             symbol = resolve_symbol(market)
             
             # Actualizar precios
-            rows_prices = update_prices_for_symbol(symbol, period)
+            rows_prices = await asyncio.to_thread(update_prices_for_symbol, symbol, period)
             
             # Calcular indicadores
-            rows_indicators = compute_indicators_for_symbol(symbol)
+            rows_indicators = await asyncio.to_thread(compute_indicators_for_symbol, symbol)
+            
+            invalidate_symbol_cache(symbol)
             
             return [types.TextContent(
                 type="text",
-                text=f"✅ Datos actualizados para {market}:\n\n" +
-                     f"• Precios: {rows_prices} filas actualizadas\n" +
-                     f"• Indicadores: {rows_indicators} filas calculadas\n" +
-                     f"• Período: {period}"
+                text="\n".join([
+                    f"✅ Datos actualizados para {market}:",
+                    "",
+                    f"• Precios: {rows_prices} filas actualizadas",
+                    f"• Indicadores: {rows_indicators} filas calculadas",
+                    f"• Período: {period}",
+                ])
             )]
         
         elif name == "get_daily_summary":
             market = arguments["market"]
             symbol = resolve_symbol(market)
-            summary = build_daily_summary(symbol)
+            summary = await asyncio.to_thread(build_daily_summary, symbol)
             
             return [types.TextContent(
                 type="text",
                 text=summary.get("email_text", "No hay resumen disponible")
             )]
         
+        elif name == "get_market_snapshot":
+            market = arguments["market"]
+            limit = arguments.get("limit", 5)
+            symbol = resolve_symbol(market)
+            snapshot = await asyncio.to_thread(get_market_snapshot, symbol, news_limit=limit)
+            
+            price = snapshot["price"]
+            ind = snapshot["indicators"]
+            
+            if price:
+                price_text = (
+                    f"• Fecha: {price['date']}\n"
+                    f"• Cierre: {price['close']:,.2f}"
+                )
+            else:
+                price_text = f"No hay datos de precios para {symbol}"
+            
+            if ind:
+                ind_text = ", ".join(
+                    f"{label} {ind[key]:,.2f}"
+                    for label, key in (("SMA20", "sma_20"), ("SMA50", "sma_50"), ("RSI14", "rsi_14"))
+                    if ind[key] is not None
+                ) or "sin valores"
+            else:
+                ind_text = f"No hay indicadores calculados para {symbol}"
+            
+            news_text = "\n".join(
+                f"{i+1}. {n['title']}" for i, n in enumerate(snapshot["news"])
+            ) or "Sin noticias recientes"
+            
+            return [types.TextContent(
+                type="text",
+                text=f"📊 {market}\n\n{price_text}\n\n📈 Indicadores: {ind_text}\n\n📰 Noticias:\n{news_text}"
+            )]
+        
         elif name == "validate_predictions":
-            result = validate_predictions_yesterday()
+            result = await asyncio.to_thread(validate_predictions_yesterday)
             
             return [types.TextContent(
                 type="text",
-                text=f"✅ Predicciones validadas:\n\n" +
-                     f"• Fecha objetivo: {result['target_date']}\n" +
-                     f"• Símbolos con precio: {', '.join(result['symbols_with_price'])}\n" +
-                     f"• Filas actualizadas: {result['rows_updated']}"
+                text="\n".join([
+                    "✅ Predicciones validadas:",
+                    "",
+                    f"• Fecha objetivo: {result['target_date']}",
+                    f"• Símbolos con precio: {', '.join(result['symbols_with_price'])}",
+                    f"• Filas actualizadas: {result['rows_updated']}",
+                ])
             )]
         
         else:
@@ -13,9 +13,17 @@ Features:
 - No external workflow engine needed
 """
 
+import asyncio
+import signal
 import sys
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor as FuturesThreadPool
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, time
+from functools import lru_cache
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 import logging
@@ -23,13 +31,13 @@ import logging
 # Add path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'mcp_server', 'scripts'))
 
-from mcp_server.scripts.fetch_data import fetch_and_store_prices
+from mcp_server.scripts import DEFAULT_SYMBOLS
+from mcp_server.scripts.fetch_data import update_prices_for_symbol
 from mcp_server.scripts.indicators import compute_indicators_for_symbol
 from mcp_server.scripts.advanced_indicators import compute_advanced_indicators_for_symbol
-from mcp_server.scripts.models import predict_ensemble
+from mcp_server.scripts.models import predict_ensemble, refit_prophet_model
 from mcp_server.scripts.validate_predictions import validate_predictions_yesterday
-from mcp_server.scripts.reporting import generate_daily_report
-from mcp_server.scripts.assets import get_symbols
+from mcp_server.scripts.reporting import build_daily_summary
 
 # Logging
 logging.basicConfig(
@@ -39,6 +47,137 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# PARALLEL EXECUTION HELPERS
+# ============================================================================
+
+# Symbols processed at the same time by each task
+TASK_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", 8))
+
+# Max seconds a single symbol may take before it is reported as failed
+SYMBOL_TIMEOUT = int(os.getenv("SCHEDULER_SYMBOL_TIMEOUT", 600))
+
+# Process pool shared by all CPU-bound tasks, created on first use so that
+# workers (and the models they import) are reused across scheduled runs
+PROCESS_WORKERS = min(TASK_CONCURRENCY, os.cpu_count() or 1)
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Return the shared ProcessPoolExecutor, creating it if needed."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+        return _process_pool
+
+
+def reset_process_pool():
+    """Discard the shared pool (e.g. after a worker crashed and broke it)."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+async def run_parallel(fn, symbols, concurrency=TASK_CONCURRENCY, executor=None,
+                       timeout=SYMBOL_TIMEOUT):
+    """Run fn(symbol) for every symbol concurrently, at most `concurrency` at once.
+    
+    Each call runs in `executor` (the loop's default thread pool if None).
+    Results are returned in the same order as `symbols`; a failing symbol
+    yields its exception instead of aborting the rest. A symbol that takes
+    longer than `timeout` seconds yields asyncio.TimeoutError. The worker
+    itself is not killed: to stop it from blocking the caller, pass an
+    executor you own and shut it down with wait=False afterwards (as
+    run_for_symbols does), since asyncio.run() joins the default executor.
+    """
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(symbol):
+        async with sem:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, fn, symbol), timeout
+            )
+
+    return await asyncio.gather(*(one(s) for s in symbols), return_exceptions=True)
+
+
+def run_for_symbols(fn, symbols, use_processes=False):
+    """Synchronous wrapper around run_parallel for the scheduled tasks.
+    
+    CPU-bound work (model training/prediction) goes to the shared process
+    pool so it is not serialized by the GIL; I/O-bound work uses threads.
+    
+    The thread pool is created per call and shut down without waiting, so a
+    symbol that hit SYMBOL_TIMEOUT does not keep the task blocked: its thread
+    finishes in the background. A timed-out process keeps its worker busy
+    until it finishes.
+    """
+    if not use_processes:
+        executor = FuturesThreadPool(
+            max_workers=TASK_CONCURRENCY, thread_name_prefix="scheduler-symbol"
+        )
+        try:
+            return asyncio.run(run_parallel(fn, symbols, executor=executor))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    results = asyncio.run(run_parallel(
+        fn, symbols, concurrency=PROCESS_WORKERS, executor=get_process_pool()
+    ))
+    if any(isinstance(r, BrokenProcessPool) for r in results):
+        logger.warning("⚠️  Process pool broken, it will be recreated on next run")
+        reset_process_pool()
+    return results
+
+
+@lru_cache(maxsize=1)
+def _symbols():
+    """Symbol list shared by all tasks, loaded once per process.
+    
+    Send SIGHUP to the scheduler process to reload it (see _reload_symbols).
+    """
+    return tuple(DEFAULT_SYMBOLS)
+
+
+def _reload_symbols(signum=None, frame=None):
+    """Signal handler: drop the cached symbol list so the next task reloads it."""
+    _symbols.cache_clear()
+    logger.info("🔄 Symbol list cache cleared")
+
+
+def _log_task_summary(done_message, symbols, failed):
+    """Log the end of a task: the success line only if no symbol failed."""
+    if failed:
+        logger.error(f"❌ {len(failed)}/{len(symbols)} symbols failed: {', '.join(failed)}")
+    else:
+        logger.info(f"✅ {done_message}")
+
+
+# Per-symbol units of work (module level so they can be pickled for processes)
+
+def _fetch_symbol(symbol):
+    # Last week of sessions; the upsert overwrites rows already stored
+    update_prices_for_symbol(symbol, period="5d")
+
+
+def _indicators_symbol(symbol):
+    compute_indicators_for_symbol(symbol)
+    compute_advanced_indicators_for_symbol(symbol)
+
+
+def _predict_symbol(symbol):
+    return predict_ensemble(symbol, force_retrain=False)
+
+
+def _retrain_symbol(symbol):
+    return predict_ensemble(symbol, force_retrain=True, tune_hyperparams=False)
+
+
 # ============================================================================
 # SCHEDULED TASKS
 # ============================================================================
@@ -49,16 +188,17 @@ def task_fetch_data():
     logger.info("TASK 1: FETCHING MARKET DATA")
     logger.info("=" * 60)
     
-    try:
-        symbols = get_symbols()
-        for symbol in symbols:
-            logger.info(f"Fetching data for {symbol}...")
-            fetch_and_store_prices(symbol, days_back=7)
+    symbols = _symbols()
+    results = run_for_symbols(_fetch_symbol, symbols)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        else:
             logger.info(f"✅ {symbol} data updated")
-        
-        logger.info("✅ All market data fetched successfully")
-    except Exception as e:
-        logger.error(f"❌ Error fetching data: {e}")
+    
+    _log_task_summary("All market data fetched successfully", symbols, failed)
 
 
 def task_compute_indicators():
@@ -67,22 +207,39 @@ def task_compute_indicators():
     logger.info("TASK 2: COMPUTING TECHNICAL INDICATORS")
     logger.info("=" * 60)
     
-    try:
-        symbols = get_symbols()
-        for symbol in symbols:
-            logger.info(f"Computing indicators for {symbol}...")
-            
-            # Basic indicators
-            compute_indicators_for_symbol(symbol)
-            
-            # Advanced indicators
-            compute_advanced_indicators_for_symbol(symbol)
-            
+    symbols = _symbols()
+    # Basic + advanced indicators per symbol
+    results = run_for_symbols(_indicators_symbol, symbols)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        else:
             logger.info(f"✅ {symbol} indicators updated")
-        
-        logger.info("✅ All indicators computed successfully")
-    except Exception as e:
-        logger.error(f"❌ Error computing indicators: {e}")
+    
+    _log_task_summary("All indicators computed successfully", symbols, failed)
+
+
+def task_refit_prophet():
+    """Task 2b: Refit Prophet models off the online prediction path."""
+    logger.info("=" * 60)
+    logger.info("TASK 2b: REFITTING PROPHET MODELS")
+    logger.info("=" * 60)
+    
+    symbols = _symbols()
+    results = run_for_symbols(refit_prophet_model, symbols, use_processes=True)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        elif result:
+            logger.info(f"✅ {symbol} Prophet refitted")
+        else:
+            logger.warning(f"⚠️  {symbol}: not enough data for Prophet")
+    
+    _log_task_summary("All Prophet models refitted", symbols, failed)
 
 
 def task_ml_predictions():
@@ -91,21 +248,21 @@ def task_ml_predictions():
     logger.info("TASK 3: RUNNING ML PREDICTIONS")
     logger.info("=" * 60)
     
-    try:
-        symbols = get_symbols()
-        for symbol in symbols:
-            logger.info(f"Running predictions for {symbol}...")
-            result = predict_ensemble(symbol, force_retrain=False)
-            
-            if 'error' not in result:
-                logger.info(f"✅ {symbol}: {result.get('ensemble_signal')} "
-                          f"(confidence: {result.get('ensemble_confidence', 0):.0%})")
-            else:
-                logger.warning(f"⚠️  {symbol}: {result['error']}")
-        
-        logger.info("✅ All predictions completed")
-    except Exception as e:
-        logger.error(f"❌ Error in predictions: {e}")
+    symbols = _symbols()
+    results = run_for_symbols(_predict_symbol, symbols, use_processes=True)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        elif 'error' not in result:
+            logger.info(f"✅ {symbol}: {result.get('ensemble_signal')} "
+                      f"(confidence: {result.get('ensemble_confidence', 0):.0%})")
+        else:
+            logger.warning(f"⚠️  {symbol}: {result['error']}")
+            failed.append(symbol)
+    
+    _log_task_summary("All predictions completed", symbols, failed)
 
 
 def task_validate_predictions():
@@ -114,11 +271,10 @@ def task_validate_predictions():
     logger.info("TASK 4: VALIDATING PREDICTIONS")
     logger.info("=" * 60)
     
-    try:
-        result = validate_predictions_yesterday()
-        logger.info(f"✅ Validated {result.get('total_validated', 0)} predictions")
-    except Exception as e:
-        logger.error(f"❌ Error validating predictions: {e}")
+    result = validate_predictions_yesterday()
+    if result.get("ok", True) is False:
+        raise RuntimeError(f"Validation failed: {result.get('message')}")
+    logger.info(f"✅ Validated {result.get('rows_updated', 0)} predictions")
 
 
 def task_daily_report():
@@ -127,15 +283,17 @@ def task_daily_report():
     logger.info("TASK 5: GENERATING DAILY REPORT")
     logger.info("=" * 60)
     
-    try:
-        symbols = get_symbols()
-        for symbol in symbols:
-            report = generate_daily_report(symbol)
+    symbols = _symbols()
+    results = run_for_symbols(build_daily_summary, symbols)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        else:
             logger.info(f"✅ Report generated for {symbol}")
-        
-        logger.info("✅ All reports generated")
-    except Exception as e:
-        logger.error(f"❌ Error generating reports: {e}")
+    
+    _log_task_summary("All reports generated", symbols, failed)
 
 
 def task_weekly_retraining():
@@ -144,16 +302,17 @@ def task_weekly_retraining():
     logger.info("TASK 6: WEEKLY MODEL RETRAINING")
     logger.info("=" * 60)
     
-    try:
-        symbols = get_symbols()
-        for symbol in symbols:
-            logger.info(f"Retraining models for {symbol}...")
-            result = predict_ensemble(symbol, force_retrain=True, tune_hyperparams=False)
+    symbols = _symbols()
+    results = run_for_symbols(_retrain_symbol, symbols, use_processes=True)
+    failed = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {symbol}: {result}")
+            failed.append(symbol)
+        else:
             logger.info(f"✅ {symbol} models retrained")
-        
-        logger.info("✅ All models retrained")
-    except Exception as e:
-        logger.error(f"❌ Error retraining models: {e}")
+    
+    _log_task_summary("All models retrained", symbols, failed)
 
 
 # ============================================================================
@@ -161,8 +320,27 @@ def task_weekly_retraining():
 # ============================================================================
 
 def create_scheduler():
-    """Create and configure the scheduler."""
-    scheduler = BlockingScheduler()
+    """Create and configure the scheduler.
+    
+    Jobs run on a thread pool so overlapping tasks do not wait for each
+    other. CPU-heavy tasks (predictions, retraining, Prophet) already fan
+    out to a process pool per symbol inside the task (see run_for_symbols),
+    so they are not routed to an APScheduler process pool as well.
+    
+    Job defaults:
+    - coalesce: a job that missed several runs executes only once
+    - max_instances=1: a job never overlaps with itself
+    - misfire_grace_time=600: late runs (e.g. after long retraining) still
+      execute if they are less than 10 minutes late
+    """
+    scheduler = BlockingScheduler(
+        executors={'default': ThreadPoolExecutor(20)},
+        job_defaults={
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': 600,
+        },
+    )
     
     # ===== DAILY TASKS =====
     
@@ -184,6 +362,15 @@ def create_scheduler():
         replace_existing=True
     )
     
+    # Task 2b: Prophet refit at 8:45 AM (slow fit, kept out of predict_ensemble)
+    scheduler.add_job(
+        task_refit_prophet,
+        CronTrigger(hour=8, minute=45),
+        id='refit_prophet',
+        name='Refit Prophet Models',
+        replace_existing=True
+    )
+    
     # Task 3: ML predictions at 9:00 AM
     scheduler.add_job(
         task_ml_predictions,
@@ -234,12 +421,13 @@ def run_task_now(task_name):
     tasks = {
         'fetch': task_fetch_data,
         'indicators': task_compute_indicators,
+        'prophet': task_refit_prophet,
         'predictions': task_ml_predictions,
         'validate': task_validate_predictions,
         'report': task_daily_report,
         'retrain': task_weekly_retraining,
         'all': lambda: [task_fetch_data(), task_compute_indicators(), 
-                       task_ml_predictions(), task_validate_predictions(), 
+                       task_refit_prophet(), task_ml_predictions(), task_validate_predictions(), 
                        task_daily_report()]
     }
     
@@ -284,6 +472,10 @@ if __name__ == '__main__':
         
         scheduler = create_scheduler()
         
+        # SIGHUP reloads the symbol list without restarting the scheduler
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, _reload_symbols)
+        
         # Print scheduled jobs
         logger.info("\n📅 Scheduled Jobs:")
         for job in scheduler.get_jobs():
@@ -10,27 +10,30 @@ Funcionalidades:
 """
 
 import streamlit as st
+import diskcache
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta, date
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
+import threading
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Añadir path para importar módulos
 sys.path.append(os.path.join(os.path.dirname(__file__), 'mcp_server', 'scripts'))
 
-from mcp_server.scripts.config import get_db_conn
+from psycopg2.extensions import cursor as TupleCursor
+
+from mcp_server.scripts.config import db_conn, execute_prepared
 from mcp_server.scripts.backtesting import (
-    generate_backtest_report,
     backtest_by_model,
     backtest_ensemble
 )
-from mcp_server.scripts.advanced_indicators import (
-    _load_full_prices,
-    compute_all_advanced_indicators
-)
+from mcp_server.scripts.advanced_indicators import compute_all_advanced_indicators
 
 
 # Configuración de la página
@@ -68,75 +71,211 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)  # Cache por 5 minutos
+# Caché en disco compartida entre reinicios y réplicas del dashboard (mismo
+# directorio montado). Va por debajo de la caché en memoria de Streamlit.
+DASHBOARD_CACHE_DIR = os.getenv("DASHBOARD_CACHE_DIR", "/tmp/dash_cache")
+PRICES_DISK_TTL = 24 * 3600            # precios hasta ayer (la clave incluye la última fecha cargada)
+INDICATORS_DISK_TTL = 7 * 24 * 3600    # indicadores: deterministas para unos precios dados
+
+
+@st.cache_resource
+def get_disk_cache() -> diskcache.Cache:
+    """Caché en disco (SQLite) del proceso."""
+    return diskcache.Cache(DASHBOARD_CACHE_DIR)
+
+
+def disk_cached(key: tuple, expire: int, loader):
+    """Devuelve el valor guardado en disco para `key` o lo calcula con loader() y lo guarda."""
+    cache = get_disk_cache()
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, expire=expire)
+    return value
+
+
+# Los loaders usan cache_resource (5 minutos): devuelven el mismo objeto a
+# todas las sesiones sin serializarlo ni copiarlo. Contrato: quien los llame
+# NO debe modificar el resultado; hacer .copy() antes de mutarlo.
+
+@st.cache_resource(ttl=300)
 def load_symbols():
-    """Carga la lista de símbolos disponibles."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT DISTINCT symbol FROM prices ORDER BY symbol")
-            symbols = [row[0] for row in cur.fetchall()]
-        return symbols
-    finally:
-        conn.close()
-
-
-@st.cache_data(ttl=300)
+    """Carga los símbolos disponibles (tupla ordenada, vacía si no hay precios)."""
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        # Una sola fila con el array ya ordenado; psycopg2 lo convierte a lista en C
+        cur.execute("SELECT array_agg(DISTINCT symbol ORDER BY symbol) FROM prices")
+        return tuple(cur.fetchone()[0] or ())
+
+
+PRICE_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+# float32 basta para niveles de precio (~7 cifras significativas) y reduce a
+# la mitad la memoria y el JSON que Plotly envía al navegador. El volumen se
+# queda en int64: en índices como el S&P 500 supera el rango de int32.
+PRICE_DTYPES = {
+    'Date': 'datetime64[ns]',
+    'Open': 'float32',
+    'High': 'float32',
+    'Low': 'float32',
+    'Close': 'float32',
+    'Volume': 'int64',
+}
+
+
+@st.cache_resource(ttl=60)
 def load_prices(symbol: str, days: int = 365):
-    """Carga precios históricos."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT date, open, high, low, close, volume
+    """Carga precios de los últimos `days` días (DataFrame compartido, solo lectura).
+    
+    Une el histórico hasta ayer, cacheado a largo plazo, con la fila de hoy,
+    que se refresca cada minuto.
+    """
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    history = load_prices_history(
+        symbol, today - timedelta(days=days), yesterday,
+        _query_last_price_date(symbol, yesterday),
+    )
+    latest = load_prices_today(symbol, today)
+    
+    if latest.empty:
+        return history
+    if history.empty:
+        return latest
+    return pd.concat([history, latest], ignore_index=True)
+
+
+@st.cache_resource(ttl=86400)
+def load_prices_history(symbol: str, start: date, end: date, last_date: Optional[date]):
+    """Precios entre start y end (incluidos); pensado para fechas ya cerradas.
+    
+    last_date (última fecha con precio hasta `end`) forma parte de la clave:
+    si el cierre de ayer aún no se había cargado, al llegar cambia la clave
+    y no se sirve el histórico incompleto durante 24h.
+    """
+    return disk_cached(
+        ("prices", symbol, start, end, last_date),
+        PRICES_DISK_TTL,
+        lambda: _query_prices(symbol, start, end),
+    )
+
+
+@st.cache_resource(ttl=60)
+def load_prices_today(symbol: str, today: date):
+    """Precio del día en curso (puede actualizarse durante el día)."""
+    return _query_prices(symbol, today, today)
+
+
+def _query_last_price_date(symbol: str, end: date) -> Optional[date]:
+    """Última fecha con precio para `symbol` hasta `end` (usa la PK (symbol, date))."""
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        execute_prepared(cur, "dash_last_price_date", """
+            SELECT MAX(date) FROM prices WHERE symbol = $1 AND date <= $2
+        """, (symbol, end), types="text, date")
+        return cur.fetchone()[0]
+
+
+def _query_prices(symbol: str, start: date, end: date) -> pd.DataFrame:
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        execute_prepared(cur, "dash_prices_range", """
+            SELECT date, open, high, low, close, COALESCE(volume, 0)
+            FROM prices
+            WHERE symbol = $1 AND date BETWEEN $2 AND $3
+            ORDER BY date
+        """, (symbol, start, end), types="text, date, date")
+        
+        rows = cur.fetchall()
+    
+    if not rows:
+        return pd.DataFrame(columns=PRICE_COLUMNS).astype(PRICE_DTYPES)
+    
+    # Tipos explícitos en una pasada en lugar de la inferencia genérica de pandas
+    df = pd.DataFrame.from_records(rows, columns=PRICE_COLUMNS, coerce_float=True)
+    df = df.astype(PRICE_DTYPES)
+    return df
+
+
+@st.cache_resource(ttl=300)
+def load_recent_extremes(symbol: str, sessions: int = 30):
+    """Máximo y mínimo de las últimas `sessions` sesiones, calculados en la BD.
+    
+    Returns:
+        tuple: (máximo, mínimo); (None, None) si no hay precios
+    """
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        execute_prepared(cur, "dash_recent_extremes", """
+            SELECT MAX(high), MIN(low)
+            FROM (
+                SELECT high, low
                 FROM prices
-                WHERE symbol = %s AND date >= %s
-                ORDER BY date
-            """, (symbol, datetime.now() - timedelta(days=days)))
-            
-            rows = cur.fetchall()
-            if not rows:
-                return pd.DataFrame()
-                
-            df = pd.DataFrame(rows, columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
-            df['Date'] = pd.to_datetime(df['Date'])
-            return df
-    finally:
-        conn.close()
-
-
-@st.cache_data(ttl=300)
+                WHERE symbol = $1
+                ORDER BY date DESC
+                LIMIT $2
+            ) t
+        """, (symbol, sessions), types="text, int")
+        return cur.fetchone()
+
+
+@st.cache_resource(ttl=300)
 def load_predictions(symbol: str, days: int = 30):
-    """Carga predicciones recientes."""
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT 
-                    prediction_date,
-                    target_date,
-                    model_name,
-                    predicted_direction,
-                    confidence
-                FROM ml_predictions
-                WHERE symbol = %s AND target_date >= %s
-                ORDER BY target_date DESC, model_name
-            """, (symbol, datetime.now() - timedelta(days=days)))
-            
-            rows = cur.fetchall()
-            if not rows:
-                return pd.DataFrame()
-                
-            df = pd.DataFrame(rows, columns=[
-                'Prediction Date', 'Target Date', 'Model', 'Direction', 'Confidence'
-            ])
-            df['Prediction Date'] = pd.to_datetime(df['Prediction Date'])
-            df['Target Date'] = pd.to_datetime(df['Target Date'])
-            return df
-    finally:
-        conn.close()
+    """Carga predicciones recientes (DataFrame compartido, solo lectura)."""
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        execute_prepared(cur, "dash_predictions", """
+            SELECT 
+                prediction_date,
+                target_date,
+                model_name,
+                predicted_direction,
+                confidence
+            FROM ml_predictions
+            WHERE symbol = $1 AND target_date >= $2
+            ORDER BY target_date DESC, model_name
+        """, (symbol, date.today() - timedelta(days=days)), types="text, date")
+        
+        rows = cur.fetchall()
+    
+    if not rows:
+        return pd.DataFrame()
+        
+    df = pd.DataFrame(rows, columns=[
+        'Prediction Date', 'Target Date', 'Model', 'Direction', 'Confidence'
+    ])
+    df['Prediction Date'] = pd.to_datetime(df['Prediction Date'])
+    df['Target Date'] = pd.to_datetime(df['Target Date'])
+    return df
+
+
+def run_parallel(*calls):
+    """Ejecuta en paralelo llamadas independientes (fn, *args) y devuelve sus resultados en orden.
+    
+    Pensado para consultas a la BD (I/O): cada hilo toma su propia conexión
+    del pool. Los hilos heredan el contexto de Streamlit para que los cachés de st
+    funcionen igual que en el hilo principal.
+    """
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=len(calls),
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    ) as ex:
+        futures = [ex.submit(fn, *args) for fn, *args in calls]
+        return [f.result() for f in futures]
+
+
+def color_direction(col: pd.Series) -> np.ndarray:
+    """Estilo CSS de la columna Direction, calculado de una vez para toda la columna."""
+    return np.where(col.to_numpy() == 'UP', 'background-color: lightgreen', 'background-color: lightcoral')
+
+
+def frame_fingerprint(df: pd.DataFrame) -> tuple:
+    """Huella de un DataFrame para las cachés de figuras.
+    
+    Hashea todas las filas (vectorizado, ~0,1 ms para un año de precios):
+    una corrección en mitad de la ventana también invalida la figura.
+    """
+    return (df.shape, tuple(df.columns), int(pd.util.hash_pandas_object(df, index=False).sum()))
 
 
+# Las figuras se cachean ya construidas (cache_resource, sin copia): con las
+# mismas entradas un rerun de Streamlit no vuelve a crearlas.
+@st.cache_resource(ttl=300, hash_funcs={pd.DataFrame: frame_fingerprint})
 def plot_candlestick_with_predictions(prices_df: pd.DataFrame, predictions_df: pd.DataFrame, symbol: str):
     """Crea gráfico de velas con predicciones."""
     fig = make_subplots(
@@ -147,8 +286,11 @@ def plot_candlestick_with_predictions(prices_df: pd.DataFrame, predictions_df: p
         subplot_titles=(f'{symbol} - Precios y Predicciones', 'Volumen')
     )
     
+    # Trazas (traza, fila) que se añaden juntas con un único add_traces
+    traces = []
+    
     # Candlestick
-    fig.add_trace(
+    traces.append((
         go.Candlestick(
             x=prices_df['Date'],
             open=prices_df['Open'],
@@ -157,8 +299,8 @@ def plot_candlestick_with_predictions(prices_df: pd.DataFrame, predictions_df: p
             close=prices_df['Close'],
             name='Precio'
         ),
-        row=1, col=1
-    )
+        1
+    ))
     
     # Añadir predicciones (si hay)
     if not predictions_df.empty:
@@ -166,31 +308,46 @@ def plot_candlestick_with_predictions(prices_df: pd.DataFrame, predictions_df: p
             predictions_df['Target Date'] == predictions_df['Target Date'].max()
         ]
         
-        for _, pred in latest_predictions.iterrows():
-            color = 'green' if pred['Direction'] == 'UP' else 'red'
-            fig.add_annotation(
-                x=pred['Target Date'],
-                y=prices_df['High'].max(),
-                text=f"{pred['Model']}: {pred['Direction']}<br>Conf: {pred['Confidence']:.0%}",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor=color,
-                ax=0,
-                ay=-40,
-                font=dict(size=10, color=color),
-                row=1, col=1
+        # Una sola traza con todas las predicciones en vez de una anotación por fila
+        colors = np.where(latest_predictions['Direction'].to_numpy() == 'UP', 'green', 'red')
+        texts = [
+            f"{model}: {direction}<br>Conf: {conf:.0%}"
+            for model, direction, conf in zip(
+                latest_predictions['Model'],
+                latest_predictions['Direction'],
+                latest_predictions['Confidence'],
             )
+        ]
+        traces.append((
+            go.Scatter(
+                x=latest_predictions['Target Date'],
+                y=np.full(len(latest_predictions), prices_df['High'].max()),
+                mode='markers+text',
+                text=texts,
+                textposition='top center',
+                textfont=dict(size=10, color=colors),
+                marker=dict(color=colors, symbol='triangle-down', size=10),
+                name='Predicciones'
+            ),
+            1
+        ))
     
     # Volumen
-    colors = ['red' if row['Open'] > row['Close'] else 'green' for _, row in prices_df.iterrows()]
-    fig.add_trace(
+    colors = np.where(prices_df['Open'].to_numpy() > prices_df['Close'].to_numpy(), 'red', 'green')
+    traces.append((
         go.Bar(
             x=prices_df['Date'],
             y=prices_df['Volume'],
             name='Volumen',
             marker_color=colors
         ),
-        row=2, col=1
+        2
+    ))
+    
+    fig.add_traces(
+        [trace for trace, _ in traces],
+        rows=[row for _, row in traces],
+        cols=[1] * len(traces),
     )
     
     fig.update_layout(
@@ -203,16 +360,42 @@ def plot_candlestick_with_predictions(prices_df: pd.DataFrame, predictions_df: p
     return fig
 
 
-def plot_technical_indicators(prices_df: pd.DataFrame, symbol: str):
-    """Gráficos de indicadores técnicos."""
-    from mcp_server.scripts.advanced_indicators import compute_all_advanced_indicators
+def load_advanced_indicators(symbol: str, df: pd.DataFrame) -> dict:
+    """Indicadores avanzados de `df`, cacheados en disco.
+    
+    La clave identifica los precios de entrada (rango de fechas, número de
+    filas y hash de todas las filas, fechas incluidas): mientras no cambien,
+    el resultado es el mismo. Una corrección de un precio intermedio cambia el hash.
+    """
+    key = (
+        "indicators",
+        symbol,
+        df.index[0].date(),
+        df.index[-1].date(),
+        len(df),
+        int(pd.util.hash_pandas_object(df).sum()),
+    )
+    return disk_cached(key, INDICATORS_DISK_TTL, lambda: compute_all_advanced_indicators(df))
+
+
+@st.cache_resource(ttl=300)
+def cached_indicators(symbol: str, days: int, fingerprint: tuple) -> dict:
+    """Indicadores avanzados en memoria para los precios de load_prices(symbol, days).
     
+    fingerprint (frame_fingerprint de esos precios) es una tupla pequeña:
+    Streamlit la hashea en lugar de serializar el DataFrame completo.
+    """
+    df = load_prices(symbol, days).set_index('Date')
+    return load_advanced_indicators(symbol, df)
+
+
+@st.cache_resource(ttl=300, hash_funcs={pd.DataFrame: frame_fingerprint})
+def plot_technical_indicators(prices_df: pd.DataFrame, symbol: str, days: int):
+    """Gráficos de indicadores técnicos (prices_df = load_prices(symbol, days))."""
     # Preparar datos
-    df = prices_df.copy()
-    df = df.set_index('Date')
-    df.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+    df = prices_df.set_index('Date')
     
-    indicators = compute_all_advanced_indicators(df)
+    indicators = cached_indicators(symbol, days, frame_fingerprint(prices_df))
     
     # Crear subplots
     fig = make_subplots(
@@ -223,35 +406,43 @@ def plot_technical_indicators(prices_df: pd.DataFrame, symbol: str):
         row_heights=[0.4, 0.2, 0.2, 0.2]
     )
     
-    # 1. Precio con Bollinger Bands
-    fig.add_trace(go.Scatter(x=df.index, y=df['Close'], name='Precio', line=dict(color='blue')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['bb_upper'], name='BB Superior', 
-                            line=dict(color='gray', dash='dash')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['bb_middle'], name='BB Media', 
-                            line=dict(color='orange')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['bb_lower'], name='BB Inferior', 
-                            line=dict(color='gray', dash='dash')), row=1, col=1)
-    
-    # 2. MACD
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['macd'], name='MACD', line=dict(color='blue')), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['macd_signal'], name='Señal', 
-                            line=dict(color='red')), row=2, col=1)
-    fig.add_trace(go.Bar(x=df.index, y=indicators['macd_histogram'], name='Histograma'), row=2, col=1)
-    
-    # 3. Stochastic (cargar desde DB si existe)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['stoch_k'], name='Stochastic %K', 
-                            line=dict(color='blue')), row=3, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['stoch_d'], name='Stochastic %D', 
-                            line=dict(color='red')), row=3, col=1)
+    # Todas las trazas en una lista (traza, fila) y un único add_traces
+    x = df.index
+    traces = [
+        # 1. Precio con Bollinger Bands
+        (go.Scatter(x=x, y=df['Close'], name='Precio', line=dict(color='blue')), 1),
+        (go.Scatter(x=x, y=indicators['bb_upper'], name='BB Superior',
+                    line=dict(color='gray', dash='dash')), 1),
+        (go.Scatter(x=x, y=indicators['bb_middle'], name='BB Media',
+                    line=dict(color='orange')), 1),
+        (go.Scatter(x=x, y=indicators['bb_lower'], name='BB Inferior',
+                    line=dict(color='gray', dash='dash')), 1),
+        # 2. MACD
+        (go.Scatter(x=x, y=indicators['macd'], name='MACD', line=dict(color='blue')), 2),
+        (go.Scatter(x=x, y=indicators['macd_signal'], name='Señal',
+                    line=dict(color='red')), 2),
+        (go.Bar(x=x, y=indicators['macd_histogram'], name='Histograma'), 2),
+        # 3. Stochastic
+        (go.Scatter(x=x, y=indicators['stoch_k'], name='Stochastic %K',
+                    line=dict(color='blue')), 3),
+        (go.Scatter(x=x, y=indicators['stoch_d'], name='Stochastic %D',
+                    line=dict(color='red')), 3),
+        # 4. ADX
+        (go.Scatter(x=x, y=indicators['adx'], name='ADX', line=dict(color='purple')), 4),
+        (go.Scatter(x=x, y=indicators['plus_di'], name='+DI',
+                    line=dict(color='green')), 4),
+        (go.Scatter(x=x, y=indicators['minus_di'], name='-DI',
+                    line=dict(color='red')), 4),
+    ]
+    fig.add_traces(
+        [trace for trace, _ in traces],
+        rows=[row for _, row in traces],
+        cols=[1] * len(traces),
+    )
+    
+    # Niveles de referencia
     fig.add_hline(y=80, line_dash="dash", line_color="red", row=3, col=1)
     fig.add_hline(y=20, line_dash="dash", line_color="green", row=3, col=1)
-    
-    # 4. ADX
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['adx'], name='ADX', line=dict(color='purple')), row=4, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['plus_di'], name='+DI', 
-                            line=dict(color='green')), row=4, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=indicators['minus_di'], name='-DI', 
-                            line=dict(color='red')), row=4, col=1)
     fig.add_hline(y=25, line_dash="dash", line_color="gray", row=4, col=1)
     
     fig.update_layout(height=1000, showlegend=True, hovermode='x unified')
@@ -260,38 +451,39 @@ def plot_technical_indicators(prices_df: pd.DataFrame, symbol: str):
     return fig
 
 
+# Métrica -> (etiqueta, color) en el gráfico comparativo
+MODEL_METRICS = {
+    'accuracy': ('Accuracy', 'lightblue'),
+    'precision': ('Precision', 'lightgreen'),
+    'recall': ('Recall', 'lightyellow'),
+    'f1_score': ('F1-Score', 'lightcoral'),
+}
+
+
 def plot_model_comparison(backtest_results: dict):
     """Gráfico comparativo de modelos."""
     if not backtest_results or 'error' in backtest_results:
         st.warning("No hay datos de backtesting disponibles")
         return
     
-    # Extraer métricas
-    models = []
-    accuracies = []
-    precisions = []
-    recalls = []
-    f1_scores = []
-    
-    for model_name, metrics in backtest_results.items():
-        if isinstance(metrics, dict) and 'accuracy' in metrics:
-            models.append(model_name)
-            accuracies.append(metrics['accuracy'])
-            precisions.append(metrics.get('precision', 0))
-            recalls.append(metrics.get('recall', 0))
-            f1_scores.append(metrics.get('f1_score', 0))
-    
-    if not models:
+    # Extraer métricas: una fila por modelo con accuracy
+    metrics_df = pd.DataFrame.from_dict(
+        {name: m for name, m in backtest_results.items() if isinstance(m, dict) and 'accuracy' in m},
+        orient='index'
+    )
+    
+    if metrics_df.empty:
         st.warning("No hay métricas disponibles")
         return
     
+    metrics_df = metrics_df.reindex(columns=list(MODEL_METRICS)).fillna(0)
+    
     # Crear gráfico de barras
     fig = go.Figure()
-    
-    fig.add_trace(go.Bar(name='Accuracy', x=models, y=accuracies, marker_color='lightblue'))
-    fig.add_trace(go.Bar(name='Precision', x=models, y=precisions, marker_color='lightgreen'))
-    fig.add_trace(go.Bar(name='Recall', x=models, y=recalls, marker_color='lightyellow'))
-    fig.add_trace(go.Bar(name='F1-Score', x=models, y=f1_scores, marker_color='lightcoral'))
+    fig.add_traces([
+        go.Bar(name=label, x=metrics_df.index, y=metrics_df[col], marker_color=color)
+        for col, (label, color) in MODEL_METRICS.items()
+    ])
     
     fig.update_layout(
         title='Comparación de Modelos ML',
@@ -318,85 +510,91 @@ if not symbols:
 
 selected_symbol = st.sidebar.selectbox("Seleccionar Mercado", symbols)
 days_to_show = st.sidebar.slider("Días a mostrar", 30, 365, 90)
-backtest_days = st.sidebar.slider("Días de Backtesting", 7, 90, 30)
 
-# Tabs principales
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Precio & Predicciones", "📈 Indicadores Técnicos", 
-                                    "🎯 Backtesting", "🔥 Heatmap"])
+
+# Cada pestaña es un fragmento: sus propios widgets (p.ej. el slider y el
+# botón de backtesting) solo vuelven a ejecutar esa pestaña, no el script entero.
 
 # ===== TAB 1: Precio & Predicciones =====
-with tab1:
-    st.header(f"Análisis de {selected_symbol}")
+@st.fragment
+def render_prices_tab(symbol: str, days: int):
+    st.header(f"Análisis de {symbol}")
     
     col1, col2, col3 = st.columns(3)
     
-    # Cargar datos
-    prices = load_prices(selected_symbol, days_to_show)
-    predictions = load_predictions(selected_symbol, 30)
+    # Cargar datos (consultas independientes, en paralelo)
+    prices, predictions, (max_price, min_price) = run_parallel(
+        (load_prices, symbol, days),
+        (load_predictions, symbol, 30),
+        (load_recent_extremes, symbol, 30),
+    )
     
     if prices.empty:
-        st.warning(f"No hay datos de precios para {selected_symbol}")
-    else:
-        # Métricas básicas
-        last_price = prices['Close'].iloc[-1]
-        prev_price = prices['Close'].iloc[-2] if len(prices) > 1 else last_price
-        change = last_price - prev_price
-        change_pct = (change / prev_price) * 100
-        
-        with col1:
-            st.metric("Precio Actual", f"${last_price:.2f}", f"{change:+.2f} ({change_pct:+.2f}%)")
-        
-        with col2:
-            max_price = prices['High'].tail(30).max()
-            st.metric("Máximo (30d)", f"${max_price:.2f}")
-        
-        with col3:
-            min_price = prices['Low'].tail(30).min()
-            st.metric("Mínimo (30d)", f"${min_price:.2f}")
-        
-        # Gráfico principal
-        st.plotly_chart(
-            plot_candlestick_with_predictions(prices, predictions, selected_symbol),
+        st.warning(f"No hay datos de precios para {symbol}")
+        return
+    
+    # Métricas básicas
+    last_price = prices['Close'].iloc[-1]
+    prev_price = prices['Close'].iloc[-2] if len(prices) > 1 else last_price
+    change = last_price - prev_price
+    change_pct = (change / prev_price) * 100
+    
+    with col1:
+        st.metric("Precio Actual", f"${last_price:.2f}", f"{change:+.2f} ({change_pct:+.2f}%)")
+    
+    with col2:
+        st.metric("Máximo (30d)", f"${max_price:.2f}")
+    
+    with col3:
+        st.metric("Mínimo (30d)", f"${min_price:.2f}")
+    
+    # Gráfico principal
+    st.plotly_chart(
+        plot_candlestick_with_predictions(prices, predictions, symbol),
+        use_container_width=True
+    )
+    
+    # Tabla de predicciones recientes
+    if not predictions.empty:
+        st.subheader("🔮 Predicciones Recientes")
+        st.dataframe(
+            predictions.head(10).style.apply(color_direction, subset=['Direction']),
             use_container_width=True
         )
-        
-        # Tabla de predicciones recientes
-        if not predictions.empty:
-            st.subheader("🔮 Predicciones Recientes")
-            st.dataframe(
-                predictions.head(10).style.applymap(
-                    lambda x: 'background-color: lightgreen' if x == 'UP' else 'background-color: lightcoral',
-                    subset=['Direction']
-                ),
-                use_container_width=True
-            )
+
 
 # ===== TAB 2: Indicadores Técnicos =====
-with tab2:
+@st.fragment
+def render_indicators_tab(symbol: str, days: int):
     st.header("Indicadores Técnicos Avanzados")
     
+    prices = load_prices(symbol, days)
     if not prices.empty:
         st.plotly_chart(
-            plot_technical_indicators(prices, selected_symbol),
+            plot_technical_indicators(prices, symbol, days),
             use_container_width=True
         )
     else:
         st.warning("No hay datos disponibles")
 
+
 # ===== TAB 3: Backtesting =====
-with tab3:
+@st.fragment
+def render_backtesting_tab(symbol: str):
     st.header("🎯 Análisis de Backtesting")
     
+    backtest_days = st.slider("Días de Backtesting", 7, 90, 30)
+    
     if st.button("🔄 Ejecutar Backtesting", type="primary"):
         with st.spinner("Ejecutando backtesting..."):
             end_date = date.today()
             start_date = end_date - timedelta(days=backtest_days)
             
-            # Backtesting por modelo
-            results_by_model = backtest_by_model(selected_symbol, start_date, end_date)
-            
-            # Backtesting ensemble
-            ensemble_results = backtest_ensemble(selected_symbol, start_date, end_date)
+            # Backtesting por modelo y ensemble en paralelo
+            results_by_model, ensemble_results = run_parallel(
+                (backtest_by_model, symbol, start_date, end_date),
+                (backtest_ensemble, symbol, start_date, end_date),
+            )
             
             # Mostrar resultados
             col1, col2 = st.columns(2)
@@ -426,6 +624,20 @@ with tab3:
                 else:
                     st.warning("No hay datos de ensemble disponibles")
 
+
+# Tabs principales
+tab1, tab2, tab3, tab4 = st.tabs(["📊 Precio & Predicciones", "📈 Indicadores Técnicos", 
+                                    "🎯 Backtesting", "🔥 Heatmap"])
+
+with tab1:
+    render_prices_tab(selected_symbol, days_to_show)
+
+with tab2:
+    render_indicators_tab(selected_symbol, days_to_show)
+
+with tab3:
+    render_backtesting_tab(selected_symbol)
+
 # ===== TAB 4: Heatmap =====
 with tab4:
     st.header("🔥 Correlaciones entre Mercados")
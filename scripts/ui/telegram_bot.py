@@ -11,9 +11,16 @@ Funcionalidades:
 
 import os
 import asyncio
+import atexit
+import queue
+import time
 from datetime import datetime, timedelta, date
+from itertools import groupby
+from operator import itemgetter
+from collections import defaultdict
 from typing import List, Dict
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 # Telegram Bot API
 try:
@@ -33,20 +40,140 @@ except ImportError:
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), 'mcp_server', 'scripts'))
 
-from mcp_server.scripts.config import get_db_conn
+from psycopg2.extensions import cursor as TupleCursor
+
+from mcp_server.scripts.config import db_conn, execute_prepared
 from mcp_server.scripts.backtesting import backtest_ensemble
 
 # Configuración
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
 ALERT_CONFIDENCE_THRESHOLD = float(os.getenv('ALERT_CONFIDENCE_THRESHOLD', '0.7'))
+# Envíos simultáneos máximos (Telegram limita a ~30 mensajes/s por bot)
+MAX_CONCURRENT_SENDS = int(os.getenv('TELEGRAM_MAX_CONCURRENT_SENDS', '30'))
+# Segundos entre envíos de alertas agrupadas
+ALERT_FLUSH_INTERVAL = float(os.getenv('ALERT_FLUSH_INTERVAL', '3'))
+# Margen bajo el límite de 4096 caracteres por mensaje de Telegram
+MAX_MESSAGE_LENGTH = 4000
+# Segundos que se reutiliza la lista de /mercados antes de volver a consultarla
+MARKETS_CACHE_TTL = float(os.getenv('MARKETS_CACHE_TTL', '300'))
+# Updates procesados en paralelo por python-telegram-bot
+CONCURRENT_UPDATES = int(os.getenv('TELEGRAM_CONCURRENT_UPDATES', '256'))
+# Modo webhook: si se define la URL pública, Telegram envía los updates al bot
+# en lugar de hacer long polling (el polling queda para desarrollo local)
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL', '')
+TELEGRAM_WEBHOOK_LISTEN = os.getenv('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0')
+TELEGRAM_WEBHOOK_PORT = int(os.getenv('TELEGRAM_WEBHOOK_PORT', '8443'))
 
-# Logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+# Plantillas de mensajes
+ALERT_HEADER = "🚨 **Nuevas Señales de Trading**"
+ALERT_MARKET_TEMPLATE = "📊 Mercado: `{symbol}`"
+ALERT_LINE_TEMPLATE = (
+    "🎯 **{direction}** {arrow} · 📈 {confidence:.0%}{hot} · "
+    "🤖 {model} · 📅 {target_date}"
 )
+BACKTEST_TEMPLATE = """
+📊 **Backtest {symbol}** (30 días)
+
+**Métricas del Ensemble:**
+• Accuracy: {accuracy:.2%}
+• Precision: {precision:.2%}
+• Recall: {recall:.2%}
+• F1-Score: {f1_score:.2%}
+
+**Detalles:**
+• Predicciones: {total_predictions}
+• Período: {start_date} a {end_date}
+• Modelos promedio: {avg_models:.1f}
+
+{verdict}
+"""
+
+# Logging: los handlers encolan los registros y un hilo aparte los formatea y
+# escribe, para que el event loop nunca espere a stderr
+_log_queue = queue.Queue(-1)
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_stream)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Resultados de /backtest del día, por (símbolo, fecha fin)
+_backtest_cache: Dict[tuple, Dict] = {}
+# Backtests en curso, para que peticiones simultáneas compartan el mismo cálculo
+_backtest_inflight: Dict[tuple, asyncio.Task] = {}
+
+
+def _backtest_done(key: tuple, task: asyncio.Task):
+    """Guarda en caché el resultado de un backtest terminado y lo saca de los pendientes."""
+    _backtest_inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    results = task.result()
+    if 'error' not in results:
+        # Solo se conservan los resultados del día en curso
+        for stale in [k for k in _backtest_cache if k[1] != key[1]]:
+            del _backtest_cache[stale]
+        _backtest_cache[key] = results
+
+
+async def _get_backtest(symbol: str, start: date, end: date) -> Dict:
+    """Devuelve el backtest del ensemble desde la caché, o lo calcula una sola vez
+    aunque lo pidan varios usuarios a la vez."""
+    key = (symbol, end)
+    results = _backtest_cache.get(key)
+    if results is not None:
+        return results
+    
+    task = _backtest_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(backtest_ensemble, symbol, start, end))
+        _backtest_inflight[key] = task
+        task.add_done_callback(lambda t: _backtest_done(key, t))
+    # shield: si se cancela un handler, el cálculo sigue para los demás
+    return await asyncio.shield(task)
+
+
+def _fetch_rows(sql: str, params=()) -> List[tuple]:
+    """Ejecuta una consulta de solo lectura con una conexión del pool compartido."""
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+
+def _fetch_prepared(name: str, sql: str, params=(), types: str = "") -> List[tuple]:
+    """Como _fetch_rows, pero con una sentencia preparada (placeholders $1, $2, ...)."""
+    with db_conn(readonly=True) as conn, conn.cursor(cursor_factory=TupleCursor) as cur:
+        execute_prepared(cur, name, sql, params, types)
+        return cur.fetchall()
+
+
+# Tablas de suscripciones (mismo esquema que db-init/07_telegram_subscriptions.sql).
+# Se crean también al arrancar el bot: docker solo ejecuta db-init/ con el
+# volumen de datos vacío, así que en bases existentes no estarían.
+_SUBSCRIPTION_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS telegram_subscribers (
+    chat_id    BIGINT PRIMARY KEY,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS telegram_user_symbols (
+    chat_id    BIGINT NOT NULL,
+    symbol     TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (chat_id, symbol)
+);
+"""
+
+
+def _execute_write(sql: str, params=()):
+    """Ejecuta una sentencia de escritura y hace commit."""
+    with db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+        conn.commit()
+
 
 class TradingBot:
     """Bot de Telegram para alertas de trading."""
@@ -55,13 +182,23 @@ class TradingBot:
         self.token = token
         self.subscribers = set()  # Chat IDs suscritos
         self.user_symbols = {}  # Símbolos seguidos por usuario
+        self.symbol_subscribers = defaultdict(set)  # Usuarios que siguen cada símbolo
+        self.send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+        self.pending_alerts = defaultdict(list)  # chat_id -> [(símbolo, predicción)]
+        self._flush_task = None
+        self._markets_cache = None  # (expira_en, filas) de /mercados
         
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /start - Bienvenida."""
         user = update.effective_user
         chat_id = update.effective_chat.id
         
-        self.subscribers.add(chat_id)
+        if chat_id not in self.subscribers:
+            self.subscribers.add(chat_id)
+            await self._persist(
+                "INSERT INTO telegram_subscribers (chat_id) VALUES (%s) ON CONFLICT DO NOTHING",
+                (chat_id,)
+            )
         
         welcome_message = f"""
 🤖 **Bienvenido al Trading Bot ML!**
@@ -85,7 +222,7 @@ Usa /help para más información.
         """
         
         await update.message.reply_text(welcome_message, parse_mode='Markdown')
-        logger.info(f"Usuario {user.id} ({user.username}) inició el bot")
+        logger.info("Usuario %s (%s) inició el bot", user.id, user.username)
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /help - Ayuda detallada."""
@@ -119,30 +256,26 @@ Usa /help para más información.
     
     async def list_markets(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /mercados - Lista mercados disponibles."""
-        conn = get_db_conn()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT DISTINCT symbol, COUNT(*) as num_prices
-                    FROM prices
-                    GROUP BY symbol
-                    ORDER BY symbol
-                """)
-                markets = cur.fetchall()
-            
-            if not markets:
-                await update.message.reply_text("❌ No hay mercados disponibles")
-                return
-            
-            message = "📊 **Mercados Disponibles:**\n\n"
-            for symbol, count in markets:
-                message += f"• `{symbol}` ({count} datos)\n"
-            
-            message += "\n💡 Usa `/seguir <símbolo>` para recibir alertas"
-            
-            await update.message.reply_text(message, parse_mode='Markdown')
-        finally:
-            conn.close()
+        now = time.monotonic()
+        if self._markets_cache is None or self._markets_cache[0] < now:
+            rows = await asyncio.to_thread(_fetch_rows, """
+                SELECT symbol, COUNT(*) as num_prices
+                FROM prices
+                GROUP BY symbol
+                ORDER BY symbol
+            """)
+            self._markets_cache = (now + MARKETS_CACHE_TTL, rows)
+        markets = self._markets_cache[1]
+        
+        if not markets:
+            await update.message.reply_text("❌ No hay mercados disponibles")
+            return
+        
+        parts = ["📊 **Mercados Disponibles:**", ""]
+        parts.extend(f"• `{symbol}` ({count} datos)" for symbol, count in markets)
+        parts += ["", "💡 Usa `/seguir <símbolo>` para recibir alertas"]
+        
+        await self._reply_lines(update, parts)
     
     async def follow_symbol(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /seguir <símbolo> - Seguir un mercado."""
@@ -158,33 +291,37 @@ Usa /help para más información.
         symbol = context.args[0].upper()
         
         # Verificar que el símbolo existe
-        conn = get_db_conn()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT COUNT(*) FROM prices WHERE symbol = %s", (symbol,))
-                exists = cur.fetchone()[0] > 0
-            
-            if not exists:
-                await update.message.reply_text(
-                    f"❌ El símbolo `{symbol}` no existe. Usa /mercados para ver disponibles.",
-                    parse_mode='Markdown'
-                )
-                return
-            
-            # Añadir a seguimiento
-            if chat_id not in self.user_symbols:
-                self.user_symbols[chat_id] = set()
-            
-            self.user_symbols[chat_id].add(symbol)
-            
+        rows = await asyncio.to_thread(
+            _fetch_prepared, "bot_symbol_exists",
+            "SELECT EXISTS (SELECT 1 FROM prices WHERE symbol = $1)", (symbol,), "text"
+        )
+        exists = rows[0][0]
+        
+        if not exists:
             await update.message.reply_text(
-                f"✅ Ahora sigues `{symbol}`\n"
-                f"Recibirás alertas cuando haya predicciones nuevas.",
+                f"❌ El símbolo `{symbol}` no existe. Usa /mercados para ver disponibles.",
                 parse_mode='Markdown'
             )
-            logger.info(f"Usuario {chat_id} sigue {symbol}")
-        finally:
-            conn.close()
+            return
+        
+        # Añadir a seguimiento
+        if chat_id not in self.user_symbols:
+            self.user_symbols[chat_id] = set()
+        
+        self.user_symbols[chat_id].add(symbol)
+        self.symbol_subscribers[symbol].add(chat_id)
+        await self._persist(
+            "INSERT INTO telegram_user_symbols (chat_id, symbol) VALUES (%s, %s) "
+            "ON CONFLICT DO NOTHING",
+            (chat_id, symbol)
+        )
+        
+        await update.message.reply_text(
+            f"✅ Ahora sigues `{symbol}`\n"
+            f"Recibirás alertas cuando haya predicciones nuevas.",
+            parse_mode='Markdown'
+        )
+        logger.info("Usuario %s sigue %s", chat_id, symbol)
     
     async def unfollow_symbol(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /dejar <símbolo> - Dejar de seguir."""
@@ -201,6 +338,11 @@ Usa /help para más información.
         
         if chat_id in self.user_symbols and symbol in self.user_symbols[chat_id]:
             self.user_symbols[chat_id].remove(symbol)
+            self.symbol_subscribers[symbol].discard(chat_id)
+            await self._persist(
+                "DELETE FROM telegram_user_symbols WHERE chat_id = %s AND symbol = %s",
+                (chat_id, symbol)
+            )
             await update.message.reply_text(
                 f"✅ Dejaste de seguir `{symbol}`",
                 parse_mode='Markdown'
@@ -229,55 +371,79 @@ Usa /help para más información.
             )
             return
         
-        conn = get_db_conn()
-        try:
-            message = "🔮 **Predicciones Actuales:**\n\n"
+        parts = ["🔮 **Predicciones Actuales:**", ""]
+        
+        # Última predicción de cada modelo (fecha de predicción más reciente y, dentro
+        # de ella, la última ejecución) para todos los símbolos en una sola consulta.
+        # ml_predictions guarda el precio previsto y la señal (-1, 0, 1): la dirección
+        # sale de la señal (o del signo del cambio si no hay señal) y la fuerza de la
+        # predicción es la variación prevista respecto al último cierre anterior.
+        rows = await asyncio.to_thread(_fetch_prepared, "bot_latest_predictions", """
+            SELECT
+                l.symbol,
+                l.model_name,
+                CASE SIGN(COALESCE(l.predicted_signal, l.predicted_value - c.close))
+                    WHEN 1 THEN 'UP'
+                    WHEN -1 THEN 'DOWN'
+                    ELSE 'FLAT'
+                END AS direction,
+                l.predicted_value / NULLIF(c.close, 0) - 1 AS expected_change,
+                l.prediction_date
+            FROM (
+                SELECT DISTINCT ON (p.symbol, p.model_name)
+                    p.symbol, p.model_name, p.predicted_value, p.predicted_signal, p.prediction_date
+                FROM ml_predictions p
+                JOIN (
+                    SELECT symbol, MAX(prediction_date) AS max_date
+                    FROM ml_predictions
+                    WHERE symbol = ANY($1)
+                    GROUP BY symbol
+                ) m ON p.symbol = m.symbol AND p.prediction_date = m.max_date
+                ORDER BY p.symbol, p.model_name, p.run_date DESC
+            ) l
+            LEFT JOIN LATERAL (
+                SELECT close
+                FROM prices
+                WHERE prices.symbol = l.symbol
+                  AND prices.date < l.prediction_date
+                ORDER BY date DESC
+                LIMIT 1
+            ) c ON TRUE
+            ORDER BY l.symbol, ABS(l.predicted_value / NULLIF(c.close, 0) - 1) DESC NULLS LAST
+        """, (symbols,), "text[]")
+        by_symbol = {
+            sym: [row[1:] for row in group]
+            for sym, group in groupby(rows, key=itemgetter(0))
+        }
+        
+        for symbol in symbols:
+            predictions = by_symbol.get(symbol)
+            if not predictions:
+                parts += [f"📊 `{symbol}`: Sin predicciones recientes", ""]
+                continue
             
-            for symbol in symbols:
-                with conn.cursor() as cur:
-                    # Última predicción de cada modelo
-                    cur.execute("""
-                        SELECT 
-                            model_name,
-                            predicted_direction,
-                            confidence,
-                            target_date
-                        FROM ml_predictions
-                        WHERE symbol = %s 
-                          AND target_date = (
-                              SELECT MAX(target_date)
-                              FROM ml_predictions
-                              WHERE symbol = %s
-                          )
-                        ORDER BY confidence DESC
-                    """, (symbol, symbol))
-                    
-                    predictions = cur.fetchall()
-                
-                if not predictions:
-                    message += f"📊 `{symbol}`: Sin predicciones recientes\n\n"
-                    continue
-                
-                # Calcular consenso (votación)
-                up_votes = sum(1 for p in predictions if p[1] == 'UP')
-                down_votes = len(predictions) - up_votes
-                consensus = 'UP ⬆️' if up_votes > down_votes else 'DOWN ⬇️'
-                
-                message += f"📊 **{symbol}**\n"
-                message += f"Consenso: **{consensus}** ({up_votes}/{len(predictions)} modelos)\n"
-                message += f"Fecha objetivo: {predictions[0][3]}\n\n"
-                
-                # Top 3 modelos
-                message += "Top Modelos:\n"
-                for i, (model, direction, conf, _) in enumerate(predictions[:3], 1):
-                    emoji = '⬆️' if direction == 'UP' else '⬇️'
-                    message += f"{i}. {model}: {emoji} ({conf:.0%})\n"
-                
-                message += "\n"
+            # Calcular consenso (votación)
+            up_votes = sum(1 for p in predictions if p[1] == 'UP')
+            down_votes = sum(1 for p in predictions if p[1] == 'DOWN')
+            consensus = 'UP ⬆️' if up_votes > down_votes else 'DOWN ⬇️'
             
-            await update.message.reply_text(message, parse_mode='Markdown')
-        finally:
-            conn.close()
+            parts += [
+                f"📊 **{symbol}**",
+                f"Consenso: **{consensus}** ({up_votes}/{len(predictions)} modelos)",
+                f"Fecha objetivo: {predictions[0][3]}",
+                "",
+            ]
+            
+            # Top 3 modelos (mayor variación prevista)
+            parts.append("Top Modelos:")
+            for i, (model, direction, change, _) in enumerate(predictions[:3], 1):
+                emoji = {'UP': '⬆️', 'DOWN': '⬇️'}.get(direction, '➡️')
+                change_str = f"{change:+.2%}" if change is not None else "s/d"
+                parts.append(f"{i}. {model}: {emoji} ({change_str})")
+            
+            parts.append("")
+        
+        await self._reply_lines(update, parts)
     
     async def market_summary(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /resumen - Resumen del mercado."""
@@ -290,36 +456,54 @@ Usa /help para más información.
             )
             return
         
-        conn = get_db_conn()
-        try:
-            message = "📈 **Resumen de Mercado**\n\n"
-            
-            for symbol in self.user_symbols[chat_id]:
-                with conn.cursor() as cur:
-                    # Último precio
-                    cur.execute("""
-                        SELECT close, date
-                        FROM prices
-                        WHERE symbol = %s
-                        ORDER BY date DESC
-                        LIMIT 2
-                    """, (symbol,))
-                    
-                    prices = cur.fetchall()
-                    
-                    if len(prices) >= 2:
-                        current_price = prices[0][0]
-                        prev_price = prices[1][0]
-                        change = ((current_price - prev_price) / prev_price) * 100
-                        
-                        emoji = '🟢' if change > 0 else '🔴'
-                        message += f"{emoji} **{symbol}**: ${current_price:.2f} ({change:+.2f}%)\n"
-                    else:
-                        message += f"📊 **{symbol}**: Datos insuficientes\n"
+        parts = ["📈 **Resumen de Mercado**", ""]
+        
+        symbols = list(self.user_symbols[chat_id])
+        
+        # Último cierre y el anterior (LAG) de cada símbolo: una fila por símbolo
+        rows = await asyncio.to_thread(_fetch_prepared, "bot_last_close_change", """
+            SELECT s.symbol, p.close, p.prev_close
+            FROM unnest($1::text[]) AS s(symbol)
+            CROSS JOIN LATERAL (
+                SELECT close, LAG(close) OVER (ORDER BY date) AS prev_close, date
+                FROM (
+                    SELECT close, date
+                    FROM prices
+                    WHERE prices.symbol = s.symbol
+                    ORDER BY date DESC
+                    LIMIT 2
+                ) last_two
+                ORDER BY date DESC
+                LIMIT 1
+            ) p
+        """, (symbols,), "text[]")
+        closes = {symbol: (close, prev_close) for symbol, close, prev_close in rows}
+        
+        for symbol in symbols:
+            current_price, prev_price = closes.get(symbol, (None, None))
             
-            await update.message.reply_text(message, parse_mode='Markdown')
-        finally:
-            conn.close()
+            if prev_price:
+                change = ((current_price - prev_price) / prev_price) * 100
+                
+                emoji = '🟢' if change > 0 else '🔴'
+                parts.append(f"{emoji} **{symbol}**: ${current_price:.2f} ({change:+.2f}%)")
+            else:
+                parts.append(f"📊 **{symbol}**: Datos insuficientes")
+        
+        await self._reply_lines(update, parts)
+    
+    @staticmethod
+    async def _reply_lines(update: Update, lines: List[str]):
+        """Responde con las líneas dadas, repartidas en mensajes de hasta MAX_MESSAGE_LENGTH."""
+        chunk, size = [], 0
+        for line in lines:
+            if chunk and size + len(line) + 1 > MAX_MESSAGE_LENGTH:
+                await update.message.reply_text("\n".join(chunk), parse_mode='Markdown')
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line) + 1
+        if chunk:
+            await update.message.reply_text("\n".join(chunk), parse_mode='Markdown')
     
     async def show_backtest(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /backtest <símbolo> - Performance histórica."""
@@ -338,68 +522,155 @@ Usa /help para más información.
             end = date.today()
             start = end - timedelta(days=30)
             
-            results = backtest_ensemble(symbol, start, end)
+            results = await _get_backtest(symbol, start, end)
             
             if 'error' in results:
                 await update.message.reply_text(f"❌ {results['error']}")
                 return
             
-            message = f"""
-📊 **Backtest {symbol}** (30 días)
-
-**Métricas del Ensemble:**
-• Accuracy: {results['accuracy']:.2%}
-• Precision: {results['precision']:.2%}
-• Recall: {results['recall']:.2%}
-• F1-Score: {results['f1_score']:.2%}
-
-**Detalles:**
-• Predicciones: {results['total_predictions']}
-• Período: {results['start_date']} a {results['end_date']}
-• Modelos promedio: {results.get('avg_models_per_prediction', 0):.1f}
-
-{'✅ Performance sólida!' if results['accuracy'] > 0.6 else '⚠️ Performance moderada'}
-            """
+            message = BACKTEST_TEMPLATE.format_map({
+                **results,
+                'symbol': symbol,
+                'avg_models': results.get('avg_models_per_prediction', 0),
+                'verdict': '✅ Performance sólida!' if results['accuracy'] > 0.6 else '⚠️ Performance moderada',
+            })
             
             await update.message.reply_text(message, parse_mode='Markdown')
         
         except Exception as e:
-            logger.error(f"Error en backtest: {e}")
+            logger.error("Error en backtest: %s", e)
             await update.message.reply_text(f"❌ Error al calcular backtest: {str(e)}")
     
     async def send_alert_to_subscribers(self, symbol: str, prediction_data: Dict):
-        """Envía alerta a todos los suscriptores del símbolo."""
+        """Encola una alerta para todos los suscriptores del símbolo.
+        
+        Las alertas pendientes se envían agrupadas por usuario cada
+        ALERT_FLUSH_INTERVAL segundos (ver _flush_alerts).
+        """
         if not self.subscribers:
             return
         
-        message = f"""
-🚨 **Nueva Señal de Trading**
-
-📊 Mercado: `{symbol}`
-🎯 Dirección: **{prediction_data['direction']}** {'⬆️' if prediction_data['direction'] == 'UP' else '⬇️'}
-📈 Confianza: {prediction_data['confidence']:.0%}
-🤖 Modelo: {prediction_data['model']}
-📅 Fecha objetivo: {prediction_data['target_date']}
-
-{'🔥 Alta confianza!' if prediction_data['confidence'] >= 0.7 else ''}
-        """
+        # Solo encolar para los usuarios que siguen este símbolo
+        for chat_id in self.symbol_subscribers.get(symbol, ()):
+            self.pending_alerts[chat_id].append((symbol, prediction_data))
+    
+    @staticmethod
+    def _build_alert_digests(alerts: List[tuple]) -> List[str]:
+        """Agrupa las alertas de un usuario por símbolo en mensajes de hasta MAX_MESSAGE_LENGTH."""
+        header = ALERT_HEADER
+        blocks = []
+        for symbol, group in groupby(sorted(alerts, key=itemgetter(0)), key=itemgetter(0)):
+            lines = [ALERT_MARKET_TEMPLATE.format(symbol=symbol)]
+            for _, data in group:
+                lines.append(ALERT_LINE_TEMPLATE.format_map({
+                    **data,
+                    'arrow': '⬆️' if data['direction'] == 'UP' else '⬇️',
+                    'hot': ' 🔥' if data['confidence'] >= ALERT_CONFIDENCE_THRESHOLD else '',
+                }))
+            blocks.append("\n".join(lines))
         
-        for chat_id in self.subscribers:
-            # Solo enviar si el usuario sigue este símbolo
-            if chat_id in self.user_symbols and symbol in self.user_symbols[chat_id]:
-                try:
-                    await self.application.bot.send_message(
-                        chat_id=chat_id,
-                        text=message,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Error enviando alerta a {chat_id}: {e}")
+        digests = []
+        current = [header]
+        size = len(header)
+        for block in blocks:
+            if len(current) > 1 and size + len(block) + 2 > MAX_MESSAGE_LENGTH:
+                digests.append("\n\n".join(current))
+                current = [header]
+                size = len(header)
+            current.append(block)
+            size += len(block) + 2
+        if len(current) > 1:
+            digests.append("\n\n".join(current))
+        return digests
+    
+    async def _flush_alerts(self):
+        """Envía periódicamente las alertas pendientes, un resumen por usuario."""
+        while True:
+            await asyncio.sleep(ALERT_FLUSH_INTERVAL)
+            if not self.pending_alerts:
+                continue
+            
+            pending, self.pending_alerts = self.pending_alerts, defaultdict(list)
+            # Un error en una iteración no debe matar la tarea: se registra y
+            # se descartan esas alertas (reencolarlas fallaría en bucle)
+            try:
+                messages = []
+                for chat_id, alerts in pending.items():
+                    try:
+                        messages.extend((chat_id, text) for text in self._build_alert_digests(alerts))
+                    except Exception:
+                        logger.exception("Error preparando alertas para %s; se descartan", chat_id)
+                await asyncio.gather(*(
+                    self._send_message(chat_id, text) for chat_id, text in messages
+                ))
+            except Exception:
+                logger.exception("Error enviando el lote de alertas")
+    
+    async def _persist(self, sql: str, params=()):
+        """Guarda un cambio de suscripción; si la BD falla, se mantiene solo en memoria."""
+        try:
+            await asyncio.to_thread(_execute_write, sql, params)
+        except Exception:
+            logger.exception("❌ No se pudo guardar la suscripción en la base de datos")
+    
+    def _load_subscriptions(self):
+        """Crea las tablas si faltan y carga en memoria las suscripciones guardadas."""
+        _execute_write(_SUBSCRIPTION_TABLES_SQL)
+        subscribers = _fetch_rows("SELECT chat_id FROM telegram_subscribers")
+        followed = _fetch_rows("SELECT chat_id, symbol FROM telegram_user_symbols")
+        
+        self.subscribers = {chat_id for (chat_id,) in subscribers}
+        self.user_symbols = {}
+        self.symbol_subscribers = defaultdict(set)
+        for chat_id, symbol in followed:
+            self.user_symbols.setdefault(chat_id, set()).add(symbol)
+            self.symbol_subscribers[symbol].add(chat_id)
+        
+        logger.info(
+            "📥 Suscripciones cargadas: %d usuarios, %d símbolos seguidos",
+            len(self.subscribers), len(followed)
+        )
+    
+    async def _post_init(self, application: Application):
+        """Carga las suscripciones y arranca las tareas en segundo plano."""
+        try:
+            await asyncio.to_thread(self._load_subscriptions)
+        except Exception:
+            # Sin suscripciones guardadas el bot sigue funcionando en memoria
+            logger.exception("❌ No se pudieron cargar las suscripciones de la base de datos")
+        self._flush_task = asyncio.create_task(self._flush_alerts())
+    
+    async def _post_shutdown(self, application: Application):
+        """Detiene las tareas en segundo plano."""
+        if self._flush_task:
+            self._flush_task.cancel()
+    
+    async def _send_message(self, chat_id: int, text: str):
+        """Envía un mensaje respetando el límite de envíos simultáneos."""
+        async with self.send_semaphore:
+            try:
+                await self.application.bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode='Markdown'
+                )
+            except Exception as e:
+                logger.error("Error enviando alerta a %s: %s", chat_id, e)
     
     def run(self):
         """Inicia el bot."""
         # Crear aplicación
-        self.application = Application.builder().token(self.token).build()
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .concurrent_updates(CONCURRENT_UPDATES)
+            .get_updates_connect_timeout(10)
+            .get_updates_read_timeout(30)
+            .get_updates_pool_timeout(10)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
         
         # Registrar comandos
         self.application.add_handler(CommandHandler("start", self.start))
@@ -414,8 +685,18 @@ Usa /help para más información.
         self.application.add_handler(CommandHandler("backtest", self.show_backtest))
         
         # Iniciar bot
-        logger.info("🤖 Bot de Telegram iniciado")
-        self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        if TELEGRAM_WEBHOOK_URL:
+            logger.info("🤖 Bot de Telegram iniciado (webhook en puerto %d)", TELEGRAM_WEBHOOK_PORT)
+            self.application.run_webhook(
+                listen=TELEGRAM_WEBHOOK_LISTEN,
+                port=TELEGRAM_WEBHOOK_PORT,
+                url_path=self.token,
+                webhook_url=f"{TELEGRAM_WEBHOOK_URL.rstrip('/')}/{self.token}",
+                allowed_updates=Update.ALL_TYPES,
+            )
+        else:
+            logger.info("🤖 Bot de Telegram iniciado (polling)")
+            self.application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == '__main__':
@@ -10,6 +10,7 @@ sys.path.insert(0, '/app')
 os.chdir('/app')
 
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 from scripts.backfill_predictions import backfill_predictions_for_symbol
 
 print("🚀 BACKFILL - 3 MERCADOS GLOBALES")
@@ -28,15 +29,21 @@ markets = [
 
 results = []
 
-for symbol, name in markets:
-    print(f"📊 {name}")
-    try:
-        backfill_predictions_for_symbol(symbol, test_date, test_date)
-        results.append((name, 'SUCCESS'))
-    except Exception as e:
-        print(f"❌ ERROR: {e}")
-        results.append((name, f'ERROR: {str(e)[:50]}'))
-    print()
+# Los tres mercados son independientes: se rellenan en paralelo
+with ThreadPoolExecutor(max_workers=len(markets)) as executor:
+    futures = [
+        (name, executor.submit(backfill_predictions_for_symbol, symbol, test_date, test_date))
+        for symbol, name in markets
+    ]
+    for name, future in futures:
+        print(f"📊 {name}")
+        try:
+            future.result()
+            results.append((name, 'SUCCESS'))
+        except Exception as e:
+            print(f"❌ ERROR: {e}")
+            results.append((name, f'ERROR: {str(e)[:50]}'))
+        print()
 
 # Resumen
 print()
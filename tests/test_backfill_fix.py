@@ -10,8 +10,13 @@ import sys
 sys.path.insert(0, '/app')
 
 from datetime import date
+from functools import lru_cache
 from scripts.models import _load_features, predict_ensemble
 
+# Los tests piden varias veces las mismas features (símbolo, fecha): se reutilizan
+# en memoria durante la ejecución. Solo afecta a este módulo, no a predict_ensemble.
+_load_features = lru_cache(maxsize=64)(_load_features)
+
 def test_load_features_with_as_of_date():
     """Verifica que _load_features filtra correctamente por fecha."""
     print("🧪 Test 1: _load_features con as_of_date")